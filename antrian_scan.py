@@ -0,0 +1,121 @@
+"""Antrian scan kartu: pasangkan kartu dan bacaan Saccharomat secara FIFO.
+
+Operator boleh men-scan satu nampan kartu lebih dulu, lalu mengukur sampel
+berurutan. Kartu yang belum punya bacaan masuk antrian sesuai urutan scan;
+setiap bacaan stabil yang masuk dipasangkan dengan kartu terlama di antrian
+dan langsung dikirim oleh pemanggil. Sebaliknya, bacaan yang datang saat
+antrian kosong disimpan (hanya yang terbaru) sampai kartu berikutnya di-scan.
+
+Aman dipanggil dari beberapa thread (thread serial dan thread/GUI pembaca kartu).
+Bacaan diperlakukan sebagai nilai opak, mis. tuple (port, bacaan, t_baca).
+"""
+import threading
+import time
+from collections import deque
+
+MAKS = 200      # kartu di antrian; scan berikutnya ditolak jika penuh
+
+
+class AntrianPenuh(Exception):
+    pass
+
+
+class Pasangan:
+    """Kartu yang sudah mendapat bacaan"""
+
+    __slots__ = ("kartu_ari", "bacaan", "detik_tunggu")
+
+    def __init__(self, kartu_ari, bacaan, detik_tunggu):
+        self.kartu_ari = kartu_ari
+        self.bacaan = bacaan
+        self.detik_tunggu = detik_tunggu    # lama kartu menunggu bacaan di antrian (0 jika bacaan lebih dulu)
+
+
+class AntrianScan:
+    def __init__(self, maks=MAKS):
+        self.maks = maks
+        self._lock = threading.Lock()
+        self._kartu = deque()           # (kartu_ari, waktu scan monotonic), terlama di kiri
+        self._bacaan = None             # bacaan terbaru yang belum punya kartu
+        self.jumlah_antri = 0
+        self.jumlah_dipasangkan = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._kartu)
+
+    def ada(self, kartu_ari):
+        with self._lock:
+            return any(k == kartu_ari for k, _ in self._kartu)
+
+    def daftar(self):
+        """Snapshot kartu di antrian (terlama dulu)"""
+        with self._lock:
+            return [k for k, _ in self._kartu]
+
+    def tambah_kartu(self, kartu_ari):
+        """
+        Kartu baru di-scan. Return Pasangan jika sudah ada bacaan yang menunggu,
+        atau None jika kartu masuk antrian. AntrianPenuh jika antrian sudah `maks`.
+        """
+        with self._lock:
+            if not self._kartu and self._bacaan is not None:
+                bacaan, self._bacaan = self._bacaan, None
+                self.jumlah_dipasangkan += 1
+                return Pasangan(kartu_ari, bacaan, 0.0)
+            if len(self._kartu) >= self.maks:
+                raise AntrianPenuh(f"Antrian scan penuh ({self.maks} kartu)")
+            self._kartu.append((kartu_ari, time.monotonic()))
+            self.jumlah_antri += 1
+            return None
+
+    def tambah_bacaan(self, bacaan):
+        """
+        Bacaan stabil baru. Return Pasangan dengan kartu terlama di antrian, atau None
+        (bacaan disimpan, menggantikan bacaan sebelumnya yang belum punya kartu).
+        """
+        with self._lock:
+            if not self._kartu:
+                self._bacaan = bacaan
+                return None
+            kartu_ari, t_scan = self._kartu.popleft()
+            self.jumlah_dipasangkan += 1
+        return Pasangan(kartu_ari, bacaan, time.monotonic() - t_scan)
+
+    def ambil_kartu(self):
+        """Keluarkan kartu terlama tanpa menyimpan bacaan (GUI mengirim bacaannya sendiri). Return (kartu_ari, detik_tunggu) atau None."""
+        with self._lock:
+            if not self._kartu:
+                return None
+            kartu_ari, t_scan = self._kartu.popleft()
+            self.jumlah_dipasangkan += 1
+        return kartu_ari, time.monotonic() - t_scan
+
+    def kembalikan(self, kartu_ari, detik_tunggu):
+        """
+        Pengiriman kartu dari ambil_kartu() gagal: taruh lagi di depan antrian dengan waktu scan
+        aslinya. Return False jika kartu yang sama sudah di-scan ulang selama itu (tidak digandakan).
+        """
+        with self._lock:
+            self.jumlah_dipasangkan -= 1
+            if any(k == kartu_ari for k, _ in self._kartu):
+                return False
+            self._kartu.appendleft((kartu_ari, time.monotonic() - detik_tunggu))
+            return True
+
+    def hapus(self, kartu_ari):
+        """Batalkan satu kartu di antrian. Return True jika ada."""
+        with self._lock:
+            for item in self._kartu:
+                if item[0] == kartu_ari:
+                    self._kartu.remove(item)
+                    return True
+            return False
+
+    def kosongkan(self):
+        """Buang semua kartu dan bacaan yang menunggu. Return daftar kartu yang dibuang."""
+        with self._lock:
+            dibuang = [k for k, _ in self._kartu]
+            self._kartu.clear()
+            self._bacaan = None
+            return dibuang
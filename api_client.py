@@ -0,0 +1,266 @@
+"""Client API silab untuk pengiriman hasil ARI.
+
+Mendukung dua mode transport:
+- "satu"  : satu request GET per kartu (perilaku lama input_ari_from_python.php)
+- "batch" : beberapa hasil dikirim sekaligus dalam satu POST (body JSON array).
+            Jika server belum mendukung batch, otomatis kembali ke GET per kartu.
+
+Setiap hasil dikembalikan dalam bentuk dict {'error', 'status_code', 'text',
+'latensi_ms'} yang sama dengan respon GET per kartu, sehingga bisa langsung
+diproses outbox.klasifikasi_hasil.
+
+Semua request lewat satu requests.Session dengan connection pool dan
+keep-alive, jadi handshake TCP ke server hanya dibayar sekali per koneksi.
+Modul requests (impor paling berat saat start) baru dimuat saat session
+pertama kali dibutuhkan, atau lebih awal lewat ApiClient.siapkan() dari
+thread latar.
+"""
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MODE_SATU = "satu"
+MODE_BATCH = "batch"
+
+CEK_ULANG_BATCH_DETIK = 600   # setelah fallback, coba lagi mode batch tiap 10 menit
+
+
+def hasil_error(pesan, latensi_ms=None):
+    return {'error': pesan, 'status_code': None, 'text': '', 'latensi_ms': latensi_ms}
+
+
+class ApiClient:
+    """Client API_BASE (aman dipanggil dari beberapa thread)"""
+
+    def __init__(self, base_url, timeout=5, mode=MODE_BATCH, connect_timeout=3,
+                 pool_maxsize=8, retries=2, backoff=0.3, metrik=None):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, timeout)
+        self.mode = mode
+        self.batch_didukung = None     # None = belum diketahui
+        self._cek_batch_lagi = 0.0
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff = backoff
+        self._session = None
+        self.metrik = metrik           # metrik.Metrik opsional (tahap api, counter request gagal)
+
+        self._lock = threading.Lock()
+        self.jumlah_request = 0
+        self.total_latensi_ms = 0.0
+        self.latensi_terakhir_ms = None
+
+    @property
+    def session(self):
+        """requests.Session, dibuat (dan requests diimpor) saat pertama dipakai"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._buat_session()
+        return self._session
+
+    def siapkan(self):
+        """Muat requests dan buat session sekarang (panggil dari thread latar setelah GUI tampil)"""
+        return self.session
+
+    def _buat_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        # Retry hanya untuk gagal connect pada GET; data yang mungkin sudah
+        # diterima server tidak dikirim ulang di sini (itu tugas outbox)
+        retry = Retry(
+            total=self.retries, connect=self.retries, read=0, status=0, other=0,
+            backoff_factor=self.backoff, allowed_methods=frozenset(['GET'])
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _request(self, method, **kwargs):
+        """Jalankan request lewat session, return (response, latensi_ms)"""
+        mulai = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url, timeout=self.timeout, **kwargs)
+        except Exception:
+            if self.metrik is not None:
+                self.metrik.tambah("request", "error")
+            raise
+        finally:
+            latensi_ms = (time.perf_counter() - mulai) * 1000
+            with self._lock:
+                self.jumlah_request += 1
+                self.total_latensi_ms += latensi_ms
+                self.latensi_terakhir_ms = latensi_ms
+            if self.metrik is not None:
+                self.metrik.amati("api", latensi_ms)
+        if self.metrik is not None:
+            self.metrik.tambah("request", str(response.status_code))
+        return response, latensi_ms
+
+    def rata_rata_latensi_ms(self):
+        with self._lock:
+            if not self.jumlah_request:
+                return None
+            return self.total_latensi_ms / self.jumlah_request
+
+    def ambil_pending(self, since=None, etag=None):
+        """
+        Ambil daftar kartu yang belum diisi. Return (response, latensi_ms).
+        since: server_time refresh sebelumnya (delta), etag: ETag respon sebelumnya (bisa 304).
+        """
+        params = {'since': since} if since is not None else None
+        headers = {'If-None-Match': etag} if etag else None
+        return self._request("GET", params=params, headers=headers)
+
+    def ambil_halaman(self, status, halaman, per_halaman, sejak=None):
+        """
+        Satu halaman daftar kartu 'pending' atau 'selesai' (rekonsiliasi). Return (response, latensi_ms).
+        Server lama mengabaikan parameter ini dan mengirim daftar pending penuh tanpa 'jumlah_halaman'.
+        """
+        params = {'status': status, 'halaman': halaman, 'per_halaman': per_halaman}
+        if sejak is not None:
+            params['sejak'] = sejak
+        return self._request("GET", params=params)
+
+    def kirim_satu(self, params):
+        """Kirim satu hasil dengan GET (format lama)"""
+        import requests
+        try:
+            response, latensi_ms = self._request("GET", params=params)
+            return {'error': None, 'status_code': response.status_code, 'text': response.text,
+                    'latensi_ms': latensi_ms}
+        except requests.exceptions.Timeout:
+            return hasil_error('Timeout')
+        except requests.exceptions.ConnectionError:
+            return hasil_error('Connection error')
+        except Exception as e:
+            return hasil_error(str(e))
+
+    def kirim_batch(self, daftar_params):
+        """
+        Kirim beberapa hasil. Return list hasil dengan urutan sama seperti input.
+        """
+        if not daftar_params:
+            return []
+        if len(daftar_params) == 1 or not self._pakai_batch():
+            return self._kirim_per_baris(daftar_params)
+
+        import requests
+        try:
+            response, latensi_ms = self._request(
+                "POST",
+                data=json.dumps(daftar_params),
+                headers={'Content-Type': 'application/json'}
+            )
+        except requests.exceptions.Timeout:
+            return [hasil_error('Timeout')] * len(daftar_params)
+        except requests.exceptions.ConnectionError:
+            return [hasil_error('Connection error')] * len(daftar_params)
+        except Exception as e:
+            return [hasil_error(str(e))] * len(daftar_params)
+
+        if response.status_code >= 500:
+            # Error server sementara, bukan tanda batch tidak didukung
+            hasil = {'error': None, 'status_code': response.status_code, 'text': response.text,
+                     'latensi_ms': latensi_ms}
+            return [hasil] * len(daftar_params)
+
+        results = self._baca_results(response, len(daftar_params))
+        if results is None:
+            # Server lama: tidak mengenal POST batch → kirim ulang per kartu
+            self.batch_didukung = False
+            self._cek_batch_lagi = time.monotonic() + CEK_ULANG_BATCH_DETIK
+            return self._kirim_per_baris(daftar_params)
+
+        self.batch_didukung = True
+        return [
+            {'error': None, 'status_code': 200, 'text': json.dumps(item), 'latensi_ms': latensi_ms}
+            for item in results
+        ]
+
+    def _pakai_batch(self):
+        if self.mode != MODE_BATCH:
+            return False
+        if self.batch_didukung is False:
+            return time.monotonic() >= self._cek_batch_lagi
+        return True
+
+    @staticmethod
+    def _baca_results(response, jumlah):
+        """Ambil list 'results' dari respon batch, None jika format tidak dikenali"""
+        if response.status_code != 200:
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        results = data.get('results') if isinstance(data, dict) else None
+        if not isinstance(results, list) or len(results) != jumlah:
+            return None
+        if not all(isinstance(item, dict) and 'status' in item for item in results):
+            return None
+        return results
+
+    def _kirim_per_baris(self, daftar_params):
+        """GET per kartu. Berhenti di error jaringan pertama agar server tidak dibanjiri."""
+        hasil = []
+        for params in daftar_params:
+            if hasil and hasil[-1]['error']:
+                hasil.append(hasil[-1])
+                continue
+            hasil.append(self.kirim_satu(params))
+        return hasil
+
+
+class PengirimBatch:
+    """
+    Mengumpulkan hasil yang akan dikirim lalu mengirimnya per batch:
+    batch dikirim jika sudah berisi `maks` item atau `tunggu_ms` berlalu
+    sejak item pertama masuk. Callback dipanggil dari thread worker;
+    exception dari callback ditulis ke on_log, tidak menghentikan batch.
+    """
+
+    def __init__(self, api, maks=20, tunggu_ms=200, workers=4, on_log=None):
+        # workers sebaiknya <= pool_maxsize ApiClient agar koneksi selalu dipakai ulang
+        self.api = api
+        self.on_log = on_log
+        self.maks = maks
+        self.tunggu = tunggu_ms / 1000.0
+        self._antrian = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="submit")
+        self._thread = threading.Thread(target=self._kumpulkan, name="submit-batch", daemon=True)
+        self._thread.start()
+
+    def kirim(self, params, callback):
+        """Masukkan satu hasil ke antrian. callback(hasil) dipanggil setelah terkirim."""
+        self._antrian.put((params, callback))
+
+    def _kumpulkan(self):
+        while True:
+            batch = [self._antrian.get()]
+            batas = time.monotonic() + self.tunggu
+            while len(batch) < self.maks:
+                sisa = batas - time.monotonic()
+                if sisa <= 0:
+                    break
+                try:
+                    batch.append(self._antrian.get(timeout=sisa))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._proses, batch)
+
+    def _proses(self, batch):
+        daftar_hasil = self.api.kirim_batch([params for params, _ in batch])
+        for (params, callback), hasil in zip(batch, daftar_hasil):
+            try:
+                callback(hasil)
+            except Exception as e:
+                if self.on_log:
+                    self.on_log(f"[API] Error: callback hasil kartu {params.get('kartu_ari')} gagal: "
+                                f"{type(e).__name__}: {e}")
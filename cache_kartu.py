@@ -0,0 +1,188 @@
+"""Cache kartu pending (belum diisi) dengan index dict per kartu_ari.
+
+Daftar kartu pending diambil di background oleh thread CacheKartu, sehingga
+barcode yang di-scan langsung dipetakan ke `id`-nya lewat lookup dict O(1)
+tanpa request ke server saat submit.
+
+Refresh:
+- ETag   : jika server mengirim header ETag, request berikutnya memakai
+           If-None-Match; 304 berarti daftar tidak berubah.
+- delta  : request dikirim dengan ?since=<server_time terakhir>. Server yang
+           mendukung membalas {'delta': true, 'data': [kartu baru/berubah],
+           'removed': [kartu_ari yang sudah diisi], 'server_time': ...}.
+           Server lama mengabaikan `since` dan mengirim daftar penuh, yang
+           diperlakukan sebagai snapshot (kartu yang tidak ada ikut dibuang).
+- penuh  : setiap `interval_penuh` detik dikirim request tanpa since/ETag.
+Kartu yang tidak dikonfirmasi server selama `ttl` detik dibuang (TTL).
+Refresh dari thread latar dan refresh manual (load_pending_data) tidak
+pernah berjalan bersamaan, jadi respons penuh tidak tercampur dengan
+watermark delta dari thread lain.
+"""
+import threading
+import time
+
+STATUS_TIDAK_BERUBAH = 304
+JEDA_REFRESH_MISS = 5.0     # detik, jarak minimal refresh tambahan yang dipicu miss
+
+
+class CacheKartu(threading.Thread):
+    """Thread refresh + index kartu_ari → entri pending (aman dipanggil dari thread lain)"""
+
+    def __init__(self, api, on_log=None, interval=30.0, interval_penuh=300.0, ttl=900.0):
+        super().__init__(name="cache-kartu", daemon=True)
+        self.api = api
+        self.on_log = on_log
+        self.interval = interval
+        self.interval_penuh = interval_penuh
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._lock_refresh = threading.Lock()   # satu refresh sekaligus (request + update state)
+        self._index = {}                # kartu_ari -> [data, terakhir_dikonfirmasi]
+        self._etag = None
+        self._since = None
+        self._t_penuh = 0.0             # waktu (monotonic) refresh penuh terakhir
+        self._berhenti = threading.Event()
+        self._segera = threading.Event()
+        self.jumlah_hit = 0
+        self.jumlah_miss = 0
+        self.jumlah_refresh = 0
+        self.refresh_terakhir = None    # waktu (monotonic) refresh sukses terakhir
+
+    # --- lookup ---
+
+    def cari(self, kartu_ari):
+        """Return id kartu pending, None jika tidak ada di cache (miss)"""
+        kartu_ari = str(kartu_ari).strip()
+        sekarang = time.monotonic()
+        with self._lock:
+            entri = self._index.get(kartu_ari)
+            if entri is not None and sekarang - entri[1] > self.ttl:
+                del self._index[kartu_ari]
+                entri = None
+            id_kartu = entri[0].get('id') if entri is not None else None
+            if id_kartu is None:
+                self.jumlah_miss += 1
+            else:
+                self.jumlah_hit += 1
+        if id_kartu is None and (self.refresh_terakhir is None
+                                 or sekarang - self.refresh_terakhir >= JEDA_REFRESH_MISS):
+            # Kartu mungkin baru ditambahkan di server: refresh lebih awal
+            self._segera.set()
+        return id_kartu
+
+    def hapus(self, kartu_ari):
+        """Buang kartu yang sudah terkirim (tidak lagi pending)"""
+        with self._lock:
+            self._index.pop(str(kartu_ari).strip(), None)
+
+    def daftar(self):
+        """Snapshot daftar entri pending (urutan sesuai server)"""
+        with self._lock:
+            return [entri[0] for entri in self._index.values()]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index)
+
+    @property
+    def hit_rate(self):
+        total = self.jumlah_hit + self.jumlah_miss
+        return self.jumlah_hit / total if total else None
+
+    # --- refresh ---
+
+    def run(self):
+        self._refresh_aman()
+        while not self._berhenti.is_set():
+            self._segera.wait(self.interval)
+            self._segera.clear()
+            if self._berhenti.is_set():
+                break
+            self._refresh_aman()
+
+    def stop(self):
+        self._berhenti.set()
+        self._segera.set()
+
+    def minta_refresh(self):
+        self._segera.set()
+
+    def _log(self, pesan, debug=False):
+        if self.on_log:
+            self.on_log(f"[DEBUG] [CACHE] {pesan}" if debug else f"[CACHE] {pesan}")
+
+    def _refresh_aman(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self._log(f"Error refresh kartu pending: {e}")
+
+    def refresh(self, penuh=False):
+        """Ambil perubahan daftar pending dari server dan perbarui index (refresh lain menunggu)"""
+        # Lookup (cari) hanya memakai _lock, jadi tidak ikut menunggu request ini
+        with self._lock_refresh:
+            self._refresh(penuh)
+
+    def _refresh(self, penuh):
+        with self._lock:
+            penuh = penuh or time.monotonic() - self._t_penuh >= self.interval_penuh
+            since = None if penuh else self._since
+            etag = None if penuh else self._etag
+        response, latensi_ms = self.api.ambil_pending(since=since, etag=etag)
+        sekarang = time.monotonic()
+
+        if response.status_code == STATUS_TIDAK_BERUBAH:
+            with self._lock:
+                for entri in self._index.values():
+                    entri[1] = sekarang
+                self._buang_kedaluwarsa(sekarang)
+            self._selesai_refresh(sekarang, penuh)
+            self._log(f"Tidak berubah (304), {len(self)} kartu, {latensi_ms:.0f} ms", debug=True)
+            return
+
+        if response.status_code != 200:
+            self._log(f"Error: refresh status {response.status_code}")
+            return
+        data = response.json()
+        if data.get('status') != 'success':
+            self._log(f"Error: {data.get('message', 'Unknown error')}")
+            return
+
+        delta = bool(data.get('delta'))
+        daftar = data.get('data') or []
+        dihapus = data.get('removed') or []
+        with self._lock:
+            if not delta:
+                lama = self._index
+                self._index = {}
+            for item in daftar:
+                # Format lama: hanya string kartu_ari (tanpa id)
+                entri = item if isinstance(item, dict) else {'kartu_ari': str(item)}
+                self._index[str(entri.get('kartu_ari', '')).strip()] = [entri, sekarang]
+            for kartu_ari in dihapus:
+                self._index.pop(str(kartu_ari).strip(), None)
+            self._buang_kedaluwarsa(sekarang)
+            jumlah = len(self._index)
+            self._etag = response.headers.get('ETag')
+            self._since = data.get('server_time')
+
+        self._selesai_refresh(sekarang, penuh)
+        if delta:
+            self._log(f"Delta +{len(daftar)} -{len(dihapus)}, {jumlah} kartu, {latensi_ms:.0f} ms", debug=True)
+        else:
+            # Refresh penuh berkala yang tidak mengubah jumlah cukup di level debug
+            self._log(f"{jumlah} kartu pending (sebelumnya {len(lama)}), {latensi_ms:.0f} ms",
+                      debug=bool(lama) and len(lama) == jumlah)
+
+    def _selesai_refresh(self, sekarang, penuh):
+        with self._lock:
+            self.jumlah_refresh += 1
+            self.refresh_terakhir = sekarang
+            if penuh:
+                self._t_penuh = sekarang
+
+    def _buang_kedaluwarsa(self, sekarang):
+        """Buang entri yang melewati TTL (dipanggil dengan _lock dipegang)"""
+        kedaluwarsa = [k for k, entri in self._index.items() if sekarang - entri[1] > self.ttl]
+        for kartu_ari in kedaluwarsa:
+            del self._index[kartu_ari]
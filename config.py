@@ -0,0 +1,75 @@
+"""Konfigurasi bersama GUI (index.py) dan mode headless (headless.py).
+
+Konstanta yang khusus tampilan (console, tabel) tetap di index.py.
+"""
+import os
+import sys
+
+from api_client import MODE_BATCH
+from outbox import lokasi_default
+from saccharomat import FORMAT_DEFAULT
+
+API_BASE = "http://192.168.29.231/silab-v4/input_ari_from_python.php"
+
+
+def folder_aplikasi():
+    """Folder EXE (PyInstaller) atau folder script saat development"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+# === RUMUS RENDEMEN ===
+RUMUS_FILE = os.path.join(folder_aplikasi(), "rumus_rendemen.json")   # tidak ada → rumus standar
+RUMUS_AKTIF = None          # None = pakai "aktif" di RUMUS_FILE
+
+# === SUBMIT CONFIG ===
+SUBMIT_TIMEOUT = 5          # detik, batas baca respon
+CONNECT_TIMEOUT = 3         # detik, batas membuka koneksi
+HTTP_POOL = 8               # koneksi keep-alive yang disimpan
+HTTP_RETRY = 2              # retry otomatis jika gagal connect (GET saja)
+SUBMIT_WORKERS = 4          # jumlah request yang boleh berjalan bersamaan
+TRANSPORT_MODE = MODE_BATCH # MODE_BATCH: POST JSON array, fallback otomatis ke GET per kartu
+BATCH_MAKS = 20             # kirim batch jika sudah berisi sekian hasil...
+BATCH_TUNGGU_MS = 200       # ...atau sekian ms sejak hasil pertama masuk
+
+# === CACHE KARTU PENDING ===
+CACHE_INTERVAL = 30         # detik, refresh delta daftar kartu pending di background
+CACHE_INTERVAL_PENUH = 300  # detik, refresh penuh (tanpa since/ETag)
+CACHE_TTL = 900             # detik, kartu yang tidak dikonfirmasi server selama ini dibuang
+
+# === METRIK ===
+METRIK_FILE = None          # path file .prom (textfile collector node_exporter), None = tidak ditulis
+METRIK_PORT = 0             # port endpoint HTTP /metrics, 0 = nonaktif
+METRIK_INTERVAL = 15        # detik, jarak penulisan METRIK_FILE
+
+# === OUTBOX CONFIG ===
+OUTBOX_PATH = lokasi_default()   # file SQLite di samping EXE
+
+# === RIWAYAT ===
+RIWAYAT_PATH = lokasi_default("riwayat_ari.db")   # semua bacaan dan hasil kirim, lihat riwayat.py
+JAM_SHIFT = (6, 14, 22)     # jam mulai shift; kartu yang sama dalam satu shift diblokir (duplikat.py)
+
+# === REKONSILIASI ===
+REKONSILIASI_INTERVAL = 1800    # detik, jarak pencocokan riwayat terkirim dengan server (rekonsiliasi.py)
+REKONSILIASI_PER_HALAMAN = 500  # kartu per halaman daftar server
+REKONSILIASI_WORKERS = 4        # halaman yang diambil bersamaan
+REKONSILIASI_HARI = 0           # hanya hasil N hari terakhir, 0 = seluruh riwayat (satu musim)
+REKONSILIASI_MAKS_ULANG = 3     # kirim ulang per hasil sebelum dilaporkan hilang (status 'hilang')
+
+# === SERIAL CONFIG ===
+BAUDRATE = 9600
+FORMAT_SACCHAROMAT = FORMAT_DEFAULT   # layout kolom per instrumen/firmware, lihat saccharomat.py
+SERIAL_BACKOFF_AWAL = 1     # detik, jeda buka ulang pertama setelah pembaca putus (lalu x2)
+SERIAL_BACKOFF_MAKS = 30    # detik, jeda buka ulang terpanjang
+SERIAL_BATAS_DIAM = 0       # detik tanpa byte sebelum port dibuka ulang, 0 = nonaktif
+                            # (isi hanya untuk instrumen yang mengirim data terus-menerus)
+STABIL_MODE = "berturut"    # "berturut" atau "median", lihat stabil.py; None = tanpa penyaring
+STABIL_JUMLAH = 3           # bacaan yang harus sepakat sebelum satu bacaan diteruskan per sampel
+STABIL_TOLERANSI = 0.05     # selisih maksimum per kolom (pol baca, brix, pol)
+STABIL_BATAS_TENANG = 5     # detik tanpa bacaan valid sebelum sampel tanpa baris penutup diteruskan, 0 = nonaktif
+
+# === REKAM SERIAL CONFIG ===
+REKAM_FOLDER = os.path.join(folder_aplikasi(), "rekaman")
+REKAM_MAKS_BYTE = 5 * 1024 * 1024   # ukuran satu file sebelum dirotasi
+REKAM_MAKS_FILE = 20                # file terlama dihapus
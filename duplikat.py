@@ -0,0 +1,125 @@
+"""Deteksi kartu ARI yang dikirim dua kali (scan ulang, Enter + klik SEND).
+
+IndeksDuplikat menyimpan set kartu_ari yang sudah dikirim pada shift aktif.
+Pemeriksaan dan penandaan terjadi SEBELUM request dibuat, jadi duplikat tidak
+memakan round trip API. Lookup set O(1) berapa pun jumlah kartu semusim;
+set dikosongkan otomatis saat shift berganti sehingga ukurannya tetap
+sebatas satu shift.
+
+Indeks tidak punya file sendiri: saat start isinya dibangun ulang dari
+riwayat lokal (riwayat.py, query ber-index pada waktu), sehingga tetap
+berlaku setelah aplikasi di-restart di tengah shift. Kartu dari shift
+sebelumnya dicari di riwayat lewat index kartu_ari (hanya ditandai, tidak
+diblokir). Kartu yang ditolak server dilepas dari indeks agar bisa dikirim lagi.
+"""
+import threading
+import time
+
+from outbox import HASIL_DITOLAK
+
+JAM_SHIFT = (6, 14, 22)     # jam mulai setiap shift (waktu lokal)
+
+
+def awal_shift(waktu=None, jam_shift=JAM_SHIFT):
+    """Epoch awal shift yang berisi `waktu` (default sekarang)"""
+    waktu = time.time() if waktu is None else waktu
+    lokal = time.localtime(waktu)
+    tengah_malam = time.mktime((lokal.tm_year, lokal.tm_mon, lokal.tm_mday, 0, 0, 0, 0, 0, -1))
+    jam = lokal.tm_hour + lokal.tm_min / 60 + lokal.tm_sec / 3600
+    sebelum = [j for j in sorted(jam_shift) if j <= jam]
+    if sebelum:
+        return tengah_malam + sebelum[-1] * 3600
+    # Sebelum shift pertama hari ini → shift terakhir kemarin (mis. 22:00-06:00)
+    return tengah_malam - (24 - max(jam_shift)) * 3600
+
+
+class Duplikat:
+    """Info kartu yang sudah pernah dikirim"""
+
+    def __init__(self, kartu_ari, waktu, shift_ini, status=None):
+        self.kartu_ari = kartu_ari
+        self.waktu = waktu
+        self.shift_ini = shift_ini      # True = shift aktif (diblokir), False = shift sebelumnya (ditandai)
+        self.status = status
+
+    def __str__(self):
+        kapan = time.strftime("%H:%M:%S" if self.shift_ini else "%Y-%m-%d %H:%M", time.localtime(self.waktu))
+        asal = "shift ini" if self.shift_ini else "shift sebelumnya"
+        return f"Kartu {self.kartu_ari} sudah dikirim {kapan} ({asal}" + (f", {self.status})" if self.status else ")")
+
+
+class IndeksDuplikat:
+    """Set kartu_ari per shift (aman dari beberapa thread)"""
+
+    def __init__(self, riwayat=None, jam_shift=JAM_SHIFT):
+        self.riwayat = riwayat
+        self.jam_shift = jam_shift
+        self._lock = threading.Lock()
+        self._kartu = {}            # kartu_ari -> waktu dikirim (shift aktif)
+        self._awal = None           # awal shift yang isinya ada di _kartu
+        self.jumlah_diblokir = 0
+        self.jumlah_ditandai = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._kartu)
+
+    def muat(self):
+        """Bangun ulang indeks shift aktif dari riwayat. Return jumlah kartu."""
+        awal = awal_shift(jam_shift=self.jam_shift)
+        kartu = {}
+        if self.riwayat is not None:
+            for kartu_ari, waktu, status in self.riwayat.kartu_sejak(awal):
+                if status == HASIL_DITOLAK:
+                    kartu.pop(kartu_ari, None)
+                else:
+                    kartu[kartu_ari] = waktu
+        with self._lock:
+            self._kartu = kartu
+            self._awal = awal
+            return len(kartu)
+
+    def _ganti_shift(self, sekarang):
+        """Kosongkan indeks jika shift sudah berganti (dipanggil dengan _lock dipegang)"""
+        awal = awal_shift(sekarang, self.jam_shift)
+        if awal != self._awal:
+            self._kartu = {}
+            self._awal = awal
+
+    def periksa(self, kartu_ari, tandai=True):
+        """
+        Cek kartu sebelum dikirim. Return None jika belum pernah dikirim, atau
+        Duplikat (shift_ini=True → sebaiknya diblokir).
+        tandai=True: kartu baru (termasuk Duplikat shift sebelumnya) langsung
+        dicatat sehingga submit kedua yang datang sebelum respon pertama ikut
+        terdeteksi; jika pemanggil membatalkan kirim, panggil lepas().
+        """
+        kartu_ari = str(kartu_ari).strip()
+        sekarang = time.time()
+        with self._lock:
+            self._ganti_shift(sekarang)
+            waktu = self._kartu.get(kartu_ari)
+            if waktu is not None:
+                self.jumlah_diblokir += 1
+                return Duplikat(kartu_ari, waktu, True)
+            if tandai:
+                self._kartu[kartu_ari] = sekarang
+
+        # Shift sebelumnya: cari di riwayat (index kartu_ari)
+        if self.riwayat is not None:
+            for r in self.riwayat.cari_kartu(kartu_ari, tunggu=False):
+                if r['status'] != HASIL_DITOLAK and r['waktu'] < self._awal:
+                    self.jumlah_ditandai += 1
+                    return Duplikat(kartu_ari, r['waktu'], False, r['status'])
+        return None
+
+    def tandai(self, kartu_ari):
+        """Catat kartu sebagai terkirim di shift aktif (mis. setelah operator memaksa kirim ulang)"""
+        with self._lock:
+            self._ganti_shift(time.time())
+            self._kartu[str(kartu_ari).strip()] = time.time()
+
+    def lepas(self, kartu_ari):
+        """Hapus kartu dari indeks (ditolak server / batal dikirim) agar boleh dikirim lagi"""
+        with self._lock:
+            self._kartu.pop(str(kartu_ari).strip(), None)
@@ -0,0 +1,68 @@
+"""View model field hasil serial di form (Brix, Pol, Pol Baca, Rendemen).
+
+Field ini readonly, jadi setiap perubahan butuh state normal → delete →
+insert → readonly per widget. FormBacaan memisahkan nilai dari widget:
+  - atur()/kosongkan() hanya memperbarui teks di model (murah, boleh
+    berkali-kali dalam satu frame);
+  - paling banyak satu repaint dijadwalkan per `interval_ms` (≈ satu frame);
+  - repaint hanya menyentuh widget yang teksnya benar-benar berubah.
+Pembaca nilai (submit, hitung rendemen) memakai teks(), bukan entry.get(),
+sehingga selalu melihat nilai terbaru walau repaint belum berjalan.
+
+Jumlah atur/repaint/widget ditulis juga ke counter metrik `form` jika ada.
+Semua method dipanggil dari main thread. Modul ini tidak mengimpor tkinter.
+"""
+
+INTERVAL_MS = 16        # ≈ satu frame 60 Hz
+
+
+class FormBacaan:
+    def __init__(self, root, entries, interval_ms=INTERVAL_MS, metrik=None):
+        self.root = root
+        self.entries = dict(entries)    # nama field -> Entry readonly
+        self.interval_ms = interval_ms
+        self.metrik = metrik
+        self._nilai = {nama: "" for nama in self.entries}     # teks terbaru (model)
+        self._tampil = {nama: "" for nama in self.entries}    # teks yang ada di widget
+        self._jadwal = None
+        self.jumlah_atur = 0            # permintaan perubahan
+        self.jumlah_repaint = 0         # repaint yang benar-benar menyentuh widget
+        self.jumlah_widget = 0          # widget yang ditulis ulang
+
+    def teks(self, nama):
+        """Nilai terbaru field (belum tentu sudah tampil)"""
+        return self._nilai[nama]
+
+    def atur(self, **teks):
+        """Perbarui nilai field (nama=teks); widget digambar ulang di frame berikutnya"""
+        for nama, nilai in teks.items():
+            self._nilai[nama] = "" if nilai is None else str(nilai)
+        self.jumlah_atur += 1
+        if self.metrik is not None:
+            self.metrik.tambah("form", "atur")
+        self._jadwalkan()
+
+    def kosongkan(self):
+        self.atur(**{nama: "" for nama in self.entries})
+
+    def _jadwalkan(self):
+        if self._jadwal is None and self._nilai != self._tampil:
+            self._jadwal = self.root.after(self.interval_ms, self._gambar)
+
+    def _gambar(self):
+        self._jadwal = None
+        berubah = [nama for nama, nilai in self._nilai.items() if nilai != self._tampil[nama]]
+        if not berubah:
+            return
+        for nama in berubah:
+            entry = self.entries[nama]
+            entry.config(state="normal")
+            entry.delete(0, "end")
+            entry.insert(0, self._nilai[nama])
+            entry.config(state="readonly")
+            self._tampil[nama] = self._nilai[nama]
+        self.jumlah_repaint += 1
+        self.jumlah_widget += len(berubah)
+        if self.metrik is not None:
+            self.metrik.tambah("form", "repaint")
+            self.metrik.tambah("form", "widget", len(berubah))
@@ -0,0 +1,345 @@
+"""Mode headless: serial Saccharomat → API tanpa GUI Tk, untuk stasiun tanpa operator.
+
+Pipeline sama dengan GUI: PembacaSerial → rendemen → outbox → PengirimBatch,
+plus PemutarUlang (kirim ulang outbox) dan CacheKartu (kartu_ari → id).
+Nomor kartu dibaca per baris dari stdin atau file/FIFO (`--kartu`), mis. dari
+barcode scanner. Setiap kartu dipasangkan dengan bacaan stabil terakhir yang
+belum dipakai; jika belum ada bacaan, kartu masuk antrian scan dan dipasangkan
+FIFO dengan bacaan berikutnya (satu nampan kartu boleh di-scan lebih dulu).
+
+Jalankan:
+    python headless.py --port /dev/ttyUSB0
+    python index.py --headless --port /dev/ttyUSB0 --log-file /var/log/ari.log
+    python headless.py --port replay:tools/data/saccharomat_contoh.txt --kartu kartu.txt
+
+Contoh unit systemd (kartu ditulis ke FIFO /run/ari/kartu oleh layanan scanner):
+    [Service]
+    ExecStart=/usr/bin/python3 /opt/ari/headless.py --port /dev/ttyUSB0 --kartu /run/ari/kartu
+    Restart=on-failure
+
+SIGTERM/SIGINT menghentikan pembaca dengan bersih. Pembaca yang putus dibuka
+ulang otomatis dengan backoff (pengawas.py), jadi port asli tidak pernah
+membuat layanan selesai sendiri. Exit code:
+  0 : dihentikan sinyal, atau semua pembaca selesai tanpa error (rekaman
+      replay habis, replay.RekamanHabis)
+  1 : exception tak tertangani (traceback di log)
+  2 : rumus rendemen tidak bisa dimuat
+Restart=on-failure menjalankan ulang layanan untuk exit code selain 0.
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import signal
+import stat
+import sys
+import threading
+
+from api_client import ApiClient, PengirimBatch
+from cache_kartu import CacheKartu
+from config import (API_BASE, SUBMIT_TIMEOUT, CONNECT_TIMEOUT, HTTP_POOL, HTTP_RETRY, SUBMIT_WORKERS,
+                    TRANSPORT_MODE, BATCH_MAKS, BATCH_TUNGGU_MS, CACHE_INTERVAL, CACHE_INTERVAL_PENUH,
+                    CACHE_TTL, OUTBOX_PATH, BAUDRATE, FORMAT_SACCHAROMAT, REKAM_FOLDER, REKAM_MAKS_BYTE,
+                    REKAM_MAKS_FILE, RUMUS_FILE, RUMUS_AKTIF, SERIAL_BACKOFF_AWAL, SERIAL_BACKOFF_MAKS,
+                    SERIAL_BATAS_DIAM, METRIK_FILE, METRIK_PORT, METRIK_INTERVAL, RIWAYAT_PATH,
+                    JAM_SHIFT, STABIL_MODE, STABIL_JUMLAH, STABIL_TOLERANSI, REKONSILIASI_INTERVAL,
+                    REKONSILIASI_PER_HALAMAN, REKONSILIASI_WORKERS, REKONSILIASI_HARI,
+                    REKONSILIASI_MAKS_ULANG, STABIL_BATAS_TENANG)
+from stabil import MODE as MODE_STABIL
+from konsol import NAMA_LEVEL, level_baris
+from metrik import Metrik, EksporMetrik
+from outbox import Outbox, PemutarUlang, klasifikasi_hasil, HASIL_TERKIRIM, HASIL_DITOLAK
+from pengawas import PengawasSerial, OFF
+from riwayat import Riwayat
+from duplikat import IndeksDuplikat
+from rekonsiliasi import Rekonsiliasi
+from antrian_scan import AntrianScan, AntrianPenuh
+from rendemen import buat_params
+from rumus import muat_rumus, RUMUS_DEFAULT
+
+log = logging.getLogger("ari")
+
+
+def tulis_log(line):
+    """Callback log komponen (format '[TAG] pesan'), aman dari thread mana pun"""
+    log.log(level_baris(line), line)
+
+
+def atur_logging(level="INFO", log_file=None, maks_byte=5 * 1024 * 1024, cadangan=5):
+    log.setLevel(NAMA_LEVEL[level])
+    format_log = logging.Formatter("%(asctime)s %(message)s")
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(format_log)
+    log.addHandler(handler)
+    if log_file:
+        handler_file = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=maks_byte, backupCount=cadangan, encoding="utf-8"
+        )
+        handler_file.setFormatter(format_log)
+        log.addHandler(handler_file)
+
+
+class Stasiun:
+    """Pipeline serial → API satu workstation tanpa GUI"""
+
+    def __init__(self, ports, api_base=API_BASE, baudrate=BAUDRATE, outbox_path=OUTBOX_PATH,
+                 rekam_folder=None, rumus=RUMUS_DEFAULT, on_log=tulis_log, metrik=None,
+                 riwayat_path=RIWAYAT_PATH, stabil_mode=STABIL_MODE, stabil_jumlah=STABIL_JUMLAH):
+        self.ports = list(ports)
+        self.rumus = rumus
+        self.baudrate = baudrate
+        self.rekam_folder = rekam_folder
+        self.stabil_opsi = ({'mode': stabil_mode, 'jumlah': stabil_jumlah, 'toleransi': STABIL_TOLERANSI,
+                            'batas_tenang': STABIL_BATAS_TENANG}
+                            if stabil_mode else None)
+        self.on_log = on_log
+        self.metrik = metrik or Metrik()
+        self.api = ApiClient(api_base, timeout=SUBMIT_TIMEOUT, mode=TRANSPORT_MODE,
+                             connect_timeout=CONNECT_TIMEOUT, pool_maxsize=HTTP_POOL, retries=HTTP_RETRY,
+                             metrik=self.metrik)
+        self.pengirim = PengirimBatch(self.api, maks=BATCH_MAKS, tunggu_ms=BATCH_TUNGGU_MS,
+                                      workers=SUBMIT_WORKERS, on_log=on_log)
+        self.outbox = Outbox(outbox_path)
+        self.riwayat = Riwayat(riwayat_path, on_log=on_log)
+        self.indeks_duplikat = IndeksDuplikat(self.riwayat, jam_shift=JAM_SHIFT)
+        self.pemutar = PemutarUlang(self.outbox, self.api.kirim_batch, on_hasil=self._hasil_replay)
+        self.rekonsiliasi = Rekonsiliasi(self.api, self.riwayat, self.outbox, on_log=on_log,
+                                         interval=REKONSILIASI_INTERVAL, per_halaman=REKONSILIASI_PER_HALAMAN,
+                                         workers=REKONSILIASI_WORKERS, sejak_hari=REKONSILIASI_HARI,
+                                         metrik=self.metrik, maks_ulang=REKONSILIASI_MAKS_ULANG)
+        self.cache_kartu = CacheKartu(self.api, on_log=on_log, interval=CACHE_INTERVAL,
+                                      interval_penuh=CACHE_INTERVAL_PENUH, ttl=CACHE_TTL)
+        self.pengawas = None
+        self.selesai = threading.Event()
+        self.antrian = AntrianScan()    # kartu menunggu bacaan (FIFO), bacaan = (port, bacaan, t_baca)
+        self.jumlah_kirim = 0
+        self.jumlah_terkirim = 0
+
+    def mulai(self):
+        self.on_log(f"[APP] Mode headless, API: {self.api.base_url}")
+        self.on_log(f"[APP] Rumus rendemen {self.rumus.versi_lengkap}: {self.rumus.ekspresi_final}")
+        self.on_log(f"[DUPLIKAT] {self.indeks_duplikat.muat()} kartu sudah dikirim pada shift ini")
+        jumlah_outbox = self.outbox.jumlah_antri()
+        if jumlah_outbox:
+            self.on_log(f"[OUTBOX] {jumlah_outbox} data tertunda akan dikirim ulang")
+        self.pemutar.start()
+        self.cache_kartu.start()
+        self.rekonsiliasi.start()
+        self.pengawas = PengawasSerial(
+            self.ports, self.baudrate,
+            on_bacaan=self.terima_bacaan,
+            on_log=self.on_log,
+            on_status=self._status_pembaca,
+            opsi_pembaca={
+                'formats': FORMAT_SACCHAROMAT,
+                'rekam_folder': self.rekam_folder,
+                'rekam_opsi': {'maks_byte': REKAM_MAKS_BYTE, 'maks_file': REKAM_MAKS_FILE},
+                'metrik': self.metrik,
+                'stabil_opsi': self.stabil_opsi,
+            },
+            backoff_awal=SERIAL_BACKOFF_AWAL,
+            backoff_maks=SERIAL_BACKOFF_MAKS,
+            batas_diam=SERIAL_BATAS_DIAM
+        )
+        for port in self.ports:
+            self.on_log(f"[SERIAL] Menghidupkan koneksi serial ke {port}...")
+        self.pengawas.mulai()
+
+    def berhenti(self, tunggu=2.0):
+        statistik = self.pengawas.statistik() if self.pengawas else {}
+        if self.pengawas:
+            self.pengawas.berhenti(tunggu=tunggu)
+        self.pemutar.stop()
+        self.cache_kartu.stop()
+        self.rekonsiliasi.stop()
+        self.riwayat.tutup()
+        for port, (_, sambung_ulang, putus) in statistik.items():
+            if sambung_ulang or putus:
+                self.on_log(f"[SERIAL] [{port}] {sambung_ulang} kali sambung ulang, total putus {putus:.0f} s")
+        self.on_log(f"[APP] Berhenti: {self.jumlah_kirim} hasil dikirim, {self.jumlah_terkirim} diterima server, "
+                    f"{self.outbox.jumlah_antri()} di outbox")
+
+    def _status_pembaca(self, pengawas, port, status):
+        if self.selesai.is_set() or status != OFF:
+            return
+        if not pengawas.aktif:
+            self.on_log("[SERIAL] Semua pembaca serial berhenti")
+            self.selesai.set()
+
+    # --- pasangan kartu + bacaan ---
+
+    def terima_bacaan(self, pembaca, bacaan, t_baca):
+        self.riwayat.catat_bacaan(pembaca.port, bacaan)
+        pasangan = self.antrian.tambah_bacaan((pembaca.port, bacaan, t_baca))
+        if pasangan is not None:
+            self.metrik.amati("antrian_scan", pasangan.detik_tunggu * 1000)
+            self._kirim(pasangan.kartu_ari, *pasangan.bacaan)
+
+    def terima_kartu(self, kartu_ari):
+        kartu_ari = kartu_ari.strip()
+        if not kartu_ari:
+            return
+        if self.antrian.ada(kartu_ari):
+            self.metrik.tambah("scan", "ganda")
+            self.on_log(f"[ANTRIAN] Kartu {kartu_ari} sudah ada di antrian, scan diabaikan")
+            return
+        # Tanpa operator: kartu yang sudah dikirim pada shift ini langsung diblokir
+        duplikat = self.indeks_duplikat.periksa(kartu_ari)
+        if duplikat is not None:
+            if duplikat.shift_ini:
+                self.metrik.tambah("duplikat", "diblokir")
+                self.on_log(f"[DUPLIKAT] Error: {duplikat}, scan diabaikan")
+                return
+            self.metrik.tambah("duplikat", "ditandai")
+            self.on_log(f"[DUPLIKAT] {duplikat}, tetap dikirim")
+        try:
+            pasangan = self.antrian.tambah_kartu(kartu_ari)
+        except AntrianPenuh as e:
+            self.indeks_duplikat.lepas(kartu_ari)
+            self.on_log(f"[ANTRIAN] Error: {e}, kartu {kartu_ari} diabaikan")
+            return
+        if pasangan is None:
+            self.metrik.tambah("scan", "antri")
+            self.on_log(f"[ANTRIAN] Kartu {kartu_ari} menunggu bacaan Saccharomat ({len(self.antrian)} di antrian)")
+            return
+        self._kirim(kartu_ari, *pasangan.bacaan)
+
+    def _kirim(self, kartu_ari, port, bacaan, t_baca):
+        params = buat_params(kartu_ari, bacaan.pol_baca, bacaan.brix, bacaan.pol, rumus=self.rumus)
+        id_kartu = self.cache_kartu.cari(kartu_ari)
+        if id_kartu is not None:
+            params['id'] = id_kartu
+        self.on_log(f"[APP] Kartu {kartu_ari} [{port}]: Pol Baca={bacaan.pol_baca}, Brix={bacaan.brix}, "
+                    f"Pol={bacaan.pol}, Rendemen={params['rendemen_ari']}"
+                    + (f" (ID {id_kartu})" if id_kartu is not None else ""))
+        try:
+            outbox_id = self.outbox.tambah(params, instrumen=port)
+        except Exception as e:
+            outbox_id = None
+            self.on_log(f"[OUTBOX] Error: gagal menyimpan data: {e}")
+        riwayat_id = self.riwayat.catat_hasil(params, instrumen=port, outbox_id=outbox_id)
+        self.jumlah_kirim += 1
+        self.pengirim.kirim(params, lambda hasil: self._hasil_kirim(outbox_id, params, hasil, t_baca, riwayat_id))
+
+    def _hasil_kirim(self, outbox_id, params, hasil, t_baca, riwayat_id=None):
+        klasifikasi, pesan = (self.outbox.tandai_hasil(outbox_id, hasil) if outbox_id is not None
+                              else klasifikasi_hasil(hasil))
+        if riwayat_id is not None:
+            self.riwayat.tandai(riwayat_id, klasifikasi, pesan)
+        kartu_ari = params['kartu_ari']
+        self.metrik.tambah("kirim", klasifikasi)
+        latensi = f" ({self.metrik.amati_sejak('serial_respon', t_baca):.0f} ms sejak bacaan)" if t_baca else ""
+        if klasifikasi == HASIL_TERKIRIM:
+            self.jumlah_terkirim += 1
+            self.cache_kartu.hapus(kartu_ari)
+            self.on_log(f"[API] Kartu {kartu_ari} berhasil: {pesan}{latensi}")
+        elif klasifikasi == HASIL_DITOLAK:
+            self.indeks_duplikat.lepas(kartu_ari)
+            self.on_log(f"[API] Error: kartu {kartu_ari} ditolak: {pesan}")
+        else:
+            self.on_log(f"[OUTBOX] Kirim kartu {kartu_ari} gagal ({pesan}), dikirim ulang di background")
+
+    def _hasil_replay(self, row_id, params, klasifikasi, pesan):
+        if row_id is None:
+            self.on_log(f"[OUTBOX] {pesan}")
+            return
+        self.metrik.tambah("kirim_ulang", klasifikasi)
+        self.riwayat.tandai_outbox(row_id, klasifikasi, pesan)
+        if klasifikasi == HASIL_TERKIRIM:
+            self.cache_kartu.hapus(params['kartu_ari'])
+            self.on_log(f"[OUTBOX] Kartu ARI {params['kartu_ari']} berhasil dikirim ulang")
+        elif klasifikasi == HASIL_DITOLAK:
+            self.indeks_duplikat.lepas(params['kartu_ari'])
+            self.on_log(f"[OUTBOX] Kartu ARI {params['kartu_ari']} ditolak server: {pesan}")
+
+
+def baca_kartu(sumber, stasiun):
+    """Thread pembaca nomor kartu: '-' = stdin, path lain = file/FIFO (dibuka ulang saat EOF)"""
+    if sumber == "-":
+        for line in sys.stdin:
+            stasiun.terima_kartu(line)
+        return
+    while not stasiun.selesai.is_set():
+        try:
+            with open(sumber, encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    stasiun.terima_kartu(line)
+        except OSError as e:
+            stasiun.on_log(f"[APP] Error: tidak bisa membaca kartu dari {sumber}: {e}")
+            stasiun.selesai.wait(5)
+            continue
+        if not os.path.exists(sumber) or not _adalah_fifo(sumber):
+            return
+
+
+def _adalah_fifo(path):
+    return stat.S_ISFIFO(os.stat(path).st_mode)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", action="append", required=True,
+                        help="port serial Saccharomat (boleh berulang, replay:FILE untuk uji)")
+    parser.add_argument("--baud", type=int, default=BAUDRATE)
+    parser.add_argument("--api", default=API_BASE, help="URL input_ari_from_python.php")
+    parser.add_argument("--kartu", default="-", help="sumber nomor kartu per baris: '-' = stdin, atau file/FIFO")
+    parser.add_argument("--outbox", default=OUTBOX_PATH, help="file SQLite outbox")
+    parser.add_argument("--riwayat", default=RIWAYAT_PATH, help="file SQLite riwayat bacaan dan hasil")
+    parser.add_argument("--stabil", default=STABIL_MODE or "mati", choices=MODE_STABIL + ("mati",),
+                        help="penyaring bacaan stabil (satu bacaan per sampel), 'mati' = setiap baris valid")
+    parser.add_argument("--stabil-jumlah", type=int, default=STABIL_JUMLAH,
+                        help="jumlah bacaan yang harus sepakat sebelum diteruskan")
+    parser.add_argument("--rekam", action="store_true", help="rekam byte mentah serial ke folder rekaman")
+    parser.add_argument("--rumus", default=RUMUS_AKTIF, help="nama rumus rendemen di --rumus-file")
+    parser.add_argument("--rumus-file", default=RUMUS_FILE, help="file JSON rumus rendemen")
+    parser.add_argument("--log-level", default="INFO", choices=sorted(NAMA_LEVEL))
+    parser.add_argument("--log-file", help="tulis log juga ke file ini (dirotasi)")
+    parser.add_argument("--metrik-file", default=METRIK_FILE, help="tulis metrik Prometheus ke file ini")
+    parser.add_argument("--metrik-port", type=int, default=METRIK_PORT, help="port endpoint HTTP /metrics, 0 = nonaktif")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    atur_logging(args.log_level, args.log_file)
+    try:
+        rumus = muat_rumus(args.rumus_file, args.rumus)
+    except (OSError, ValueError) as e:
+        # Tanpa operator yang bisa memeriksa, lebih aman berhenti daripada memakai rumus lain
+        tulis_log(f"[APP] Error rumus rendemen: {e}")
+        return 2
+
+    stasiun = Stasiun(args.port, api_base=args.api, baudrate=args.baud, outbox_path=args.outbox,
+                      rekam_folder=REKAM_FOLDER if args.rekam else None, rumus=rumus,
+                      riwayat_path=args.riwayat,
+                      stabil_mode=None if args.stabil == "mati" else args.stabil, stabil_jumlah=args.stabil_jumlah)
+
+    def sinyal_berhenti(signum, frame):
+        tulis_log(f"[APP] Sinyal {signal.Signals(signum).name}, menghentikan...")
+        stasiun.selesai.set()
+
+    signal.signal(signal.SIGINT, sinyal_berhenti)
+    signal.signal(signal.SIGTERM, sinyal_berhenti)
+
+    ekspor = None
+    if args.metrik_file or args.metrik_port:
+        ekspor = EksporMetrik(stasiun.metrik, path=args.metrik_file, port=args.metrik_port,
+                              interval=METRIK_INTERVAL, on_log=tulis_log)
+        ekspor.mulai()
+
+    stasiun.mulai()
+    threading.Thread(target=baca_kartu, args=(args.kartu, stasiun), name="kartu", daemon=True).start()
+
+    # Event.wait dengan timeout agar sinyal tetap diproses di main thread (Windows)
+    while not stasiun.selesai.wait(1.0):
+        pass
+    stasiun.berhenti()
+    if ekspor is not None:
+        ekspor.stop()
+        if ekspor.is_alive():
+            ekspor.join(2.0)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
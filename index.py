@@ -1,12 +1,46 @@
+import sys
+
+# Mode headless (tanpa Tk): cek sebelum tkinter diimpor
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    from headless import main
+    sys.exit(main([a for a in sys.argv[1:] if a != "--headless"]))
+
+# Startup: jendela ditampilkan dulu, modul berat (requests, serial.tools.list_ports,
+# sqlite3) dimuat di thread latar / setelah jendela tampil. Lihat --profile-startup.
+from profil import ProfilStartup
+profil = ProfilStartup(aktif="--profile-startup" in sys.argv[1:])
+
 import tkinter as tk
 from tkinter import ttk, messagebox
-import requests
-import serial
-import threading
-import serial.tools.list_ports
-import re
+profil.tandai("import tkinter")
 import os
-import sys
+import threading
+import time
+import argparse
+from api_client import ApiClient, PengirimBatch
+from cache_kartu import CacheKartu
+from config import (API_BASE, SUBMIT_TIMEOUT, CONNECT_TIMEOUT, HTTP_POOL, HTTP_RETRY, SUBMIT_WORKERS,
+                    TRANSPORT_MODE, BATCH_MAKS, BATCH_TUNGGU_MS, CACHE_INTERVAL, CACHE_INTERVAL_PENUH,
+                    CACHE_TTL, OUTBOX_PATH, BAUDRATE, FORMAT_SACCHAROMAT, REKAM_FOLDER, REKAM_MAKS_BYTE,
+                    REKAM_MAKS_FILE, RUMUS_FILE, RUMUS_AKTIF, SERIAL_BACKOFF_AWAL, SERIAL_BACKOFF_MAKS,
+                    SERIAL_BATAS_DIAM, METRIK_FILE, METRIK_PORT, METRIK_INTERVAL, RIWAYAT_PATH,
+                    JAM_SHIFT, STABIL_MODE, STABIL_JUMLAH, STABIL_TOLERANSI, REKONSILIASI_INTERVAL,
+                    REKONSILIASI_PER_HALAMAN, REKONSILIASI_WORKERS, REKONSILIASI_HARI,
+                    REKONSILIASI_MAKS_ULANG, STABIL_BATAS_TENANG)
+from konsol import KonsolLog, LEVEL_DEBUG, NAMA_LEVEL
+from replay import buat_port_replay
+from pengawas import PengawasSerial, OFF
+from pemantau_port import PemantauPort
+from rendemen import buat_params
+from rumus import muat_rumus, RUMUS_DEFAULT
+from outbox import Outbox, PemutarUlang, klasifikasi_hasil, HASIL_TERKIRIM, HASIL_DITOLAK, HASIL_ULANG
+from metrik import Metrik, EksporMetrik
+from riwayat import Riwayat
+from duplikat import IndeksDuplikat
+from form_bacaan import FormBacaan
+from rekonsiliasi import Rekonsiliasi
+from antrian_scan import AntrianScan, AntrianPenuh
+profil.tandai("import modul aplikasi")
 
 # === ICON SETUP ===
 # Coba load icon untuk window (hanya untuk GUI, bukan untuk EXE)
@@ -28,214 +62,293 @@ try:
 except:
     icon_available = False
 
-API_BASE = "http://192.168.29.231/silab-v4/input_ari_from_python.php"
-
-# === SERIAL CONFIG ===
+# Konfigurasi API, outbox, serial, dan rekam ada di config.py (dipakai juga mode headless)
+
+# === LOG CONFIG ===
+LOG_LEVEL = "INFO"      # "DEBUG" untuk menampilkan baris [DEBUG] Parts/Parsed
+LOG_MAKS_BARIS = 2000   # baris console yang disimpan, terlama dibuang
+LOG_FLUSH_MS = 50       # interval penulisan antrian log ke widget
+
+# === SUBMIT ===
+MAX_BARIS_KIRIM = 50        # riwayat pengiriman yang ditampilkan
+metrik = Metrik()           # latensi per tahap + counter, diekspor format Prometheus (metrik.py)
+api = ApiClient(API_BASE, timeout=SUBMIT_TIMEOUT, mode=TRANSPORT_MODE, connect_timeout=CONNECT_TIMEOUT,
+                pool_maxsize=HTTP_POOL, retries=HTTP_RETRY, metrik=metrik)
+pengirim = PengirimBatch(api, maks=BATCH_MAKS, tunggu_ms=BATCH_TUNGGU_MS, workers=SUBMIT_WORKERS,
+                         on_log=lambda line: append_raw_response(line))
+submit_seq = 0
+
+# === OUTBOX ===
+OUTBOX_REFRESH_MS = 1000
+outbox = None           # dibuka di mulai_layanan() setelah jendela tampil
+pemutar_outbox = None
+rekonsiliasi = None     # cocokkan riwayat terkirim dengan server, dimulai di mulai_layanan()
+
+# === RIWAYAT ===
+riwayat = None          # Riwayat lokal, dibuka di mulai_layanan()
+HALAMAN_RIWAYAT = 100   # baris per halaman di jendela riwayat
+jendela_riwayat = None
+indeks_duplikat = IndeksDuplikat(jam_shift=JAM_SHIFT)   # diisi dari riwayat di mulai_layanan()
+
+# === SERIAL ===
 SERIAL_PORT = "COM5"   # nilai default
-BAUDRATE = 9600
-serial_thread = None
-ser = None
-serial_running = False
+pengawas = None         # PengawasSerial selama serial ON (sambung ulang otomatis per port)
+port_terdeteksi = None  # daftar port dari PemantauPort (None = belum selesai enumerasi pertama)
+daftar_instrumen = []   # port instrumen yang dipakai (bisa lebih dari satu Saccharomat)
+instrumen_form = None   # port asal bacaan yang sedang tampil di form
+rekam_aktif = False
+# Bacaan stabil yang belum diproses main thread, urut kedatangan: satu root.after untuk semua.
+# Setiap bacaan dipasangkan dengan antrian scan; yang ditampilkan hanya bacaan terbaru per port.
+bacaan_tertunda = []
+lock_bacaan_tertunda = threading.Lock()
+
+# Waktu (perf_counter) saat baris serial yang sedang tampil di form diterima
+t_bacaan_form = None
+
+# Kartu yang di-scan sebelum bacaannya ada, dipasangkan FIFO dengan bacaan stabil berikutnya
+antrian_scan = AntrianScan()
 
 # Variabel untuk menyimpan data yang belum diisi
 pending_data = []
 current_data_index = 0
 
-def get_available_ports():
-    """Mendapatkan daftar port serial yang tersedia"""
-    ports = serial.tools.list_ports.comports()
-    return [port.device for port in ports]
+# === ARGUMEN COMMAND LINE ===
+def parse_args():
+    parser = argparse.ArgumentParser(description="Aplikasi Analisa Rendemen Individu")
+    parser.add_argument("--replay", action="append", default=[],
+                        help="putar ulang file rekaman serial sebagai port (uji tanpa instrumen), boleh berulang")
+    parser.add_argument("--replay-baud", type=int, default=BAUDRATE, help="emulasi laju byte replay, 0 = secepat mungkin")
+    parser.add_argument("--replay-ulang", type=int, default=1, help="putar rekaman sekian kali, 0 = tanpa batas")
+    parser.add_argument("--replay-asli", action="store_true", help="ikuti jeda waktu asli rekaman .arirec")
+    parser.add_argument("--rekam", action="store_true", help="aktifkan rekam byte mentah serial sejak awal")
+    parser.add_argument("--rumus", default=RUMUS_AKTIF, help=f"nama rumus rendemen di {os.path.basename(RUMUS_FILE)}")
+    parser.add_argument("--metrik-file", default=METRIK_FILE, help="tulis metrik Prometheus ke file ini")
+    parser.add_argument("--metrik-port", type=int, default=METRIK_PORT, help="port endpoint HTTP /metrics, 0 = nonaktif")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="tampilkan rincian waktu impor dan inisialisasi saat start")
+    args, _ = parser.parse_known_args()
+    return args
+
+args = parse_args()
+PORT_TAMBAHAN = []   # port non-hardware (replay) yang ikut tampil di combobox
+for path_replay in args.replay:
+    PORT_TAMBAHAN.append(buat_port_replay(path_replay, args.replay_baud, args.replay_ulang, args.replay_asli))
+rekam_aktif = args.rekam
+
+# Rumus rendemen dikompilasi sekali saat start; jika file rumus rusak pakai rumus standar
+try:
+    RUMUS = muat_rumus(RUMUS_FILE, args.rumus)
+    rumus_error = None
+except (OSError, ValueError) as e:
+    RUMUS = RUMUS_DEFAULT
+    rumus_error = e
+
+def port_berubah(ports, ditambah, dihapus):
+    """Callback PemantauPort (thread pemantau) → teruskan ke main thread"""
+    root.after(0, lambda: perubahan_port(ports, ditambah, dihapus))
+
+def perubahan_port(ports, ditambah, dihapus):
+    """Perbarui combobox dan nyalakan ulang pembaca yang adapternya dicolok kembali"""
+    global port_terdeteksi
+    pertama = port_terdeteksi is None
+    port_terdeteksi = ports
+    isi_daftar_port(ports + PORT_TAMBAHAN)
+    if pertama:
+        profil.catat("enumerasi port", t_mulai_pemantau)
+        append_raw_response(f"[PORT] {len(ports)} port serial terdeteksi: {', '.join(ports) or '-'}")
+        return
+
+    for port in dihapus:
+        append_raw_response(f"[PORT] {port} dicabut")
+    for port in ditambah:
+        append_raw_response(f"[PORT] {port} terpasang")
+        if pengawas is not None:
+            # Adapter dicolok kembali: tidak perlu menunggu jeda backoff
+            pengawas.coba_sekarang(port)
 
-def update_port_list():
-    """Memperbarui daftar port di combobox"""
-    available_ports = get_available_ports()
+def isi_daftar_port(available_ports):
+    """Memperbarui daftar port di combobox (pilihan operator dipertahankan)"""
     combo_port['values'] = available_ports
-    
-    # Jika port default tersedia, pilih itu
-    if SERIAL_PORT in available_ports:
+    if combo_port.get() in available_ports:
+        return
+
+    # Port replay dari command line didahulukan, lalu port default
+    if PORT_TAMBAHAN:
+        combo_port.set(PORT_TAMBAHAN[0])
+    elif SERIAL_PORT in available_ports:
         combo_port.set(SERIAL_PORT)
     elif available_ports:
         combo_port.set(available_ports[0])
     else:
         combo_port.set("")
 
-def extract_number_from_pattern(pattern_str):
+def terima_bacaan(pembaca, bacaan, t_baca):
+    """Callback PembacaSerial (thread serial) → teruskan ke main thread"""
+    if riwayat is not None:
+        riwayat.catat_bacaan(pembaca.port, bacaan)
+    with lock_bacaan_tertunda:
+        jadwalkan = not bacaan_tertunda
+        bacaan_tertunda.append((pembaca.port, bacaan, t_baca))
+    if jadwalkan:
+        root.after(0, tampilkan_bacaan_tertunda)
+
+def tampilkan_bacaan_tertunda():
     """
-    Jika mengandung '*' → dianggap tidak valid → return 0.0
+    Pasangkan setiap bacaan yang masuk sejak jadwal terakhir dengan antrian scan (urut kedatangan,
+    sebelum digabung), lalu tampilkan bacaan terbaru per port. Antrian, form, dan pilihan instrumen
+    hanya disentuh main thread, jadi urutan bacaan dan scan kartu tidak bisa tertukar.
     """
-    if not pattern_str:
-        return 0.0
-
-    # Jika ada tanda '*' → INVALID
-    if '*' in pattern_str:
-        return 0.0
-
-    # Cari angka valid
-    match = re.search(r'-?\d+(\.\d+)?', pattern_str)
-    if match:
-        try:
-            return float(match.group())
-        except ValueError:
-            return 0.0
-
-    return 0.0
-
-def baca_serial():
-    """Thread untuk membaca data dari Saccharomat"""
-    global ser, serial_running
-    selected_port = combo_port.get()
-    
-    if not selected_port:
-        append_raw_response("[SERIAL] Error: Pilih port COM terlebih dahulu!")
+    with lock_bacaan_tertunda:
+        tertunda = bacaan_tertunda[:]
+        bacaan_tertunda.clear()
+
+    # Tanpa pilihan di tabel, form mengikuti bacaan terbaru dari instrumen mana pun
+    dipilih = instrumen_dipilih()
+    pasangkan = True
+    terbaru = {}    # port -> (bacaan, t_baca, ke_form)
+    for port, bacaan, t_baca in tertunda:
+        ke_form = dipilih is None or dipilih == port
+        if ke_form and pasangkan and len(antrian_scan):
+            if kirim_pasangan(port, bacaan, t_baca):
+                terbaru[port] = (bacaan, t_baca, False)
+                continue
+            # Gagal kirim: kartu tetap di antrian, sisa bacaan ke form dan operator yang memutuskan
+            pasangkan = False
+        lama = terbaru.get(port)
+        if lama is not None and lama[2]:
+            metrik.tambah("form", "bacaan_ditimpa")
+        terbaru[port] = (bacaan, t_baca, ke_form)
+
+    for port, (bacaan, t_baca, ke_form) in terbaru.items():
+        tampilkan_bacaan(port, bacaan, t_baca, ke_form)
+
+def tampilkan_bacaan(port, bacaan, t_baca, ke_form=True):
+    """Perbarui tabel instrumen, dan form jika bacaan belum terkirim lewat antrian scan"""
+    if tree_instrumen.exists(port):
+        pembaca = pengawas.pembaca(port) if pengawas else None
+        tree_instrumen.item(port, values=(
+            port, "ON", bacaan.pol_baca, bacaan.brix, bacaan.pol,
+            pembaca.jumlah_stabil if pembaca else ""
+        ))
+    if ke_form:
+        update_entries(bacaan.pol_baca, bacaan.brix, bacaan.pol, t_baca, port)
+
+def status_pembaca(sumber, port, status):
+    """Callback PengawasSerial saat status port berubah (thread pengawas/serial)"""
+    root.after(0, lambda: ubah_status_pembaca(sumber, port, status))
+
+def ubah_status_pembaca(sumber, port, status):
+    """Tampilkan status port dan matikan tombol jika semua pembaca selesai"""
+    global pengawas
+    if sumber is not pengawas:
+        return      # status dari pengawas lama yang sudah dimatikan
+    set_status_instrumen(port, status)
+    if status == OFF and not pengawas.aktif:
+        # Semua pembaca selesai tanpa error (mis. replay habis)
+        pengawas.berhenti()
+        pengawas = None
+        set_tombol_serial(False)
+
+def instrumen_dipilih():
+    """Port instrumen yang dipilih di tabel (None jika tidak ada)"""
+    selection = tree_instrumen.selection()
+    return selection[0] if selection else None
+
+def set_status_instrumen(port, status):
+    if tree_instrumen.exists(port):
+        tree_instrumen.set(port, "status", status)
+
+def pilih_instrumen(event=None):
+    """Saat instrumen dipilih, tampilkan bacaan terakhirnya di form"""
+    port = instrumen_dipilih()
+    pembaca = pengawas.pembaca(port) if pengawas else None
+    if pembaca and pembaca.bacaan_terakhir:
+        b = pembaca.bacaan_terakhir
+        update_entries(b.pol_baca, b.brix, b.pol, None, port)
+
+def tambah_instrumen():
+    """Tambahkan port di combobox ke daftar instrumen"""
+    port = combo_port.get()
+    if not port:
+        messagebox.showerror("Error", "Pilih port COM terlebih dahulu!")
         return
-    
-    try:
-        ser = serial.Serial(selected_port, BAUDRATE, timeout=1)
-        serial_running = True
-        append_raw_response(f"[SERIAL] Koneksi berhasil ke {selected_port}")
-    except Exception as e:
-        append_raw_response(f"[SERIAL] Gagal buka serial: {e}")
-        serial_running = False
-        root.after(0, lambda: btn_serial.config(text="Start: OFF", style="Danger.TButton"))
+    if port in daftar_instrumen:
         return
-
-    while serial_running:
-        try:
-            line = ser.readline().decode(errors="ignore").strip()
-            if not line:
-                continue
-
-            # tampilkan raw line ke text_raw
-            root.after(0, lambda l=line: append_raw_response(f"[SERIAL] {l}"))
-
-            # split berdasarkan spasi
-            parts = line.split()
-            
-            # Debug: tampilkan parts
-            append_raw_response(f"[DEBUG] Parts: {parts}")
-            
-            # Coba parsing format yang ada
-            if len(parts) >= 4:
-                # Format: "69.78  -0.01  *90****  *90***"
-                try:
-                    # Ambil angka pertama (69.78) untuk Pol Baca
-                    pol_baca_val = float(parts[0])
-                    
-                    # Ambil angka kedua (-0.01) untuk Brix
-                    brix_val = float(parts[1])
-                    
-                    # Untuk Pol, coba ekstrak dari pola *90**** atau *90***
-                    pol_val = float(parts[2])
-                    
-                    append_raw_response(f"[DEBUG] Parsed: Pol Baca={pol_baca_val}, Brix={brix_val}, Pol={pol_val}")
-                    
-                    # Update entries
-                    root.after(0, lambda pb=pol_baca_val, b=brix_val, p=pol_val: update_entries(pb, b, p))
-                    
-                except (ValueError, IndexError) as e:
-                    append_raw_response(f"[DEBUG] Error parsing: {e}")
-                    
-            elif len(parts) >= 3:
-                # Coba format alternatif
-                numbers = []
-                for p in parts:
-                    try:
-                        numbers.append(float(p))
-                    except ValueError:
-                        continue
-                
-                if len(numbers) >= 2:
-                    # Asumsi: angka pertama adalah Pol Baca, kedua adalah Brix
-                    pol_baca_val = numbers[0]
-                    brix_val = numbers[1]
-                    pol_val = numbers[2]
-                    
-                    root.after(0, lambda pb=pol_baca_val, b=brix_val, p=pol_val: update_entries(pb, b, p))
-                    append_raw_response(f"[DEBUG] Numbers parsed: Pol Baca={pol_baca_val}, Brix={brix_val}, Pol={pol_val}")
-
-        except Exception as e:
-            if serial_running:  # Hanya tampilkan error jika masih running
-                append_raw_response(f"[SERIAL] Error: {e}")
-            break
-    
-    # Jika keluar dari loop, tutup koneksi
-    if ser and ser.is_open:
-        ser.close()
+    daftar_instrumen.append(port)
+    tree_instrumen.insert("", tk.END, iid=port, values=(port, "OFF", "", "", "", 0))
+    append_raw_response(f"[SERIAL] Instrumen {port} ditambahkan ({len(daftar_instrumen)} instrumen)")
+
+def hapus_instrumen():
+    """Hapus instrumen yang dipilih dari daftar (hanya saat serial OFF)"""
+    port = instrumen_dipilih()
+    if not port:
+        return
+    if pengawas is not None:
+        messagebox.showerror("Error", "Matikan serial sebelum menghapus instrumen!")
+        return
+    daftar_instrumen.remove(port)
+    tree_instrumen.delete(port)
 
 def append_raw_response(line):
-    """Tambahkan baris baru ke Raw Response"""
-    text_raw.config(state="normal")
-    text_raw.insert(tk.END, line + "\n")
-    text_raw.see(tk.END)  # auto scroll ke bawah
-    text_raw.config(state="disabled")
+    """Tambahkan baris baru ke Raw Response (aman dipanggil dari thread serial/worker)"""
+    konsol.tulis(line)
+
+def toggle_debug_log():
+    """Tampilkan/sembunyikan baris [DEBUG] di console"""
+    konsol.set_level(LEVEL_DEBUG if var_debug.get() else NAMA_LEVEL[LOG_LEVEL])
 
-def update_entries(pol_baca_val, brix_val, pol_val):
+def update_entries(pol_baca_val, brix_val, pol_val, t_baca=None, instrumen=None):
     """Update entry fields dengan data dari serial"""
-    # Pol Baca
-    entry_pol_baca.config(state="normal")
-    entry_pol_baca.delete(0, tk.END)
-    entry_pol_baca.insert(0, str(pol_baca_val))
-    entry_pol_baca.config(state="readonly")
-
-    # Brix
-    entry_brix.config(state="normal")
-    entry_brix.delete(0, tk.END)
-    entry_brix.insert(0, str(brix_val))
-    entry_brix.config(state="readonly")
-
-    # Pol
-    entry_pol.config(state="normal")
-    entry_pol.delete(0, tk.END)
-    entry_pol.insert(0, str(pol_val))
-    entry_pol.config(state="readonly")
+    global t_bacaan_form, instrumen_form
+    # Nilai masuk model form; widget yang berubah digambar ulang di frame berikutnya
+    form_bacaan.atur(pol_baca=pol_baca_val, brix=brix_val, pol=pol_val)
 
     # Hitung rendemen otomatis
     hitung_rendemen()
 
+    # Tandai instrumen asal bacaan
+    if instrumen != instrumen_form:
+        lbl_instrumen.config(text=instrumen or "-")
+    instrumen_form = instrumen
+
+    # Latensi dari baris serial diterima sampai form terisi (repaint paling lambat satu frame kemudian)
+    t_bacaan_form = t_baca
+    if t_baca is not None:
+        append_raw_response(f"[DEBUG] Latensi serial→form: {metrik.amati_sejak('serial_form', t_baca):.1f} ms")
+
 def hitung_rendemen(*args):
     try:
-        brix_val = float(entry_brix.get())
-        pol_val = float(entry_pol.get())
+        brix_val = float(form_bacaan.teks("brix"))
+        pol_val = float(form_bacaan.teks("pol"))
     except ValueError:
         # Jika belum valid angka, kosongkan rendemen
-        entry_rendemen.config(state="normal")
-        entry_rendemen.delete(0, tk.END)
-        entry_rendemen.config(state="readonly")
+        form_bacaan.atur(rendemen="")
         return
+    try:
+        pol_baca_val = float(form_bacaan.teks("pol_baca"))
+    except ValueError:
+        pol_baca_val = 0.0
 
-    rendemen_val = 0.7 * (pol_val - 0.5 * (brix_val - pol_val))
-    rendemen_str = f"{rendemen_val:.2f}"
-
-    entry_rendemen.config(state="normal")
-    entry_rendemen.delete(0, tk.END)
-    entry_rendemen.insert(0, rendemen_str)
-    entry_rendemen.config(state="readonly")
+    rendemen_val = RUMUS.hitung(brix_val, pol_val, pol_baca_val)
+    form_bacaan.atur(rendemen=f"{rendemen_val:.2f}")
 
 def load_pending_data():
-    """Memuat data yang belum diisi dari API"""
+    """Memuat data yang belum diisi (refresh penuh cache kartu pending)"""
     global pending_data, current_data_index
     
     try:
         append_raw_response("[APP] Memuat data yang belum diisi...")
-        response = requests.get(API_BASE, timeout=5)
+        cache_kartu.refresh(penuh=True)
+        pending_data = cache_kartu.daftar()
+        current_data_index = 0
         
-        if response.status_code == 200:
-            data = response.json()
-            if data['status'] == 'success':
-                pending_data = data['data']
-                current_data_index = 0
-                
-                if pending_data:
-                    # Tampilkan data pertama
-                    show_current_data()
-                    append_raw_response(f"[APP] {len(pending_data)} data ditemukan")
-                else:
-                    append_raw_response("[APP] Tidak ada data yang belum diisi")
-                    entry_nomor_gelas.delete(0, tk.END)
-            else:
-                append_raw_response(f"[APP] Error: {data.get('message', 'Unknown error')}")
+        if pending_data:
+            # Tampilkan data pertama
+            show_current_data()
+            append_raw_response(f"[APP] {len(pending_data)} data ditemukan")
         else:
-            append_raw_response(f"[APP] Error: Status {response.status_code}")
+            append_raw_response("[APP] Tidak ada data yang belum diisi")
+            entry_nomor_gelas.delete(0, tk.END)
             
     except Exception as e:
         append_raw_response(f"[APP] Error loading data: {e}")
@@ -334,25 +447,220 @@ def show_api_alert(title, message):
     # Fokus ke tombol OK
     alert_window.after(100, btn_ok.focus)
 
-def submit_action():
-    """Kirim data ke API"""
-    global pending_data, current_data_index
+def buka_riwayat():
+    """Jendela riwayat hasil: halaman dimuat dari database lokal saat tabel digulir"""
+    global jendela_riwayat
+    if riwayat is None:
+        messagebox.showerror("Error", "Aplikasi masih memuat, coba lagi sebentar")
+        return
+    if jendela_riwayat is not None and jendela_riwayat.winfo_exists():
+        jendela_riwayat.lift()
+        return
+
+    jendela = tk.Toplevel(root)
+    jendela.title("Riwayat Hasil ARI")
+    jendela.geometry("980x460")
+    jendela_riwayat = jendela
+
+    frame_cari = ttk.Frame(jendela, padding=(10, 10, 10, 0))
+    frame_cari.pack(fill=tk.X)
+    ttk.Label(frame_cari, text="Kartu ARI:").pack(side=tk.LEFT)
+    entry_cari = ttk.Entry(frame_cari, width=15)
+    entry_cari.pack(side=tk.LEFT, padx=5)
+    btn_cari = ttk.Button(frame_cari, text="Cari", width=8)
+    btn_cari.pack(side=tk.LEFT)
+    lbl_jumlah = ttk.Label(frame_cari, text="")
+    lbl_jumlah.pack(side=tk.RIGHT)
+
+    frame_tabel = ttk.Frame(jendela, padding=10)
+    frame_tabel.pack(fill=tk.BOTH, expand=True)
+    kolom_riwayat = (("waktu", "Waktu", 140), ("kartu", "Kartu ARI", 80), ("instrumen", "Instrumen", 90),
+                     ("pol_baca", "Pol Baca", 65), ("brix", "Brix", 55), ("pol", "Pol", 55),
+                     ("rendemen", "Rendemen", 70), ("rumus", "Rumus", 80), ("status", "Status", 70),
+                     ("pesan", "Pesan", 220))
+    tree = ttk.Treeview(frame_tabel, columns=[k[0] for k in kolom_riwayat], show="headings")
+    for kolom, judul, lebar in kolom_riwayat:
+        tree.heading(kolom, text=judul)
+        tree.column(kolom, width=lebar, anchor="w" if kolom == "pesan" else "center")
+    tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    scrollbar = ttk.Scrollbar(frame_tabel, command=tree.yview)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    # id_terakhir: keyset halaman berikutnya; habis: semua baris sudah dimuat
+    state = {'id_terakhir': None, 'habis': False, 'memuat': False, 'kartu': ""}
+
+    def muat_halaman():
+        state['memuat'] = False
+        if state['habis'] or not jendela.winfo_exists():
+            return
+        mulai = time.perf_counter()
+        rows = riwayat.halaman_hasil(state['id_terakhir'], HALAMAN_RIWAYAT, state['kartu'])
+        for r in rows:
+            tree.insert("", tk.END, iid=str(r['id']), values=(
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r['waktu'])), r['kartu_ari'],
+                r['instrumen'] or "", r['pol_baca'], r['brix'], r['pol'],
+                "" if r['rendemen'] is None else f"{r['rendemen']:.2f}",
+                r['versi_rumus'] or "", r['status'], r['pesan'] or ""
+            ))
+        if rows:
+            state['id_terakhir'] = rows[-1]['id']
+        state['habis'] = len(rows) < HALAMAN_RIWAYAT
+        jumlah = len(tree.get_children())
+        lbl_jumlah.config(text=f"{jumlah} baris" + ("" if state['habis'] else " (gulir untuk memuat lagi)"))
+        append_raw_response(f"[DEBUG] [RIWAYAT] Halaman {len(rows)} baris dalam {(time.perf_counter() - mulai) * 1000:.1f} ms")
+
+    def gulir(awal, akhir):
+        scrollbar.set(awal, akhir)
+        # Mendekati baris terakhir yang sudah dimuat → ambil halaman berikutnya
+        if float(akhir) > 0.9 and not state['habis'] and not state['memuat']:
+            state['memuat'] = True
+            jendela.after_idle(muat_halaman)
+
+    def cari(event=None):
+        tree.delete(*tree.get_children())
+        state.update(id_terakhir=None, habis=False, kartu=entry_cari.get().strip())
+        muat_halaman()
+
+    tree.config(yscrollcommand=gulir)
+    btn_cari.config(command=cari)
+    entry_cari.bind("<Return>", cari)
+    jendela.bind("<Escape>", lambda e: jendela.destroy())
+    entry_cari.focus()
+    muat_halaman()
+
+def rekonsiliasi_sekarang():
+    """Tombol Rekonsiliasi: cocokkan riwayat dengan server di thread latar"""
+    if rekonsiliasi is None:
+        messagebox.showerror("Error", "Riwayat/outbox belum siap, rekonsiliasi tidak tersedia")
+        return
+    append_raw_response("[REKONSILIASI] Mencocokkan hasil terkirim dengan server...")
+    rekonsiliasi.jalankan_sekarang()
+
+def antri_kartu(kartu_ari):
+    """
+    Scan tanpa bacaan di form: simpan kartu di antrian scan. Duplikat diperiksa saat scan
+    (seperti mode headless), sehingga dialog konfirmasi tidak menahan pemasangan bacaan;
+    kartu di antrian tetap tercatat di indeks duplikat sampai terkirim atau dibatalkan.
+    """
+    entry_nomor_gelas.delete(0, tk.END)
+    if antrian_scan.ada(kartu_ari):
+        metrik.tambah("scan", "ganda")
+        root.bell()
+        append_raw_response(f"[ANTRIAN] Kartu {kartu_ari} sudah ada di antrian, scan diabaikan")
+        return
+    if not konfirmasi_duplikat(kartu_ari):
+        return
+    try:
+        antrian_scan.tambah_kartu(kartu_ari)
+    except AntrianPenuh as e:
+        indeks_duplikat.lepas(kartu_ari)
+        messagebox.showerror("Antrian Scan", f"{e}.\nKartu {kartu_ari} tidak disimpan.")
+        return
+    metrik.tambah("scan", "antri")
+    perbarui_antrian()
+    append_raw_response(f"[ANTRIAN] Kartu {kartu_ari} menunggu bacaan Saccharomat ({len(antrian_scan)} di antrian)")
+
+def kirim_pasangan(port, bacaan, t_baca):
+    """
+    Pasangkan bacaan stabil dengan kartu terlama di antrian lalu kirim tanpa lewat form
+    (duplikat sudah diperiksa di antri_kartu). Jika kiriman gagal, catatan kartu di indeks
+    duplikat dilepas dan kartu dikembalikan ke depan antrian.
+    Return True jika terkirim ke worker (False: bacaan ditampilkan di form).
+    """
+    item = antrian_scan.ambil_kartu()
+    if item is None:
+        return False
+    kartu_ari, detik_tunggu = item
+    perbarui_antrian()
+    if not submit_action(kartu_ari, bacaan=bacaan, instrumen=port, t_baca=t_baca, periksa_duplikat=False):
+        # Belum terkirim: jangan sampai pemasangan berikutnya dianggap duplikat
+        indeks_duplikat.lepas(kartu_ari)
+        if antrian_scan.kembalikan(kartu_ari, detik_tunggu):
+            append_raw_response(f"[ANTRIAN] Kartu {kartu_ari} gagal dikirim, dikembalikan ke depan antrian")
+        perbarui_antrian()
+        return False
+    metrik.amati("antrian_scan", detik_tunggu * 1000)
+    append_raw_response(f"[ANTRIAN] Kartu {kartu_ari} dipasangkan dengan bacaan {port} "
+                        f"(menunggu {detik_tunggu:.0f} s, sisa {len(antrian_scan)})")
+    return True
+
+def perbarui_antrian():
+    """Tampilkan isi antrian scan (terlama di atas)"""
+    daftar = antrian_scan.daftar()
+    list_antrian.delete(0, tk.END)
+    if daftar:
+        list_antrian.insert(tk.END, *daftar)
+    frame_antrian.config(text=f"Antrian Scan ({len(daftar)})")
+
+def hapus_dari_antrian():
+    """Tombol Hapus: batalkan kartu yang dipilih di antrian scan"""
+    for indeks in reversed(list_antrian.curselection()):
+        kartu_ari = list_antrian.get(indeks)
+        if antrian_scan.hapus(kartu_ari):
+            indeks_duplikat.lepas(kartu_ari)
+            append_raw_response(f"[ANTRIAN] Kartu {kartu_ari} dihapus dari antrian")
+    perbarui_antrian()
+
+def konfirmasi_duplikat(kartu_ari):
+    """Kartu yang sudah dikirim pada shift ini hanya dikirim lagi jika operator setuju. Return True jika boleh dikirim."""
+    duplikat = indeks_duplikat.periksa(kartu_ari)
+    if duplikat is not None and duplikat.shift_ini:
+        append_raw_response(f"[DUPLIKAT] {duplikat}")
+        if not messagebox.askyesno("Kartu Duplikat", f"{duplikat}.\n\nKirim lagi?", default="no"):
+            metrik.tambah("duplikat", "diblokir")
+            append_raw_response(f"[DUPLIKAT] Kartu {kartu_ari} tidak dikirim ulang")
+            return False
+        metrik.tambah("duplikat", "dikirim_ulang")
+    elif duplikat is not None:
+        metrik.tambah("duplikat", "ditandai")
+        append_raw_response(f"[DUPLIKAT] {duplikat}, tetap dikirim")
+    return True
+
+def submit_action(kartu_ari=None, bacaan=None, instrumen=None, t_baca=None, periksa_duplikat=True):
+    """
+    Kirim data ke API (non-blocking, request dijalankan di thread worker).
+    kartu_ari: kartu dari antrian scan (None = isi field Kartu ARI).
+    bacaan: Bacaan yang langsung dipasangkan dengan kartu antrian, beserta instrumen dan t_baca
+    asalnya (None = nilai di form; hanya dalam kasus ini form dikosongkan setelah kirim).
+    periksa_duplikat=False: kartu antrian yang sudah dikonfirmasi saat scan (antri_kartu).
+    Return True jika terkirim ke worker, False jika batal (input tidak valid, aplikasi belum siap,
+    atau duplikat ditolak operator).
+    """
+    global pending_data, current_data_index, submit_seq
     
-    kartu_ari = entry_nomor_gelas.get()
+    dari_antrian = kartu_ari is not None
+    if kartu_ari is None:
+        kartu_ari = entry_nomor_gelas.get()
     
     # Validasi input kosong
     if not kartu_ari:
         messagebox.showerror("Error", "Kartu ARI harus diisi!")
-        return
+        return False
     
-    try:
-        brix_val = float(entry_brix.get())
-        pol_val = float(entry_pol.get())
-        pol_baca_val = float(entry_pol_baca.get())
-        rendemen_val = float(entry_rendemen.get())
-    except ValueError:
-        messagebox.showerror("Error", "Pastikan semua input berupa angka!")
-        return
+    if bacaan is not None:
+        pol_baca_val, brix_val, pol_val = bacaan.pol_baca, bacaan.brix, bacaan.pol
+        rendemen_val = round(RUMUS.hitung(brix_val, pol_val, pol_baca_val), 2)
+    else:
+        try:
+            brix_val = float(form_bacaan.teks("brix"))
+            pol_val = float(form_bacaan.teks("pol"))
+            pol_baca_val = float(form_bacaan.teks("pol_baca"))
+            rendemen_val = float(form_bacaan.teks("rendemen"))
+        except ValueError:
+            messagebox.showerror("Error", "Pastikan semua input berupa angka!")
+            return False
+        instrumen, t_baca = instrumen_form, t_bacaan_form
+
+    if outbox is None:
+        messagebox.showerror("Error", "Aplikasi masih memuat, coba lagi sebentar")
+        return False
+
+    # Cegah kartu yang sama terkirim dua kali (Enter + SEND, scan ulang) sebelum ada request;
+    # kartu yang sudah diperiksa saat scan cukup dicatat lagi (catatannya dilepas jika kirim sebelumnya gagal)
+    if not periksa_duplikat:
+        indeks_duplikat.tandai(kartu_ari)
+    elif not konfirmasi_duplikat(kartu_ari):
+        return False
 
     # Tampilkan data yang akan dikirim di console (debug only)
     append_raw_response(f"[APP] Mengirim data untuk Kartu ARI: {kartu_ari}")
@@ -360,101 +668,178 @@ def submit_action():
     append_raw_response(f"[DATA] Pol ARI: {pol_val}")
     append_raw_response(f"[DATA] Pol Baca ARI: {pol_baca_val}")
     append_raw_response(f"[DATA] Rendemen ARI: {rendemen_val}")
+    if instrumen:
+        append_raw_response(f"[DATA] Instrumen: {instrumen}")
+
+    params = buat_params(kartu_ari, pol_baca_val, brix_val, pol_val, rendemen=rendemen_val, rumus=RUMUS)
+    
+    # Cari ID kartu pending di cache lokal (tanpa request ke server)
+    id_kartu = cache_kartu.cari(kartu_ari)
+    if id_kartu is not None:
+        params['id'] = id_kartu
+        append_raw_response(f"[CACHE] Kartu {kartu_ari} → ID {id_kartu} (hit rate {cache_kartu.hit_rate:.0%})")
+    else:
+        append_raw_response(f"[CACHE] Kartu {kartu_ari} tidak ada di daftar pending "
+                            f"(hit rate {cache_kartu.hit_rate:.0%}), dikirim tanpa ID")
 
-    # Kirim ke API dengan GET
+    # Simpan ke outbox lebih dulu agar data tidak hilang jika jaringan putus
     try:
-        params = {
-            'kartu_ari': kartu_ari,
-            'brix_ari': brix_val,
-            'pol_ari': pol_val,
-            'pol_baca_ari': pol_baca_val,
-            'rendemen_ari': rendemen_val
-        }
-        
-        # Jika ada ID dari data yang dipending, tambahkan parameter id
-        if pending_data and current_data_index < len(pending_data):
-            data = pending_data[current_data_index]
-            if isinstance(data, dict) and 'id' in data:
-                params['id'] = data['id']
-        
-        response = requests.get(API_BASE, params=params, timeout=5)
-        
-        # Tampilkan respon API di console (debug)
-        append_raw_response(f"[API] Status Code: {response.status_code}")
-        append_raw_response(f"[API] Response: {response.text}")
-        
-        # Tampilkan alert untuk pengguna
-        if response.status_code == 200:
-            # Parse response JSON
-            try:
-                response_data = response.json()
-                if response_data['status'] == 'success':
-                    title = "BERHASIL"
-                    message = f"Data berhasil dikirim!\n\n"
-                    message += f"Kartu ARI: {kartu_ari}\n"
-                    message += f"Brix ARI: {brix_val}\n"
-                    message += f"Pol ARI: {pol_val}\n"
-                    message += f"Pol Baca ARI: {pol_baca_val}\n"
-                    message += f"Rendemen ARI: {rendemen_val}\n\n"
-                    message += f"Response API:\n{response_data['message']}"
-                    show_api_alert(title, message)   
-                else:
-                    title = "GAGAL"
-                    message = f"Gagal mengirim data!\n\n"
-                    message += f"Error: {response_data.get('message', 'Unknown error')}"
-                    show_api_alert(title, message)
-            except:
-                # Jika response bukan JSON
-                title = "PERHATIAN"
-                message = f"Data telah dikirim dengan status {response.status_code}\n\n"
-                message += f"Response API:\n{response.text}"
-                show_api_alert(title, message)
-        else:
-            title = "GAGAL"
-            message = f"Gagal mengirim data!\n"
-            message += f"Status Code: {response.status_code}\n"
-            message += f"Error: {response.text}"
-            show_api_alert(title, message)
-            
-    except requests.exceptions.Timeout:
-        title = "ERROR"
-        message = "Timeout: Koneksi ke API terlalu lama.\nPeriksa koneksi jaringan Anda."
-        show_api_alert(title, message)
-        append_raw_response("[API] Error: Timeout")
-    except requests.exceptions.ConnectionError:
-        title = "ERROR"
-        message = "Tidak dapat terhubung ke server API.\nPeriksa koneksi jaringan atau alamat API."
-        show_api_alert(title, message)
-        append_raw_response("[API] Error: Connection error")
+        outbox_id = outbox.tambah(params, instrumen=instrumen)
+        kirim_id = f"outbox-{outbox_id}"
+    except Exception as e:
+        outbox_id = None
+        submit_seq += 1
+        kirim_id = f"kirim-{submit_seq}"
+        append_raw_response(f"[OUTBOX] Error: gagal menyimpan data: {e}")
+
+    riwayat_id = (riwayat.catat_hasil(params, instrumen=instrumen, outbox_id=outbox_id)
+                  if riwayat is not None else None)
+
+    # Catat kartu di tabel pengiriman lalu serahkan ke worker
+    tree_kirim.insert("", 0, iid=kirim_id, values=(kartu_ari, f"{rendemen_val:.2f}", "MENGIRIM..."))
+    batasi_tabel_kirim()
+
+    pengirim.kirim(
+        params,
+        lambda hasil, o=outbox_id, k=kirim_id, p=params, t=t_baca, r=riwayat_id:
+            catat_hasil_kirim(o, k, p, hasil, t, r)
+    )
+
+    # Form langsung dikosongkan agar operator bisa scan kartu berikutnya
+    # (kartu dari antrian: field Kartu ARI mungkin sedang diisi scan berikutnya, jangan dihapus;
+    # bacaan dari antrian tidak lewat form, jadi isi form tetap)
+    if bacaan is None:
+        kosongkan_form(kartu=not dari_antrian)
+    entry_nomor_gelas.focus()
+    return True
+
+def catat_hasil_kirim(outbox_id, kirim_id, params, hasil, t_baca=None, riwayat_id=None):
+    """Perbarui status outbox dan riwayat setelah terkirim (di thread worker) lalu lapor ke GUI"""
+    klasifikasi, pesan = klasifikasi_hasil(hasil)
+    if riwayat_id is not None:
+        riwayat.tandai(riwayat_id, klasifikasi, pesan)
+    if klasifikasi == HASIL_DITOLAK:
+        # Ditolak server: operator boleh mengirim kartu ini lagi setelah diperbaiki
+        indeks_duplikat.lepas(params['kartu_ari'])
+    metrik.tambah("kirim", klasifikasi)
+    if t_baca is not None:
+        metrik.amati_sejak("serial_respon", t_baca)
+    if outbox_id is not None:
+        try:
+            outbox.tandai_hasil(outbox_id, hasil)
+        except Exception as e:
+            pesan = f"{pesan} (outbox error: {e})"
+    if klasifikasi == HASIL_TERKIRIM:
+        cache_kartu.hapus(params['kartu_ari'])
+    root.after(0, lambda: selesai_kirim(kirim_id, params, hasil, klasifikasi, pesan, t_baca))
+
+def selesai_kirim(kirim_id, params, hasil, klasifikasi, pesan, t_baca=None):
+    """Proses hasil pengiriman di main thread (dipanggil lewat root.after)"""
+    kartu_ari = params['kartu_ari']
+    if t_baca is not None:
+        append_raw_response(f"[DEBUG] Latensi serial→respon API: {(time.perf_counter() - t_baca) * 1000:.0f} ms")
+
+    # Tampilkan respon API di console (debug)
+    if hasil['error']:
+        append_raw_response(f"[API] Error: {hasil['error']} (Kartu ARI: {kartu_ari})")
+    else:
+        append_raw_response(f"[API] Status Code: {hasil['status_code']} dalam {hasil['latensi_ms']:.0f} ms")
+        append_raw_response(f"[API] Response: {hasil['text']}")
+
+    if klasifikasi == HASIL_TERKIRIM:
+        # Sukses cukup ditandai di tabel, tanpa popup modal agar scan tidak terputus
+        set_status_kirim(kirim_id, "BERHASIL")
+        append_raw_response(f"[API] Kartu ARI {kartu_ari} berhasil dikirim: {pesan}")
+    elif klasifikasi == HASIL_ULANG:
+        # Jaringan/server bermasalah: data aman di outbox, dikirim ulang di background
+        set_status_kirim(kirim_id, "ANTRI OUTBOX")
+        append_raw_response(f"[OUTBOX] Kartu ARI {kartu_ari} disimpan, akan dikirim ulang otomatis")
+    else:
+        set_status_kirim(kirim_id, "GAGAL")
+        message = f"Gagal mengirim data!\n\n"
+        message += f"Kartu ARI: {kartu_ari}\n"
+        message += f"Error: {pesan}"
+        show_api_alert("GAGAL", message)
+
+def hasil_replay(row_id, params, klasifikasi, pesan):
+    """Callback PemutarUlang (thread background) → teruskan ke main thread"""
+    if row_id is not None:
+        metrik.tambah("kirim_ulang", klasifikasi)
+        if riwayat is not None:
+            riwayat.tandai_outbox(row_id, klasifikasi, pesan)
+        if klasifikasi == HASIL_DITOLAK:
+            indeks_duplikat.lepas(params['kartu_ari'])
+    root.after(0, lambda: selesai_replay(row_id, params, klasifikasi, pesan))
+
+def selesai_replay(row_id, params, klasifikasi, pesan):
+    """Tampilkan hasil kirim ulang dari outbox"""
+    if row_id is None:
+        append_raw_response(f"[OUTBOX] {pesan}")
+        return
+
+    kartu_ari = params['kartu_ari']
+    kirim_id = f"outbox-{row_id}"
+    if klasifikasi == HASIL_TERKIRIM:
+        set_status_kirim(kirim_id, "BERHASIL (ULANG)")
+        cache_kartu.hapus(kartu_ari)
+        append_raw_response(f"[OUTBOX] Kartu ARI {kartu_ari} berhasil dikirim ulang")
+    elif klasifikasi == HASIL_DITOLAK:
+        set_status_kirim(kirim_id, "GAGAL")
+        append_raw_response(f"[OUTBOX] Kartu ARI {kartu_ari} ditolak server: {pesan}")
+    else:
+        set_status_kirim(kirim_id, "ANTRI OUTBOX")
+        append_raw_response(f"[OUTBOX] Kirim ulang Kartu ARI {kartu_ari} gagal: {pesan}")
+
+def perbarui_status_kirim():
+    """Tampilkan jumlah data di outbox dan latensi API, dijadwalkan ulang setiap detik"""
+    try:
+        lbl_outbox.config(text=f"Outbox: {outbox.jumlah_antri()} data belum terkirim")
     except Exception as e:
-        title = "ERROR"
-        message = f"Terjadi kesalahan:\n{str(e)}"
-        show_api_alert(title, message)
-        append_raw_response(f"[API] Error: {e}")
+        lbl_outbox.config(text=f"Outbox: error ({e})")
+
+    rata_rata = api.rata_rata_latensi_ms()
+    if rata_rata is not None:
+        ringkasan = metrik.ringkasan("api")
+        lbl_api.config(
+            text=f"API: terakhir {api.latensi_terakhir_ms:.0f} ms, "
+                 f"rata-rata {rata_rata:.0f} ms, p95 {ringkasan[2]:.0f} ms ({api.jumlah_request} request)"
+        )
+    perbarui_status_serial()
+    hit_rate = cache_kartu.hit_rate
+    lbl_cache.config(
+        text=f"Cache kartu: {len(cache_kartu)} pending"
+             + (f", hit rate {hit_rate:.0%} ({cache_kartu.jumlah_hit}/{cache_kartu.jumlah_hit + cache_kartu.jumlah_miss})"
+                if hit_rate is not None else "")
+    )
+    root.after(OUTBOX_REFRESH_MS, perbarui_status_kirim)
+
+def set_status_kirim(kirim_id, status):
+    """Update kolom status di tabel pengiriman (baris bisa sudah terhapus)"""
+    if tree_kirim.exists(kirim_id):
+        tree_kirim.set(kirim_id, "status", status)
+
+def batasi_tabel_kirim():
+    """Buang baris terlama agar tabel pengiriman tidak tumbuh tanpa batas"""
+    rows = tree_kirim.get_children()
+    for iid in rows[MAX_BARIS_KIRIM:]:
+        tree_kirim.delete(iid)
+
+def kosongkan_form(kartu=True):
+    """Kosongkan field kartu (kartu=False: biarkan) dan field hasil serial"""
+    global t_bacaan_form, instrumen_form
+    t_bacaan_form = None
+    instrumen_form = None
+    lbl_instrumen.config(text="-")
+    if kartu:
+        entry_nomor_gelas.delete(0, tk.END)
+    form_bacaan.kosongkan()
 
 def reset_form():
     """Reset semua input field"""
     global pending_data, current_data_index
     
-    # Reset field input
-    entry_nomor_gelas.delete(0, tk.END)
-    
-    # Reset field yang dari serial
-    entry_brix.config(state="normal")
-    entry_brix.delete(0, tk.END)
-    entry_brix.config(state="readonly")
-    
-    entry_pol.config(state="normal")
-    entry_pol.delete(0, tk.END)
-    entry_pol.config(state="readonly")
-    
-    entry_pol_baca.config(state="normal")
-    entry_pol_baca.delete(0, tk.END)
-    entry_pol_baca.config(state="readonly")
-    
-    entry_rendemen.config(state="normal")
-    entry_rendemen.delete(0, tk.END)
-    entry_rendemen.config(state="readonly")
+    # Reset field input dan field yang dari serial
+    kosongkan_form()
     
     # Reset status
     pending_data = []
@@ -479,43 +864,91 @@ def next_data():
         current_data_index += 1
         show_current_data()
 
-def toggle_serial():
-    """Toggle koneksi serial ON/OFF"""
-    global serial_thread, serial_running
-    
-    if serial_running and ser and ser.is_open:
-        # Matikan serial
-        serial_running = False
-        ser.close()
+def set_tombol_serial(on):
+    """Sesuaikan tombol Start dan combobox dengan status serial"""
+    if on:
+        btn_serial.config(text="Start: ON", style="Success.TButton")
+        combo_port.config(state="disabled")
+        btn_refresh.config(state="disabled")
+    else:
         btn_serial.config(text="Start: OFF", style="Danger.TButton")
-        append_raw_response("[SERIAL] Koneksi serial dimatikan")
         combo_port.config(state="readonly")
         btn_refresh.config(state="normal")
-    else:
-        # Cek apakah port dipilih
-        selected_port = combo_port.get()
-        if not selected_port:
+
+def toggle_serial():
+    """Toggle koneksi serial ON/OFF untuk semua instrumen"""
+    global pengawas
+    if pengawas is not None:
+        # Matikan semua pembaca serial
+        pengawas.berhenti()
+        pengawas = None
+        for port in daftar_instrumen:
+            set_status_instrumen(port, "OFF")
+        set_tombol_serial(False)
+        append_raw_response("[SERIAL] Koneksi serial dimatikan")
+        return
+
+    # Tanpa daftar instrumen, pakai port yang dipilih di combobox
+    if not daftar_instrumen:
+        if not combo_port.get():
             messagebox.showerror("Error", "Pilih port COM terlebih dahulu!")
             return
-            
-        # Nonaktifkan combobox saat serial berjalan
-        combo_port.config(state="disabled")
-        btn_refresh.config(state="disabled")
-        
-        # Hidupkan serial
-        serial_thread = threading.Thread(target=baca_serial, daemon=True)
-        serial_thread.start()
-        btn_serial.config(text="Start: ON", style="Success.TButton")
-        append_raw_response(f"[SERIAL] Menghidupkan koneksi serial ke {selected_port}...")
+        tambah_instrumen()
+
+    opsi_pembaca = {
+        'formats': FORMAT_SACCHAROMAT,
+        'rekam_folder': REKAM_FOLDER if rekam_aktif else None,
+        'rekam_opsi': {'maks_byte': REKAM_MAKS_BYTE, 'maks_file': REKAM_MAKS_FILE},
+        'metrik': metrik,
+        'stabil_opsi': ({'mode': STABIL_MODE, 'jumlah': STABIL_JUMLAH, 'toleransi': STABIL_TOLERANSI,
+                         'batas_tenang': STABIL_BATAS_TENANG}
+                        if STABIL_MODE else None),
+    }
+    pengawas = PengawasSerial(
+        daftar_instrumen, BAUDRATE,
+        on_bacaan=terima_bacaan,
+        on_log=append_raw_response,
+        on_status=status_pembaca,
+        opsi_pembaca=opsi_pembaca,
+        backoff_awal=SERIAL_BACKOFF_AWAL,
+        backoff_maks=SERIAL_BACKOFF_MAKS,
+        batas_diam=SERIAL_BATAS_DIAM
+    )
+    for port in daftar_instrumen:
+        append_raw_response(f"[SERIAL] Menghidupkan koneksi serial ke {port}...")
+    pengawas.mulai()
+    set_tombol_serial(True)
+
+def perbarui_status_serial():
+    """Ringkasan sambung ulang dan waktu putus per port selama serial ON"""
+    if pengawas is None:
+        return
+    statistik = pengawas.statistik()
+    sambung_ulang = sum(s[1] for s in statistik.values())
+    putus = sum(s[2] for s in statistik.values())
+    rincian = ", ".join(f"{port} {n}x/{detik:.0f} s" for port, (_, n, detik) in statistik.items() if n or detik)
+    lbl_serial.config(
+        text=f"Serial: {sambung_ulang} sambung ulang, total putus {putus:.0f} s"
+             + (f" ({rincian})" if rincian else "")
+    )
+
+def toggle_rekam():
+    """Aktifkan/matikan rekam byte mentah (berlaku saat serial dinyalakan berikutnya)"""
+    global rekam_aktif
+    rekam_aktif = var_rekam.get()
+    status = "aktif" if rekam_aktif else "mati"
+    append_raw_response(f"[REKAM] Rekam serial {status} (berlaku saat Start berikutnya)")
 
 def refresh_ports():
-    """Refresh daftar port COM yang tersedia"""
-    update_port_list()
+    """Paksa pemantau port enumerasi ulang (perubahan biasanya sudah terdeteksi otomatis)"""
+    pemantau_port.pindai_ulang()
     append_raw_response("[SERIAL] Daftar port COM diperbarui")
 
 # === GUI ===
+profil.tandai("konfigurasi & argumen")
 root = tk.Tk()
 root.title("Aplikasi Analisa Rendemen Individu")
+profil.tandai("tk.Tk()")
 
 # SET ICON UNTUK WINDOW
 if icon_available:
@@ -548,6 +981,36 @@ btn_serial.grid(row=0, column=3, padx=5, pady=5)
 # Label baudrate
 ttk.Label(frame_control, text=f"Baudrate: {BAUDRATE}").grid(row=0, column=4, padx=5, pady=5)
 
+# Checkbox rekam byte mentah serial
+var_rekam = tk.BooleanVar(value=rekam_aktif)
+chk_rekam = ttk.Checkbutton(frame_control, text="Rekam raw", variable=var_rekam, command=toggle_rekam)
+chk_rekam.grid(row=0, column=5, padx=5, pady=5)
+
+# Tabel instrumen: satu baris per Saccharomat yang dibaca
+tree_instrumen = ttk.Treeview(
+    frame_control, columns=("port", "status", "pol_baca", "brix", "pol", "bacaan"),
+    show="headings", height=3, selectmode="browse"
+)
+for kolom, judul, lebar in (("port", "Port", 110), ("status", "Status", 90), ("pol_baca", "Pol Baca", 70),
+                            ("brix", "Brix", 60), ("pol", "Pol", 60), ("bacaan", "Bacaan", 60)):
+    tree_instrumen.heading(kolom, text=judul)
+    tree_instrumen.column(kolom, width=lebar, anchor="center")
+tree_instrumen.grid(row=1, column=0, columnspan=5, padx=5, pady=5, sticky="ew")
+tree_instrumen.bind("<<TreeviewSelect>>", pilih_instrumen)
+
+frame_instrumen_tombol = ttk.Frame(frame_control)
+frame_instrumen_tombol.grid(row=1, column=5, padx=5, pady=5, sticky="n")
+
+btn_tambah_instrumen = ttk.Button(frame_instrumen_tombol, text="+ Instrumen", command=tambah_instrumen, width=12)
+btn_tambah_instrumen.pack(pady=(0, 5))
+
+btn_hapus_instrumen = ttk.Button(frame_instrumen_tombol, text="- Instrumen", command=hapus_instrumen, width=12)
+btn_hapus_instrumen.pack()
+
+# Status sambung ulang serial (diperbarui bersama status pengiriman)
+lbl_serial = ttk.Label(frame_control, text="Serial: -")
+lbl_serial.grid(row=2, column=0, columnspan=6, padx=5, sticky="w")
+
 # Frame untuk input data
 frame_input = ttk.LabelFrame(root, text="Data", padding=10)
 frame_input.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
@@ -594,6 +1057,49 @@ ttk.Label(frame_input, text="Rendemen (%):").grid(row=4, column=0, sticky="w", p
 entry_rendemen = ttk.Entry(frame_input, state="readonly", width=20)
 entry_rendemen.grid(row=4, column=1, padx=5, pady=5)
 
+# Instrumen asal bacaan
+ttk.Label(frame_input, text="Instrumen:").grid(row=5, column=0, sticky="w", padx=5, pady=5)
+lbl_instrumen = ttk.Label(frame_input, text="-")
+lbl_instrumen.grid(row=5, column=1, sticky="w", padx=5, pady=5)
+
+# Antrian scan: kartu yang menunggu bacaan, dikirim otomatis saat bacaan stabil masuk
+frame_antrian = ttk.LabelFrame(frame_input, text="Antrian Scan (0)", padding=5)
+frame_antrian.grid(row=1, column=2, rowspan=5, padx=10, pady=5, sticky="nsew")
+list_antrian = tk.Listbox(frame_antrian, height=6, width=12, selectmode=tk.EXTENDED, activestyle="none")
+list_antrian.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+btn_hapus_antrian = ttk.Button(frame_antrian, text="Hapus", command=hapus_dari_antrian, width=8)
+btn_hapus_antrian.pack(side=tk.TOP, pady=(5, 0))
+
+# Model field hasil serial: repaint digabung per frame, hanya widget yang berubah
+form_bacaan = FormBacaan(root, {'brix': entry_brix, 'pol': entry_pol, 'pol_baca': entry_pol_baca,
+                                'rendemen': entry_rendemen}, metrik=metrik)
+
+# Frame untuk status pengiriman per kartu
+frame_kirim = ttk.LabelFrame(root, text="Pengiriman", padding=10)
+frame_kirim.grid(row=1, column=1, padx=10, pady=10, sticky="nsew")
+
+lbl_cache = ttk.Label(frame_kirim, text="Cache kartu: -")
+lbl_cache.pack(side=tk.BOTTOM, anchor="w")
+
+lbl_api = ttk.Label(frame_kirim, text="API: belum ada request")
+lbl_api.pack(side=tk.BOTTOM, anchor="w")
+
+lbl_outbox = ttk.Label(frame_kirim, text="Outbox: -")
+lbl_outbox.pack(side=tk.BOTTOM, anchor="w", pady=(5, 0))
+
+tree_kirim = ttk.Treeview(frame_kirim, columns=("kartu", "rendemen", "status"), show="headings", height=6)
+tree_kirim.heading("kartu", text="Kartu ARI")
+tree_kirim.heading("rendemen", text="Rendemen")
+tree_kirim.heading("status", text="Status")
+tree_kirim.column("kartu", width=80, anchor="center")
+tree_kirim.column("rendemen", width=70, anchor="center")
+tree_kirim.column("status", width=120, anchor="center")
+tree_kirim.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+scrollbar_kirim = ttk.Scrollbar(frame_kirim, command=tree_kirim.yview)
+scrollbar_kirim.pack(side=tk.RIGHT, fill=tk.Y)
+tree_kirim.config(yscrollcommand=scrollbar_kirim.set)
+
 # Frame untuk tombol aksi
 frame_tombol = ttk.LabelFrame(root, text="Aksi", padding=10)
 frame_tombol.grid(row=2, column=0, padx=10, pady=10, sticky="ew", columnspan=2)
@@ -628,6 +1134,16 @@ btn_reset = ttk.Button(frame_tombol, text="Reset",
                       command=reset_form, width=10)
 btn_reset.grid(row=0, column=4, padx=5, pady=5)
 
+# Tombol Riwayat
+btn_riwayat = ttk.Button(frame_tombol, text="Riwayat",
+                        command=buka_riwayat, width=10)
+btn_riwayat.grid(row=0, column=5, padx=5, pady=5)
+
+# Tombol Rekonsiliasi
+btn_rekonsiliasi = ttk.Button(frame_tombol, text="Rekonsiliasi",
+                              command=rekonsiliasi_sekarang, width=12)
+btn_rekonsiliasi.grid(row=0, column=6, padx=5, pady=5)
+
 # Frame untuk output
 frame_output = ttk.LabelFrame(root, text="Console", padding=10)
 frame_output.grid(row=3, column=0, padx=10, pady=10, sticky="nsew", columnspan=2)
@@ -643,10 +1159,20 @@ scrollbar = ttk.Scrollbar(text_frame, command=text_raw.yview)
 scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 text_raw.config(yscrollcommand=scrollbar.set)
 
+konsol = KonsolLog(text_raw, maks_baris=LOG_MAKS_BARIS, interval_ms=LOG_FLUSH_MS, level=NAMA_LEVEL[LOG_LEVEL])
+konsol.mulai()
+
+frame_log_tombol = ttk.Frame(frame_output)
+frame_log_tombol.grid(row=1, column=0, pady=5)
+
 # Tombol clear log
-btn_clear = ttk.Button(frame_output, text="Clear Log", 
-                      command=lambda: text_raw.config(state="normal") or text_raw.delete("1.0", tk.END) or text_raw.config(state="disabled"))
-btn_clear.grid(row=1, column=0, pady=5)
+btn_clear = ttk.Button(frame_log_tombol, text="Clear Log", command=konsol.bersihkan)
+btn_clear.pack(side=tk.LEFT, padx=5)
+
+# Checkbox log debug (matikan di produksi)
+var_debug = tk.BooleanVar(value=LOG_LEVEL == "DEBUG")
+chk_debug = ttk.Checkbutton(frame_log_tombol, text="Log debug", variable=var_debug, command=toggle_debug_log)
+chk_debug.pack(side=tk.LEFT, padx=5)
 
 # Konfigurasi grid untuk responsive layout
 root.grid_rowconfigure(3, weight=1)
@@ -667,17 +1193,27 @@ def focus_next_widget(event):
 
 entry_nomor_gelas.bind("<Return>", focus_next_widget)
 
-# Fitur auto-submit saat Enter di nomor gelas
+# Fitur auto-submit saat Enter di nomor gelas (barcode scanner mengirim Enter setelah kode)
 def auto_submit_on_enter(event):
-    """Auto submit jika field sudah terisi"""
-    if entry_brix.get() and entry_pol.get() and entry_pol_baca.get():
+    """Kirim langsung jika bacaan sudah ada di form, selain itu kartu masuk antrian scan"""
+    kartu_ari = entry_nomor_gelas.get().strip()
+    if not kartu_ari:
+        return "break"
+    bacaan_siap = form_bacaan.teks("brix") and form_bacaan.teks("pol") and form_bacaan.teks("pol_baca")
+    if bacaan_siap and not len(antrian_scan):
         submit_action()
+    else:
+        antri_kartu(kartu_ari)
     return "break"
 
 entry_nomor_gelas.bind("<Return>", auto_submit_on_enter)
 
-# Inisialisasi daftar port
-update_port_list()
+# Pemantau hot-plug port: combobox diisi begitu enumerasi pertama selesai, lalu diperbarui otomatis
+combo_port['values'] = PORT_TAMBAHAN
+isi_daftar_port(PORT_TAMBAHAN)
+t_mulai_pemantau = time.perf_counter()
+pemantau_port = PemantauPort(port_berubah, on_log=append_raw_response)
+pemantau_port.start()
 
 # Pesan startup
 append_raw_response("="*60)
@@ -685,13 +1221,86 @@ append_raw_response("APLIKASI ANALISA RENDEMEN INDIVIDU")
 append_raw_response("="*60)
 append_raw_response("[APP] Aplikasi Analisa Rendemen Individu dimulai")
 append_raw_response(f"[APP] API: {API_BASE}")
+if rumus_error:
+    append_raw_response(f"[APP] Error rumus rendemen: {rumus_error}, memakai rumus standar")
+    root.after(0, lambda: messagebox.showwarning(
+        "Rumus Rendemen", f"File rumus tidak bisa dipakai:\n{rumus_error}\n\nMemakai rumus standar {RUMUS.versi_lengkap}."
+    ))
+append_raw_response(f"[APP] Rumus rendemen {RUMUS.versi_lengkap}: {RUMUS.ekspresi_final}")
 append_raw_response("[SERIAL] Pilih port COM dan klik 'Start: OFF' untuk menghidupkan")
-append_raw_response("[SERIAL] Klik 'Refresh' untuk memperbarui daftar port COM")
+append_raw_response("[SERIAL] Port COM dipantau otomatis (colok/cabut adapter), 'Refresh' untuk memindai ulang")
 # append_raw_response("[INFO] Klik 'Load Data' untuk mengambil data yang belum diisi")
 append_raw_response("[INFO] Console ini hanya untuk debugging")
 append_raw_response("[INFO] Respon API akan ditampilkan di popup alert")
 append_raw_response("="*60)
 
+# Cache kartu pending: index kartu_ari → id diperbarui di background (thread dimulai di mulai_layanan)
+cache_kartu = CacheKartu(api, on_log=append_raw_response, interval=CACHE_INTERVAL,
+                         interval_penuh=CACHE_INTERVAL_PENUH, ttl=CACHE_TTL)
+
+def siapkan_http():
+    """Impor requests dan buat session HTTP di thread latar agar submit pertama tidak menunggu"""
+    mulai = time.perf_counter()
+    try:
+        api.siapkan()
+    except Exception as e:
+        append_raw_response(f"[API] Error: gagal menyiapkan client HTTP: {e}")
+        return
+    profil.catat("import requests + session", mulai)
+    # Cache kartu memakai HTTP, jadi dimulai setelah session siap
+    cache_kartu.start()
+
+def mulai_layanan():
+    """Inisialisasi yang ditunda sampai jendela tampil: outbox, replay outbox, HTTP"""
+    global outbox, pemutar_outbox, riwayat, rekonsiliasi
+    profil.tandai("jendela tampil")
+    try:
+        riwayat = Riwayat(RIWAYAT_PATH, on_log=append_raw_response)
+        indeks_duplikat.riwayat = riwayat
+        append_raw_response(f"[DUPLIKAT] {indeks_duplikat.muat()} kartu sudah dikirim pada shift ini")
+    except Exception as e:
+        append_raw_response(f"[RIWAYAT] Error: gagal membuka {RIWAYAT_PATH}: {e}")
+    try:
+        outbox = Outbox(OUTBOX_PATH)
+    except Exception as e:
+        append_raw_response(f"[OUTBOX] Error: gagal membuka {OUTBOX_PATH}: {e}")
+        messagebox.showerror("Outbox", f"Gagal membuka outbox:\n{e}")
+        return
+    # Outbox: kirim ulang data yang tertunda di background
+    jumlah_outbox = outbox.jumlah_antri()
+    if jumlah_outbox:
+        append_raw_response(f"[OUTBOX] {jumlah_outbox} data tertunda akan dikirim ulang")
+    pemutar_outbox = PemutarUlang(outbox, api.kirim_batch, on_hasil=hasil_replay)
+    pemutar_outbox.start()
+    if riwayat is not None:
+        rekonsiliasi = Rekonsiliasi(api, riwayat, outbox, on_log=append_raw_response,
+                                    interval=REKONSILIASI_INTERVAL, per_halaman=REKONSILIASI_PER_HALAMAN,
+                                    workers=REKONSILIASI_WORKERS, sejak_hari=REKONSILIASI_HARI, metrik=metrik,
+                                    maks_ulang=REKONSILIASI_MAKS_ULANG)
+        rekonsiliasi.start()
+    profil.tandai("buka outbox + riwayat")
+
+    threading.Thread(target=siapkan_http, name="siapkan-http", daemon=True).start()
+    if args.metrik_file or args.metrik_port:
+        EksporMetrik(metrik, path=args.metrik_file, port=args.metrik_port, interval=METRIK_INTERVAL,
+                     on_log=append_raw_response).mulai()
+    perbarui_status_kirim()
+    if profil.aktif:
+        # Tahap latar (port, HTTP) biasanya selesai dalam beberapa ratus ms
+        root.after(1500, laporan_profil)
+
+def laporan_profil():
+    for baris in profil.laporan():
+        print(baris)
+        append_raw_response(baris)
+
+def jendela_tampil(event=None):
+    """Dipanggil sekali saat jendela utama pertama kali di-map"""
+    root.unbind("<Map>")
+    root.after_idle(mulai_layanan)
+
+root.bind("<Map>", jendela_tampil)
+
 # === FOOTER / CREDIT ===
 frame_footer = ttk.Frame(root)
 frame_footer.grid(row=4, column=0, columnspan=2, sticky="ew", padx=10, pady=(0, 8))
@@ -704,5 +1313,6 @@ lbl_credit = ttk.Label(
 )
 lbl_credit.pack(anchor="center")
 root.grid_rowconfigure(4, weight=0)
+profil.tandai("bangun widget")
 
 root.mainloop()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""Console log aplikasi di atas widget Text Tkinter.
+
+- tulis() aman dipanggil dari thread mana pun (hanya menambah ke antrian)
+- Antrian di-flush ke widget secara berkala dalam satu operasi insert
+- Jumlah baris di widget dibatasi, baris terlama dibuang (ring buffer)
+- Baris di bawah level aktif (mis. [DEBUG]) tidak disimpan sama sekali
+
+Modul ini tidak mengimpor tkinter, jadi level_baris juga dipakai mode headless.
+"""
+import collections
+
+LEVEL_DEBUG = 10
+LEVEL_INFO = 20
+LEVEL_ERROR = 40
+
+NAMA_LEVEL = {"DEBUG": LEVEL_DEBUG, "INFO": LEVEL_INFO, "ERROR": LEVEL_ERROR}
+
+
+def level_baris(line):
+    """Tebak level dari prefix baris log yang dipakai aplikasi"""
+    if line.startswith("[DEBUG]"):
+        return LEVEL_DEBUG
+    if "Error" in line or "Gagal" in line:
+        return LEVEL_ERROR
+    return LEVEL_INFO
+
+
+class KonsolLog:
+    def __init__(self, text_widget, maks_baris=2000, interval_ms=50, level=LEVEL_INFO):
+        self.text = text_widget
+        self.maks_baris = maks_baris
+        self.interval_ms = interval_ms
+        self.level = level
+        # deque.append/popleft atomic → aman dari thread lain tanpa lock.
+        # maxlen: jika GUI tertinggal, baris terlama yang belum tampil ikut dibuang.
+        self._antrian = collections.deque(maxlen=maks_baris)
+        self._jumlah_baris = 0
+        self.jumlah_flush = 0
+
+    def tulis(self, line, level=None):
+        """Tambahkan baris ke antrian (boleh dari thread mana pun)"""
+        if level is None:
+            level = level_baris(line)
+        if level < self.level:
+            return
+        self._antrian.append(line)
+
+    def set_level(self, level):
+        self.level = level
+
+    def mulai(self):
+        """Mulai loop flush berkala (panggil dari main thread)"""
+        self._flush()
+
+    def _flush(self):
+        if self._antrian:
+            lines = []
+            try:
+                while True:
+                    lines.append(self._antrian.popleft())
+            except IndexError:
+                pass
+            self._tampilkan(lines)
+        self.text.after(self.interval_ms, self._flush)
+
+    def _tampilkan(self, lines):
+        blok = "\n".join(lines) + "\n"
+        self._jumlah_baris += blok.count("\n")
+
+        self.text.config(state="normal")
+        self.text.insert("end", blok)
+        lebih = self._jumlah_baris - self.maks_baris
+        if lebih > 0:
+            # Buang baris terlama agar widget tidak tumbuh tanpa batas
+            self.text.delete("1.0", f"{lebih + 1}.0")
+            self._jumlah_baris -= lebih
+        self.text.see("end")  # auto scroll ke bawah
+        self.text.config(state="disabled")
+        self.jumlah_flush += 1
+
+    def bersihkan(self):
+        """Hapus semua isi console (main thread)"""
+        self._antrian.clear()
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.config(state="disabled")
+        self._jumlah_baris = 0
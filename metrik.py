@@ -0,0 +1,207 @@
+"""Metrik latensi per tahap dan counter pipeline, ekspor format teks Prometheus.
+
+Tahap yang diukur (semua dari waktu byte terakhir baris serial diterima,
+perf_counter, kecuali `api`):
+  - serial_parse : byte terakhir → bacaan selesai di-parse (thread serial)
+  - serial_form  : byte terakhir → form terisi dan rendemen dihitung (GUI)
+  - api          : durasi satu request HTTP
+  - serial_respon: byte terakhir → respon API diterima
+Setiap tahap menyimpan `jendela` sampel terakhir (deque) untuk p50/p95/p99,
+plus jumlah dan total kumulatif. Mencatat satu sampel hanya append ke deque
+dan dua penjumlahan di bawah lock, jadi aman dibiarkan aktif di produksi;
+persentil baru dihitung saat ekspor.
+
+Ekspor:
+  - file   : EksporMetrik menulis file .prom secara atomik setiap `interval`
+             detik (untuk textfile collector node_exporter);
+  - HTTP   : EksporMetrik(port=...) melayani GET /metrics.
+Nama label counter diambil dari LABEL_COUNTER (mis. kirim → hasil,
+request → status), selain itu `jenis`.
+"""
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "ari"
+JENDELA = 1024          # sampel terakhir per tahap untuk persentil
+KUANTIL = (0.5, 0.95, 0.99)
+
+# Nama label Prometheus per counter; counter lain (bacaan, duplikat, rekonsiliasi, ...) memakai LABEL_DEFAULT
+LABEL_COUNTER = {
+    "kirim": "hasil",
+    "kirim_ulang": "hasil",
+    "request": "status",
+}
+LABEL_DEFAULT = "jenis"
+
+
+class Histogram:
+    """Sampel latensi (ms) satu tahap: jendela bergulir + jumlah/total kumulatif"""
+
+    def __init__(self, jendela=JENDELA):
+        self.sampel = deque(maxlen=jendela)
+        self.jumlah = 0
+        self.total_ms = 0.0
+
+    def persentil(self, kuantil=KUANTIL):
+        """dict kuantil → ms dari jendela saat ini (None jika belum ada sampel)"""
+        urut = sorted(self.sampel)
+        if not urut:
+            return {q: None for q in kuantil}
+        return {q: urut[min(len(urut) - 1, int(q * len(urut)))] for q in kuantil}
+
+
+class Metrik:
+    """Registry counter dan histogram latensi (aman dipanggil dari thread mana pun)"""
+
+    def __init__(self, jendela=JENDELA):
+        self.jendela = jendela
+        self._lock = threading.Lock()
+        self._histogram = {}            # tahap -> Histogram
+        self._counter = {}              # (nama, label) -> nilai
+        self.t_mulai = time.time()
+
+    def amati(self, tahap, ms):
+        """Catat satu sampel latensi (ms) untuk tahap"""
+        with self._lock:
+            histogram = self._histogram.get(tahap)
+            if histogram is None:
+                histogram = self._histogram[tahap] = Histogram(self.jendela)
+            histogram.sampel.append(ms)
+            histogram.jumlah += 1
+            histogram.total_ms += ms
+
+    def amati_sejak(self, tahap, t_mulai):
+        """Catat latensi dari perf_counter t_mulai sampai sekarang, return ms"""
+        ms = (time.perf_counter() - t_mulai) * 1000
+        self.amati(tahap, ms)
+        return ms
+
+    def tambah(self, nama, label=None, n=1):
+        """Naikkan counter `nama` (label: nilai label, namanya dari LABEL_COUNTER; opsional)"""
+        kunci = (nama, label)
+        with self._lock:
+            self._counter[kunci] = self._counter.get(kunci, 0) + n
+
+    def counter(self, nama, label=None):
+        with self._lock:
+            return self._counter.get((nama, label), 0)
+
+    def ringkasan(self, tahap):
+        """(jumlah, p50, p95, p99) ms untuk tahap, atau None jika belum ada sampel"""
+        with self._lock:
+            histogram = self._histogram.get(tahap)
+            if histogram is None:
+                return None
+            jumlah = histogram.jumlah
+            persentil = histogram.persentil()
+        return (jumlah,) + tuple(persentil[q] for q in KUANTIL)
+
+    def teks_prometheus(self):
+        """Seluruh metrik dalam format teks Prometheus (exposition 0.0.4)"""
+        with self._lock:
+            histogram = {tahap: (h.jumlah, h.total_ms, h.persentil()) for tahap, h in self._histogram.items()}
+            counter = dict(self._counter)
+
+        baris = [
+            f"# HELP {PREFIX}_latensi_detik Latensi per tahap pipeline (jendela {self.jendela} sampel terakhir)",
+            f"# TYPE {PREFIX}_latensi_detik summary",
+        ]
+        for tahap in sorted(histogram):
+            jumlah, total_ms, persentil = histogram[tahap]
+            for q, ms in persentil.items():
+                if ms is not None:
+                    baris.append(f'{PREFIX}_latensi_detik{{tahap="{tahap}",quantile="{q}"}} {ms / 1000:.6f}')
+            baris.append(f'{PREFIX}_latensi_detik_sum{{tahap="{tahap}"}} {total_ms / 1000:.6f}')
+            baris.append(f'{PREFIX}_latensi_detik_count{{tahap="{tahap}"}} {jumlah}')
+
+        ditulis = set()
+        for nama, label in sorted(counter, key=lambda k: (k[0], k[1] or "")):
+            if nama not in ditulis:
+                baris.append(f"# TYPE {PREFIX}_{nama}_total counter")
+                ditulis.add(nama)
+            label_teks = f'{{{LABEL_COUNTER.get(nama, LABEL_DEFAULT)}="{label}"}}' if label is not None else ""
+            baris.append(f"{PREFIX}_{nama}_total{label_teks} {counter[(nama, label)]}")
+
+        baris.append(f"# TYPE {PREFIX}_mulai_detik gauge")
+        baris.append(f"{PREFIX}_mulai_detik {self.t_mulai:.0f}")
+        return "\n".join(baris) + "\n"
+
+    def tulis_file(self, path):
+        """Tulis teks Prometheus ke path secara atomik (tmp + rename)"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.teks_prometheus())
+        os.replace(tmp, path)
+
+
+class _HandlerMetrik(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.metrik.teks_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class EksporMetrik(threading.Thread):
+    """Ekspor berkala ke file .prom dan/atau endpoint HTTP /metrics"""
+
+    def __init__(self, metrik, path=None, port=0, interval=15.0, host="0.0.0.0", on_log=None):
+        super().__init__(name="ekspor-metrik", daemon=True)
+        self.metrik = metrik
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self.host = host
+        self.on_log = on_log
+        self.server = None
+        self._berhenti = threading.Event()
+
+    def _log(self, pesan):
+        if self.on_log:
+            self.on_log(f"[METRIK] {pesan}")
+
+    def mulai(self):
+        """Buka endpoint HTTP (jika port diisi) lalu jalankan thread penulis file"""
+        if self.port:
+            try:
+                self.server = ThreadingHTTPServer((self.host, self.port), _HandlerMetrik)
+            except OSError as e:
+                self._log(f"Error: tidak bisa membuka port {self.port}: {e}")
+            else:
+                self.server.daemon_threads = True
+                self.server.metrik = self.metrik
+                threading.Thread(target=self.server.serve_forever, name="metrik-http", daemon=True).start()
+                self._log(f"Endpoint http://{self.host}:{self.port}/metrics")
+        if self.path:
+            self._log(f"Ditulis ke {self.path} setiap {self.interval:g} s")
+            self.start()
+
+    def stop(self):
+        self._berhenti.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def run(self):
+        while True:
+            self._tulis()
+            if self._berhenti.wait(self.interval):
+                self._tulis()   # nilai terakhir saat aplikasi ditutup
+                break
+
+    def _tulis(self):
+        try:
+            self.metrik.tulis_file(self.path)
+        except OSError as e:
+            self._log(f"Error: gagal menulis {self.path}: {e}")
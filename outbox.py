@@ -0,0 +1,272 @@
+"""Outbox lokal (SQLite) untuk hasil ARI yang belum berhasil dikirim ke API.
+
+Setiap hasil ditulis ke outbox SEBELUM dikirim. Jika server tidak bisa
+dihubungi, baris tetap tersimpan dan dikirim ulang oleh PemutarUlang di
+background dengan backoff, sehingga pembacaan Saccharomat tidak hilang.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Status baris outbox
+STATUS_MENUNGGU = "menunggu"    # antri / dijadwalkan kirim ulang
+STATUS_DIKIRIM = "dikirim"      # sedang dikirim oleh salah satu worker
+STATUS_TERKIRIM = "terkirim"    # diterima server
+STATUS_DITOLAK = "ditolak"      # server menjawab tapi menolak data, tidak dikirim ulang
+STATUS_DIGANTI = "diganti"      # ada data baru untuk kartu yang sama
+
+# Hasil klasifikasi respon API
+HASIL_TERKIRIM = "terkirim"
+HASIL_ULANG = "ulang"
+HASIL_DITOLAK = "ditolak"
+
+BACKOFF_DASAR = 2.0     # detik
+BACKOFF_MAKS = 300.0    # detik
+SIMPAN_TERKIRIM_HARI = 30
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kunci TEXT NOT NULL,
+    kartu_ari TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    percobaan INTEGER NOT NULL DEFAULT 0,
+    coba_lagi REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    dibuat REAL NOT NULL,
+    diperbarui REAL NOT NULL,
+    instrumen TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, coba_lagi);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_outbox_kunci_aktif
+    ON outbox(kunci) WHERE status IN ('menunggu', 'dikirim');
+"""
+
+
+def lokasi_default(nama="outbox_ari.db"):
+    """Path file outbox di samping EXE (atau di samping script saat development)"""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, nama)
+
+
+def kunci_idempotensi(params):
+    """Kunci unik satu hasil: kartu_ari + id data pending (jika ada)"""
+    return f"{params['kartu_ari']}|{params.get('id', '')}"
+
+
+def hitung_backoff(percobaan):
+    """Jeda eksponensial (dengan jitter) sebelum percobaan berikutnya"""
+    jeda = min(BACKOFF_MAKS, BACKOFF_DASAR * (2 ** percobaan))
+    return jeda * random.uniform(0.8, 1.2)
+
+
+def klasifikasi_hasil(hasil):
+    """
+    Tentukan nasib baris outbox dari hasil pengiriman (lihat api_client).
+    Return (HASIL_*, pesan)
+    """
+    if hasil['error']:
+        # Timeout / koneksi putus / error lain → coba lagi nanti
+        return HASIL_ULANG, hasil['error']
+
+    status_code = hasil['status_code']
+    if status_code >= 500:
+        return HASIL_ULANG, f"Status {status_code}"
+    if status_code != 200:
+        return HASIL_DITOLAK, f"Status {status_code}: {hasil['text']}"
+
+    try:
+        response_data = json.loads(hasil['text'])
+        status = response_data['status']
+    except Exception:
+        return HASIL_DITOLAK, f"Response bukan JSON: {hasil['text']}"
+
+    if status == 'success':
+        return HASIL_TERKIRIM, response_data.get('message', '')
+    return HASIL_DITOLAK, response_data.get('message', 'Unknown error')
+
+
+class Outbox:
+    """Antrian persisten hasil ARI. Aman dipakai dari beberapa thread."""
+
+    def __init__(self, path):
+        import sqlite3  # baru dimuat saat outbox dibuka (GUI: setelah jendela tampil)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SKEMA)
+        kolom = [row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")]
+        if "instrumen" not in kolom:
+            # Outbox dari versi sebelum multi-instrumen
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN instrumen TEXT")
+
+        now = time.time()
+        with self._lock:
+            # Baris yang tertinggal 'dikirim' saat aplikasi mati → antri lagi
+            self._conn.execute(
+                "UPDATE outbox SET status=?, diperbarui=? WHERE status=?",
+                (STATUS_MENUNGGU, now, STATUS_DIKIRIM)
+            )
+            self._conn.execute(
+                "DELETE FROM outbox WHERE status IN (?, ?) AND diperbarui < ?",
+                (STATUS_TERKIRIM, STATUS_DIGANTI, now - SIMPAN_TERKIRIM_HARI * 86400)
+            )
+
+    def tambah(self, params, instrumen=None, status=STATUS_DIKIRIM):
+        """
+        Simpan hasil baru dengan status 'dikirim' (langsung dikirim oleh pemanggil),
+        atau status=STATUS_MENUNGGU agar dikirim PemutarUlang (mis. hasil rekonsiliasi).
+        Data lama yang masih aktif untuk kartu yang sama ditandai 'diganti'.
+        instrumen: port Saccharomat asal bacaan (hanya dicatat lokal).
+        Return id baris outbox.
+        """
+        kunci = kunci_idempotensi(params)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE outbox SET status=?, diperbarui=? WHERE kunci=? AND status IN (?, ?)",
+                    (STATUS_DIGANTI, now, kunci, STATUS_MENUNGGU, STATUS_DIKIRIM)
+                )
+                cur = self._conn.execute(
+                    "INSERT INTO outbox (kunci, kartu_ari, params, status, dibuat, diperbarui, instrumen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (kunci, str(params['kartu_ari']), json.dumps(params), status, now, now, instrumen)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cur.lastrowid
+
+    def klaim_jatuh_tempo(self, limit=20):
+        """Ambil baris 'menunggu' yang sudah waktunya dikirim ulang dan tandai 'dikirim'"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, params FROM outbox WHERE status=? AND coba_lagi<=? ORDER BY id LIMIT ?",
+                    (STATUS_MENUNGGU, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status=?, diperbarui=? WHERE id=?",
+                    [(STATUS_DIKIRIM, now, row_id) for row_id, _ in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(row_id, json.loads(params)) for row_id, params in rows]
+
+    def tandai_terkirim(self, row_id):
+        self._set_status(row_id, STATUS_TERKIRIM, None)
+
+    def tandai_ditolak(self, row_id, pesan):
+        self._set_status(row_id, STATUS_DITOLAK, pesan)
+
+    def jadwalkan_ulang(self, row_id, pesan, tambah_percobaan=True):
+        """Kembalikan baris ke antrian dengan jeda backoff"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT percobaan FROM outbox WHERE id=? AND status=?", (row_id, STATUS_DIKIRIM)
+            ).fetchone()
+            if row is None:
+                return
+            percobaan = row[0] + 1 if tambah_percobaan else row[0]
+            coba_lagi = now + hitung_backoff(percobaan) if tambah_percobaan else now
+            self._conn.execute(
+                "UPDATE outbox SET status=?, percobaan=?, coba_lagi=?, error=?, diperbarui=? WHERE id=?",
+                (STATUS_MENUNGGU, percobaan, coba_lagi, pesan, now, row_id)
+            )
+
+    def tandai_hasil(self, row_id, hasil_api):
+        """Klasifikasikan hasil pengiriman dan perbarui status baris. Return (HASIL_*, pesan)."""
+        hasil, pesan = klasifikasi_hasil(hasil_api)
+        if hasil == HASIL_TERKIRIM:
+            self.tandai_terkirim(row_id)
+        elif hasil == HASIL_DITOLAK:
+            self.tandai_ditolak(row_id, pesan)
+        else:
+            self.jadwalkan_ulang(row_id, pesan)
+        return hasil, pesan
+
+    def jumlah_antri(self):
+        """Jumlah data yang belum terkirim (menunggu + sedang dikirim)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status IN (?, ?)", (STATUS_MENUNGGU, STATUS_DIKIRIM)
+            ).fetchone()[0]
+
+    def _set_status(self, row_id, status, pesan):
+        # Hanya baris yang sedang 'dikirim' yang boleh diselesaikan, baris 'diganti' dibiarkan
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status=?, error=?, diperbarui=? WHERE id=? AND status=?",
+                (status, pesan, time.time(), row_id, STATUS_DIKIRIM)
+            )
+
+    def tutup(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PemutarUlang(threading.Thread):
+    """Thread background yang menguras outbox dengan retry/backoff"""
+
+    def __init__(self, outbox, kirim_banyak, on_hasil=None, interval=1.0, batch=20):
+        super().__init__(name="outbox-replay", daemon=True)
+        self.outbox = outbox
+        self.kirim_banyak = kirim_banyak  # fungsi [params] -> [hasil] (lihat klasifikasi_hasil)
+        self.on_hasil = on_hasil          # callback(row_id, params, hasil_klasifikasi, pesan)
+        self.interval = interval
+        self.batch = batch
+        self.gagal_beruntun = 0           # putaran berturut-turut yang gagal karena jaringan
+        self._berhenti = threading.Event()
+
+    def run(self):
+        jeda = self.interval
+        while not self._berhenti.wait(jeda):
+            try:
+                self.putar_sekali()
+            except Exception as e:
+                if self.on_hasil:
+                    self.on_hasil(None, None, HASIL_ULANG, f"Error outbox: {e}")
+            # Selama server tidak bisa dihubungi, seluruh replay ikut mundur
+            if self.gagal_beruntun:
+                jeda = max(self.interval, hitung_backoff(self.gagal_beruntun - 1))
+            else:
+                jeda = self.interval
+
+    def putar_sekali(self):
+        """Kirim satu batch baris yang sudah jatuh tempo. Return jumlah baris."""
+        rows = self.outbox.klaim_jatuh_tempo(self.batch)
+        if not rows:
+            return 0
+
+        daftar_hasil = self.kirim_banyak([params for _, params in rows])
+        ada_yang_sampai = False
+        for (row_id, params), hasil_api in zip(rows, daftar_hasil):
+            hasil, pesan = self.outbox.tandai_hasil(row_id, hasil_api)
+            if hasil != HASIL_ULANG:
+                ada_yang_sampai = True
+            if self.on_hasil:
+                self.on_hasil(row_id, params, hasil, pesan)
+
+        self.gagal_beruntun = 0 if ada_yang_sampai else self.gagal_beruntun + 1
+        return len(rows)
+
+    def stop(self):
+        self._berhenti.set()
@@ -0,0 +1,123 @@
+"""Pemantau hot-plug port serial (adapter USB-serial dicolok/dicabut).
+
+PemantauPort berjalan di thread latar dan memanggil on_berubah(ports,
+ditambah, dihapus) setiap kali daftar port berubah, sehingga operator tidak
+perlu menekan Refresh dan pembaca yang portnya hilang bisa dinyalakan ulang
+otomatis saat adapter dicolok kembali.
+
+Sumber event:
+  - udev  : Linux dengan pyudev terpasang. Thread tidur di monitor udev
+            (subsystem tty) dan hanya enumerasi ulang saat ada event add/remove.
+  - polling: selain itu, comports() dipanggil setiap `interval` detik lalu
+            hasilnya dibandingkan dengan daftar sebelumnya.
+Enumerasi ulang bisa dipaksa dengan pindai_ulang() (tombol Refresh).
+"""
+import threading
+
+try:
+    import pyudev
+except ImportError:   # pyudev opsional, hanya Linux
+    pyudev = None
+
+INTERVAL_POLLING = 2.0  # detik, jarak enumerasi pada mode polling
+JEDA_UDEV = 0.5         # detik, tunggu event udev berikutnya sebelum enumerasi (node /dev belum tentu siap)
+
+
+def daftar_port_serial():
+    """Device port serial yang terpasang (serial.tools.list_ports diimpor saat pertama dipakai)"""
+    import serial.tools.list_ports
+    return [port.device for port in serial.tools.list_ports.comports()]
+
+
+class PemantauPort(threading.Thread):
+    def __init__(self, on_berubah, on_log=None, interval=INTERVAL_POLLING, daftar_port=daftar_port_serial):
+        super().__init__(name="pemantau-port", daemon=True)
+        self.on_berubah = on_berubah      # callback(ports, ditambah, dihapus) dari thread pemantau
+        self.on_log = on_log
+        self.interval = interval
+        self.daftar_port = daftar_port
+        self.ports = None                 # daftar terakhir (None = belum pernah enumerasi)
+        self.mode = None                  # "udev" atau "polling"
+        self.jumlah_enumerasi = 0
+        self._berhenti = threading.Event()
+        self._segera = threading.Event()
+
+    def stop(self):
+        self._berhenti.set()
+        self._segera.set()
+
+    def pindai_ulang(self):
+        """Paksa enumerasi ulang secepatnya (aman dari thread mana pun)"""
+        self._segera.set()
+
+    def _log(self, pesan):
+        if self.on_log:
+            self.on_log(f"[PORT] {pesan}")
+
+    def run(self):
+        monitor = self._buka_udev()
+        self.mode = "udev" if monitor is not None else "polling"
+        self._log(f"Pemantau port aktif (mode {self.mode})")
+        self._pindai()
+        while not self._berhenti.is_set():
+            if monitor is not None:
+                ada_event = self._tunggu_udev(monitor)
+            else:
+                ada_event = True
+                self._segera.wait(self.interval)
+            self._segera.clear()
+            if self._berhenti.is_set():
+                break
+            if ada_event:
+                self._pindai()
+
+    def _buka_udev(self):
+        if pyudev is None:
+            return None
+        try:
+            monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            monitor.filter_by(subsystem="tty")
+            monitor.start()
+            return monitor
+        except Exception as e:
+            self._log(f"udev tidak tersedia ({e}), memakai polling")
+            return None
+
+    def _tunggu_udev(self, monitor):
+        """Tunggu event udev atau pindai_ulang(); return True jika perlu enumerasi ulang"""
+        # poll() dengan timeout singkat agar stop()/pindai_ulang() tetap terlayani
+        while not self._berhenti.is_set():
+            if self._segera.is_set():
+                return True
+            device = monitor.poll(timeout=1.0)
+            if device is None or device.action not in ("add", "remove"):
+                continue
+            # Satu colok adapter memicu beberapa event: kumpulkan dulu
+            while monitor.poll(timeout=JEDA_UDEV) is not None:
+                pass
+            return True
+        return False
+
+    def _pindai(self):
+        try:
+            ports = self.daftar_port()
+        except Exception as e:
+            self._log(f"Error: gagal membaca daftar port: {e}")
+            return
+        self.jumlah_enumerasi += 1
+        lama = self.ports
+        self.ports = ports
+        if lama is None:
+            self._lapor(ports, list(ports), [])
+            return
+        ditambah = [p for p in ports if p not in lama]
+        dihapus = [p for p in lama if p not in ports]
+        if ditambah or dihapus:
+            self._lapor(ports, ditambah, dihapus)
+
+    def _lapor(self, ports, ditambah, dihapus):
+        # Error di callback tidak boleh mematikan thread pemantau (hot-plug berhenti tanpa jejak)
+        try:
+            self.on_berubah(ports, ditambah, dihapus)
+        except Exception as e:
+            self._log(f"Error: callback perubahan port gagal: {type(e).__name__}: {e}")
@@ -0,0 +1,341 @@
+"""Worker pembaca serial Saccharomat (satu instance per port/instrumen).
+
+Beberapa PembacaSerial bisa berjalan bersamaan; setiap bacaan diteruskan
+ke callback bersama dengan tag port-nya sehingga satu workstation bisa
+melayani beberapa polarimeter sekaligus.
+
+Engine baca berbasis event, tanpa polling timeout:
+  - POSIX (port asli/pty): select pada file descriptor port + self-pipe
+    untuk pembatalan. Thread tidur sampai ada byte masuk atau stop().
+  - Lainnya (Windows, port replay): read(in_waiting or 1) blocking,
+    dibatalkan dengan cancel_read() seperti ReaderThread pyserial.
+Byte yang masuk dikumpulkan di buffer baris inkremental; setiap baris
+lengkap langsung di-parse lalu (opsional) disaring PendeteksiStabil
+sehingga on_bacaan hanya menerima satu bacaan stabil per sampel, saat
+sampel ditutup. Sampel yang tidak pernah ditutup instrumen diteruskan lewat
+tutup_sampel_tenang(), dipanggil berkala oleh PengawasSerial. Latensi dari byte terakhir diterima sampai
+bacaan selesai di-parse dicatat (latensi_terakhir_ms, rata_rata_latensi_ms,
+latensi_maks_ms).
+
+State: BERHENTI → MEMBUKA → BERJALAN → MENGHENTIKAN → BERHENTI
+"""
+import os
+import selectors
+import threading
+import time
+
+from rekaman import PerekamSerial
+from replay import buka_serial, RekamanHabis
+from saccharomat import ParserSaccharomat, FORMAT_DEFAULT
+from stabil import PendeteksiStabil
+
+BERHENTI = "BERHENTI"
+MEMBUKA = "MEMBUKA"
+BERJALAN = "BERJALAN"
+MENGHENTIKAN = "MENGHENTIKAN"
+
+UKURAN_BACA = 4096
+BUFFER_MAKS = 4096      # baris tanpa '\n' lebih panjang dari ini dianggap sampah
+
+
+class PembacaSerial:
+    def __init__(self, port, baudrate, on_bacaan, on_log, on_berhenti=None,
+                 formats=FORMAT_DEFAULT, rekam_folder=None, rekam_opsi=None, metrik=None,
+                 stabil_opsi=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.on_bacaan = on_bacaan        # callback(pembaca, bacaan, t_baca) dari thread serial
+        self.on_log = on_log              # callback(line), harus aman dari thread lain
+        self.on_berhenti = on_berhenti    # callback(pembaca, error) saat thread selesai
+        self.parser = ParserSaccharomat(formats)   # tabel format per jumlah kolom, tanpa state antar baris
+        self.rekam_folder = rekam_folder
+        self.rekam_opsi = rekam_opsi or {}
+        self.metrik = metrik              # metrik.Metrik opsional (tahap serial_parse, counter bacaan)
+        # stabil_opsi: kwargs PendeteksiStabil, None = setiap bacaan valid langsung diteruskan
+        self.stabil = PendeteksiStabil(**stabil_opsi) if stabil_opsi is not None else None
+        self._lock_stabil = threading.Lock()    # thread serial vs tutup_sampel_tenang() dari thread pengawas
+        self.state = BERHENTI
+        self._lock = threading.Lock()
+        self._pipa = None                 # (baca, tulis) self-pipe untuk membangunkan select
+        self._buffer = bytearray()
+        self._perekam = None
+        self.ser = None
+        self.thread = None
+        self.mode = None                  # "select" atau "blocking"
+        self.jumlah_baca = 0              # jumlah read() yang menghasilkan data (≈ wakeup thread)
+        self.jumlah_baris = 0
+        self.jumlah_bacaan = 0
+        self.jumlah_stabil = 0            # bacaan yang diteruskan ke on_bacaan
+        self.jumlah_dibuang = 0
+        self.bacaan_terakhir = None
+        self.t_data_terakhir = None       # perf_counter byte terakhir diterima (atau port terbuka)
+        self.latensi_terakhir_ms = None
+        self.latensi_maks_ms = 0.0
+        self._total_latensi_ms = 0.0
+
+    @property
+    def running(self):
+        return self.state in (MEMBUKA, BERJALAN)
+
+    @property
+    def hidup(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def rata_rata_latensi_ms(self):
+        if not self.jumlah_bacaan:
+            return None
+        return self._total_latensi_ms / self.jumlah_bacaan
+
+    def start(self):
+        with self._lock:
+            if self.state != BERHENTI:
+                raise RuntimeError(f"Pembaca {self.port} masih {self.state}")
+            self.state = MEMBUKA
+        self.thread = threading.Thread(target=self._jalankan, name=f"serial-{self.port}", daemon=True)
+        self.thread.start()
+
+    def stop(self, tunggu=None):
+        """Minta thread berhenti; `tunggu` detik menunggu thread selesai (None = tidak menunggu)"""
+        with self._lock:
+            if self.state not in (MEMBUKA, BERJALAN):
+                return
+            self.state = MENGHENTIKAN
+            self._bangunkan()
+        if tunggu is not None and self.thread and self.thread is not threading.current_thread():
+            self.thread.join(tunggu)
+
+    def _bangunkan(self):
+        """Bangunkan thread yang sedang menunggu byte (dipanggil dengan _lock dipegang)"""
+        if self._pipa:
+            try:
+                os.write(self._pipa[1], b"x")
+            except OSError:
+                pass
+        elif self.ser is not None:
+            try:
+                if hasattr(self.ser, "cancel_read"):
+                    self.ser.cancel_read()
+                else:
+                    self.ser.close()
+            except Exception:
+                pass
+
+    def _log(self, pesan):
+        self.on_log(f"[SERIAL] [{self.port}] {pesan}")
+
+    def _fd_port(self):
+        """File descriptor port untuk select (hanya POSIX), None jika tidak ada"""
+        if os.name != "posix" or not hasattr(self.ser, "fileno"):
+            return None
+        try:
+            return self.ser.fileno()
+        except Exception:
+            return None
+
+    def _jalankan(self):
+        error = None
+        try:
+            ser = buka_serial(self.port, self.baudrate, timeout=None)
+        except Exception as e:
+            self._log(f"Gagal buka serial: {e}")
+            self.state = BERHENTI
+            if self.on_berhenti:
+                self.on_berhenti(self, e)
+            return
+
+        with self._lock:
+            self.ser = ser
+            fd = self._fd_port()
+            if fd is not None:
+                self._pipa = os.pipe()
+                self.mode = "select"
+            else:
+                self.mode = "blocking"
+            self.t_data_terakhir = time.perf_counter()
+            if self.state == MEMBUKA:
+                self.state = BERJALAN
+        self._log(f"Koneksi berhasil (mode {self.mode})")
+
+        # Rekam byte mentah (ditulis thread terpisah, tidak memperlambat loop baca)
+        if self.rekam_folder:
+            try:
+                self._perekam = PerekamSerial(self.rekam_folder, prefix=self.port, **self.rekam_opsi)
+                self.on_log(f"[REKAM] [{self.port}] Rekaman serial ke folder {self.rekam_folder}")
+            except Exception as e:
+                self.on_log(f"[REKAM] [{self.port}] Error: tidak bisa membuat rekaman: {e}")
+
+        try:
+            if self.mode == "select":
+                self._loop_select(fd)
+            else:
+                self._loop_blocking()
+        except Exception as e:
+            if self.state == BERJALAN:  # Error saat stop() (port ditutup) bukan error
+                self._log(f"Error: {e}")
+                error = e
+
+        self._tutup()
+        if self.on_berhenti:
+            self.on_berhenti(self, error)
+
+    def _loop_select(self, fd):
+        pipa_baca = self._pipa[0]
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            sel.register(pipa_baca, selectors.EVENT_READ)
+            while self.state == BERJALAN:
+                # Tanpa timeout: thread hanya bangun karena byte masuk atau stop()
+                for key, _ in sel.select():
+                    if key.fd == pipa_baca:
+                        return
+                try:
+                    data = os.read(fd, UKURAN_BACA)
+                except BlockingIOError:
+                    continue
+                if not data:
+                    raise OSError("perangkat terputus")
+                self._terima(data, time.perf_counter())
+
+    def _loop_blocking(self):
+        ser = self.ser
+        while self.state == BERJALAN:
+            try:
+                data = ser.read(ser.in_waiting or 1)
+            except RekamanHabis as e:
+                # Sumber replay selesai: berhenti tanpa error (pengawas tidak menyambung ulang),
+                # sampel terakhir yang belum ditutup instrumen tetap diteruskan
+                self._log(str(e))
+                if self.stabil is not None:
+                    with self._lock_stabil:
+                        stabil = self.stabil.reset()
+                        if stabil is not None:
+                            self._teruskan(stabil, time.perf_counter())
+                return
+            if data:
+                self._terima(data, time.perf_counter())
+
+    def _terima(self, data, t_data):
+        """Tambah byte ke buffer dan proses setiap baris yang sudah lengkap"""
+        self.jumlah_baca += 1
+        self.t_data_terakhir = t_data
+        if self._perekam:
+            self._perekam.catat(data)
+        buffer = self._buffer
+        buffer += data
+        if b"\n" not in data:
+            if len(buffer) > BUFFER_MAKS:
+                self.jumlah_dibuang += 1
+                self.on_log(f"[DEBUG] [{self.port}] Buffer {len(buffer)} byte tanpa akhir baris, dibuang")
+                buffer.clear()
+            return
+        *lines, sisa = buffer.split(b"\n")
+        self._buffer = bytearray(sisa)
+        for raw in lines:
+            self._proses_baris(raw, t_data)
+
+    def _proses_baris(self, raw, t_data):
+        """t_data: waktu (perf_counter) chunk berisi byte terakhir baris ini diterima"""
+        line = raw.decode(errors="ignore").strip()
+        if not line:
+            return
+        self.jumlah_baris += 1
+
+        # tampilkan raw line ke console
+        self._log(line)
+
+        # Parse sesuai tabel format Saccharomat
+        bacaan = self.parser.parse(line)
+        if bacaan is None:
+            self.on_log(f"[DEBUG] [{self.port}] Format tidak dikenali: {line}")
+            if self.metrik is not None:
+                self.metrik.tambah("bacaan", "tidak_dikenal")
+            return
+
+        # Kolom bertanda '*' berarti instrumen belum punya nilai valid
+        if not bacaan.valid:
+            self.on_log(f"[DEBUG] [{self.port}] Parsed ({bacaan.format}): Pol Baca={bacaan.pol_baca}, "
+                        f"Brix={bacaan.brix}, Pol={bacaan.pol}")
+            self._log("Bacaan belum valid (*), diabaikan")
+            if self.metrik is not None:
+                self.metrik.tambah("bacaan", "belum_valid")
+            # Instrumen mulai mengukur sampel baru: kandidat sampel sebelumnya (jika ada) diteruskan
+            if self.stabil is not None:
+                with self._lock_stabil:
+                    stabil = self.stabil.reset()
+                    if stabil is not None:
+                        self._teruskan(stabil, t_data)
+            return
+
+        latensi_ms = (time.perf_counter() - t_data) * 1000
+        self.latensi_terakhir_ms = latensi_ms
+        self._total_latensi_ms += latensi_ms
+        if latensi_ms > self.latensi_maks_ms:
+            self.latensi_maks_ms = latensi_ms
+        self.jumlah_bacaan += 1
+        if self.metrik is not None:
+            self.metrik.amati("serial_parse", latensi_ms)
+            self.metrik.tambah("bacaan", "valid")
+        self.on_log(f"[DEBUG] [{self.port}] Parsed ({bacaan.format}): Pol Baca={bacaan.pol_baca}, "
+                    f"Brix={bacaan.brix}, Pol={bacaan.pol} (byte terakhir → bacaan {latensi_ms:.2f} ms)")
+
+        # Tahan bacaan sampai sampel selesai: satu bacaan (terakhir yang tenang) per sampel ke form/API
+        if self.stabil is None:
+            self._teruskan(bacaan, t_data)
+            return
+        with self._lock_stabil:
+            stabil = self.stabil.tambah(bacaan)
+            if stabil is not None:
+                self._teruskan(stabil, t_data)
+                return
+        if self.metrik is not None:
+            self.metrik.tambah("bacaan", "ditahan")
+
+    def tutup_sampel_tenang(self):
+        """
+        Teruskan kandidat sampel yang sudah lama tanpa bacaan valid baru (instrumen tidak
+        mengirim baris penutup). Dipanggil berkala dari thread lain. Return True jika ada.
+        """
+        if self.stabil is None or not self.stabil.menunggu:
+            return False
+        with self._lock_stabil:
+            stabil = self.stabil.tutup_jika_tenang()
+            if stabil is None:
+                return False
+            self._log(f"Tidak ada bacaan baru selama {self.stabil.batas_tenang:g} s, sampel ditutup")
+            self._teruskan(stabil, time.perf_counter())
+        return True
+
+    def _teruskan(self, bacaan, t_data):
+        if self.stabil is not None:
+            if self.metrik is not None:
+                self.metrik.tambah("bacaan", "stabil")
+            self._log(f"Bacaan stabil: Pol Baca={bacaan.pol_baca}, Brix={bacaan.brix}, Pol={bacaan.pol}")
+        self.jumlah_stabil += 1
+        self.bacaan_terakhir = bacaan
+        self.on_bacaan(self, bacaan, t_data)
+
+    def _tutup(self):
+        with self._lock:
+            if self.ser is not None:
+                try:
+                    self.ser.close()
+                except Exception:
+                    pass
+            if self._pipa:
+                for fd in self._pipa:
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+                self._pipa = None
+            self.state = BERHENTI
+
+        if self._perekam:
+            self._perekam.tutup()
+            self.on_log(f"[REKAM] [{self.port}] {self._perekam.jumlah_frame} frame disimpan ({self._perekam.path_aktif})")
+            self._perekam = None
+
+        if self.jumlah_bacaan:
+            self._log(f"{self.jumlah_baris} baris, {self.jumlah_bacaan} bacaan; latensi byte terakhir → bacaan "
+                      f"rata-rata {self.rata_rata_latensi_ms:.2f} ms, maks {self.latensi_maks_ms:.2f} ms")
@@ -0,0 +1,238 @@
+"""Pengawas (supervisor) pembaca serial: sambung ulang otomatis dengan backoff.
+
+PengawasSerial menjalankan satu PembacaSerial per port dan menjaganya tetap
+hidup selama serial ON:
+  - pembaca berhenti karena error (port dicabut, error baca) → port dibuka
+    ulang setelah jeda backoff eksponensial (backoff_awal, x2, ... backoff_maks);
+  - thread pembaca mati tanpa melapor (state masih jalan tapi thread tidak
+    hidup) → diperlakukan sama dengan error;
+  - stream macet: tidak ada byte selama `batas_diam` detik → pembaca dihentikan
+    dan port dibuka ulang (0 = nonaktif, karena Saccharomat diam di antara sampel).
+Setiap pemeriksaan juga menutup sampel yang sudah tenang tanpa baris penutup
+(PembacaSerial.tutup_sampel_tenang), agar sampel terakhir satu nampan tidak tertahan.
+Pembaca yang selesai tanpa error (mis. rekaman replay habis) tidak disambung ulang.
+
+Status per port: ON, MENYAMBUNG, TERPUTUS, OFF. Jumlah sambung ulang dan total
+waktu putus dicatat per port (statistik()).
+"""
+import threading
+import time
+
+from pembaca import PembacaSerial, BERJALAN, MEMBUKA
+
+ON = "ON"
+MENYAMBUNG = "MENYAMBUNG"
+TERPUTUS = "TERPUTUS"
+OFF = "OFF"
+
+INTERVAL_CEK = 1.0      # detik, jarak pemeriksaan thread mati/stream macet
+INTERVAL_BUKA = 0.1     # detik, jarak pemeriksaan selama port sedang dibuka
+JEDA_STABIL = 10.0      # detik tersambung sebelum backoff kembali ke awal
+
+
+class _Slot:
+    """State pengawasan satu port"""
+
+    def __init__(self, port):
+        self.port = port
+        self.pembaca = None
+        self.status = OFF
+        self.percobaan = 0              # percobaan buka ulang berturut-turut (eksponen backoff)
+        self.t_coba = None              # waktu (monotonic) percobaan buka berikutnya, None = tidak dijadwalkan
+        self.t_putus = None             # waktu (monotonic) mulai putus, None = tersambung
+        self.t_tersambung = None
+        self.jumlah_sambung_ulang = 0
+        self.total_putus = 0.0          # detik, putus yang sudah selesai
+
+    def lama_putus(self, sekarang):
+        """Total waktu putus termasuk yang sedang berlangsung"""
+        if self.t_putus is None:
+            return self.total_putus
+        return self.total_putus + (sekarang - self.t_putus)
+
+
+class PengawasSerial(threading.Thread):
+    def __init__(self, ports, baudrate, on_bacaan, on_log, on_status=None, opsi_pembaca=None,
+                 backoff_awal=1.0, backoff_maks=30.0, batas_diam=0):
+        super().__init__(name="pengawas-serial", daemon=True)
+        self.baudrate = baudrate
+        self.on_bacaan = on_bacaan          # callback(pembaca, bacaan, t_baca) dari thread serial
+        self.on_log = on_log
+        self.on_status = on_status          # callback(pengawas, port, status) dari thread pengawas/serial
+        self.opsi_pembaca = opsi_pembaca or {}
+        self.backoff_awal = backoff_awal
+        self.backoff_maks = backoff_maks
+        self.batas_diam = batas_diam
+        self._slot = {port: _Slot(port) for port in ports}
+        self._lock = threading.Lock()
+        self._berhenti = threading.Event()
+        self._bangun = threading.Event()
+
+    # --- kontrol ---
+
+    def mulai(self):
+        for slot in self._slot.values():
+            with self._lock:
+                self._buka(slot)
+        self.start()
+
+    def berhenti(self, tunggu=None):
+        self._berhenti.set()
+        self._bangun.set()
+        with self._lock:
+            daftar = [slot.pembaca for slot in self._slot.values() if slot.pembaca]
+            for slot in self._slot.values():
+                self._selesai_putus(slot, time.monotonic())
+                slot.t_coba = None
+                self._set_status(slot, OFF)
+        for pembaca in daftar:
+            pembaca.stop(tunggu=tunggu)
+
+    def coba_sekarang(self, port):
+        """Percepat percobaan buka ulang port yang terputus (mis. adapter baru dicolok)"""
+        with self._lock:
+            slot = self._slot.get(port)
+            if slot is None or slot.t_coba is None:
+                return
+            slot.t_coba = time.monotonic()
+        self._bangun.set()
+
+    # --- info ---
+
+    def pembaca(self, port):
+        slot = self._slot.get(port)
+        return slot.pembaca if slot else None
+
+    def status(self, port):
+        slot = self._slot.get(port)
+        return slot.status if slot else None
+
+    @property
+    def aktif(self):
+        """True selama masih ada port yang jalan atau menunggu disambung ulang"""
+        return not self._berhenti.is_set() and any(s.status != OFF for s in self._slot.values())
+
+    def statistik(self):
+        """dict port → (status, jumlah_sambung_ulang, total_putus_detik)"""
+        sekarang = time.monotonic()
+        with self._lock:
+            return {port: (s.status, s.jumlah_sambung_ulang, s.lama_putus(sekarang))
+                    for port, s in self._slot.items()}
+
+    # --- internal ---
+
+    def _log(self, port, pesan):
+        self.on_log(f"[SERIAL] [{port}] {pesan}")
+
+    def _set_status(self, slot, status):
+        if slot.status == status:
+            return
+        slot.status = status
+        if self.on_status:
+            self.on_status(self, slot.port, status)
+
+    def _buka(self, slot):
+        """Buat dan jalankan pembaca baru untuk slot (dipanggil dengan _lock dipegang)"""
+        slot.t_coba = None
+        slot.pembaca = PembacaSerial(
+            slot.port, self.baudrate,
+            on_bacaan=self.on_bacaan,
+            on_log=self.on_log,
+            on_berhenti=self._pembaca_berhenti,
+            **self.opsi_pembaca
+        )
+        self._set_status(slot, MENYAMBUNG)
+        slot.pembaca.start()
+
+    def _jadwalkan(self, slot, sekarang, alasan):
+        """Tandai slot putus dan jadwalkan buka ulang (dipanggil dengan _lock dipegang)"""
+        slot.pembaca = None
+        slot.t_tersambung = None
+        if slot.t_putus is None:
+            slot.t_putus = sekarang
+        jeda = min(self.backoff_maks, self.backoff_awal * (2 ** slot.percobaan))
+        slot.percobaan += 1
+        slot.t_coba = sekarang + jeda
+        self._set_status(slot, TERPUTUS)
+        self._log(slot.port, f"{alasan}, buka ulang dalam {jeda:.0f} s (percobaan {slot.percobaan})")
+        self._bangun.set()
+
+    def _selesai_putus(self, slot, sekarang):
+        if slot.t_putus is not None:
+            slot.total_putus += sekarang - slot.t_putus
+            slot.t_putus = None
+
+    def _pembaca_berhenti(self, pembaca, error):
+        """Callback PembacaSerial saat thread selesai (thread serial)"""
+        sekarang = time.monotonic()
+        with self._lock:
+            slot = self._slot.get(pembaca.port)
+            # Pembaca lama yang sudah diganti/dihentikan pengawas tidak diproses lagi
+            if slot is None or slot.pembaca is not pembaca or self._berhenti.is_set():
+                return
+            if error is not None:
+                self._jadwalkan(slot, sekarang, f"Terputus ({error})")
+                return
+            slot.pembaca = None
+            self._selesai_putus(slot, sekarang)
+            self._set_status(slot, OFF)
+
+    def run(self):
+        while not self._berhenti.is_set():
+            self._bangun.wait(self._jeda_berikut())
+            self._bangun.clear()
+            if self._berhenti.is_set():
+                break
+            self._periksa(time.monotonic())
+
+    def _jeda_berikut(self):
+        """Tidur sampai pemeriksaan berikutnya atau percobaan buka ulang terdekat"""
+        with self._lock:
+            jadwal = [slot.t_coba for slot in self._slot.values() if slot.t_coba is not None]
+            interval = INTERVAL_BUKA if any(s.status == MENYAMBUNG for s in self._slot.values()) else INTERVAL_CEK
+        if not jadwal:
+            return interval
+        return max(0.0, min(interval, min(jadwal) - time.monotonic()))
+
+    def _periksa(self, sekarang):
+        macet = []
+        berjalan = []
+        with self._lock:
+            for slot in self._slot.values():
+                pembaca = slot.pembaca
+                if pembaca is None:
+                    if slot.t_coba is not None and sekarang >= slot.t_coba:
+                        self._log(slot.port, f"Menyambung ulang (percobaan {slot.percobaan})...")
+                        self._buka(slot)
+                    continue
+
+                if pembaca.state in (MEMBUKA, BERJALAN) and not pembaca.hidup:
+                    self._jadwalkan(slot, sekarang, "Thread pembaca mati")
+                    continue
+
+                if pembaca.state != BERJALAN:
+                    continue
+                if slot.status != ON:
+                    # Port berhasil dibuka
+                    slot.t_tersambung = sekarang
+                    if slot.t_putus is not None:
+                        slot.jumlah_sambung_ulang += 1
+                        self._log(slot.port, f"Tersambung kembali setelah {sekarang - slot.t_putus:.1f} s "
+                                             f"(sambung ulang ke-{slot.jumlah_sambung_ulang})")
+                    self._selesai_putus(slot, sekarang)
+                    self._set_status(slot, ON)
+                elif slot.percobaan and sekarang - slot.t_tersambung >= JEDA_STABIL:
+                    slot.percobaan = 0
+
+                if self.batas_diam and time.perf_counter() - pembaca.t_data_terakhir > self.batas_diam:
+                    macet.append(pembaca)
+                    self._jadwalkan(slot, sekarang, f"Tidak ada data selama {self.batas_diam:g} s")
+                else:
+                    berjalan.append(pembaca)
+
+        # stop() di luar _lock: thread pembaca memanggil _pembaca_berhenti yang juga butuh _lock
+        for pembaca in macet:
+            pembaca.stop()
+        # Di luar _lock juga: on_bacaan dipanggil dari thread ini
+        for pembaca in berjalan:
+            pembaca.tutup_sampel_tenang()
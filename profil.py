@@ -0,0 +1,44 @@
+"""Pencatat waktu startup untuk opsi --profile-startup.
+
+Setiap tahap (impor, pembuatan widget, inisialisasi latar) ditandai dengan
+tandai(); durasinya dihitung dari tanda sebelumnya. Tahap yang berjalan di
+thread latar dicatat terpisah dengan catat(). Untuk rincian per modul,
+jalankan juga `python -X importtime index.py`.
+"""
+import threading
+import time
+
+
+class ProfilStartup:
+    def __init__(self, aktif=False):
+        self.aktif = aktif
+        self.t0 = time.perf_counter()
+        self._t = self.t0
+        self._lock = threading.Lock()
+        self.tahap = []     # (nama, durasi_ms, latar)
+
+    def tandai(self, nama):
+        """Akhiri tahap `nama` (thread utama) yang dimulai sejak tanda sebelumnya"""
+        sekarang = time.perf_counter()
+        with self._lock:
+            self.tahap.append((nama, (sekarang - self._t) * 1000, False))
+        self._t = sekarang
+
+    def catat(self, nama, mulai):
+        """Catat tahap latar yang dimulai pada perf_counter `mulai`"""
+        durasi_ms = (time.perf_counter() - mulai) * 1000
+        with self._lock:
+            self.tahap.append((nama, durasi_ms, True))
+        return durasi_ms
+
+    def total_ms(self):
+        return (time.perf_counter() - self.t0) * 1000
+
+    def laporan(self, judul="Startup"):
+        """Baris-baris laporan '[PROFIL] ...'"""
+        with self._lock:
+            tahap = list(self.tahap)
+        baris = [f"[PROFIL] {judul}: {self.total_ms():.0f} ms sejak proses mulai"]
+        for nama, durasi_ms, latar in tahap:
+            baris.append(f"[PROFIL]   {nama:<34s} {durasi_ms:8.1f} ms{' (latar)' if latar else ''}")
+        return baris
@@ -0,0 +1,159 @@
+"""Rekaman byte mentah dari port serial ke file biner yang dirotasi.
+
+Format file (.arirec):
+    header  : MAGIC (8 byte)
+    frame   : struct "<dI" (waktu epoch detik, panjang data) + data mentah
+
+PerekamSerial.catat() hanya memasukkan frame ke antrian; penulisan ke disk
+(buffered) dan rotasi file dilakukan thread terpisah sehingga tidak
+menambah latensi loop baca serial. File yang sama bisa dipakai sebagai
+input replay (lihat replay.py).
+"""
+import os
+import queue
+import re
+import struct
+import threading
+import time
+
+MAGIC = b"ARIREC1\n"
+HEADER_FRAME = struct.Struct("<dI")
+EKSTENSI = ".arirec"
+
+_SELESAI = object()
+
+# <stempel>[-<nomor>] di akhir nama file; nomor dipakai jika stempel yang sama sudah ada
+POLA_URUTAN = re.compile(r"(\d{8}-\d{9})(?:-(\d+))?$")
+
+
+def nama_aman(teks):
+    """Nama port → bagian nama file (mis. '/dev/ttyUSB0' → 'dev_ttyUSB0')"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', teks).strip('_') or "serial"
+
+
+def urutan_rekaman(nama):
+    """Kunci urut nama file rekaman: (stempel, nomor); '<stempel>.arirec' sebelum '<stempel>-1.arirec'"""
+    dasar = nama[:-len(EKSTENSI)] if nama.endswith(EKSTENSI) else nama
+    m = POLA_URUTAN.search(dasar)
+    if m is None:
+        return ("", 0, nama)
+    return (m.group(1), int(m.group(2) or 0), nama)
+
+
+def adalah_rekaman_biner(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def baca_frame(path):
+    """Generator (waktu, data) dari satu file rekaman biner"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} bukan file rekaman {EKSTENSI}")
+        while True:
+            header = f.read(HEADER_FRAME.size)
+            if len(header) < HEADER_FRAME.size:
+                return
+            waktu, panjang = HEADER_FRAME.unpack(header)
+            data = f.read(panjang)
+            if len(data) < panjang:
+                # Frame terakhir terpotong (aplikasi mati saat menulis)
+                return
+            yield waktu, data
+
+
+class PerekamSerial:
+    """Perekam frame serial dengan writer thread, buffer, dan rotasi ukuran"""
+
+    def __init__(self, folder, prefix="serial", maks_byte=5 * 1024 * 1024, maks_file=20,
+                 buffer_byte=64 * 1024, interval_flush=1.0):
+        self.folder = folder
+        self.prefix = nama_aman(prefix)
+        self.maks_byte = maks_byte
+        self.maks_file = maks_file
+        self.buffer_byte = buffer_byte
+        self.interval_flush = interval_flush
+        self.jumlah_frame = 0
+        self.jumlah_dibuang = 0
+        self.path_aktif = None
+        self._antrian = queue.SimpleQueue()
+        self._file = None
+        self._ukuran = 0
+        os.makedirs(folder, exist_ok=True)
+        self._thread = threading.Thread(target=self._tulis_loop, name=f"rekam-{self.prefix}", daemon=True)
+        self._thread.start()
+
+    def catat(self, data, waktu=None):
+        """Catat satu frame (dipanggil dari thread serial, tidak pernah blocking ke disk)"""
+        if data:
+            self._antrian.put((time.time() if waktu is None else waktu, data))
+
+    def tutup(self, timeout=5):
+        self._antrian.put(_SELESAI)
+        self._thread.join(timeout)
+
+    def _tulis_loop(self):
+        try:
+            while True:
+                try:
+                    item = self._antrian.get(timeout=self.interval_flush)
+                except queue.Empty:
+                    if self._file:
+                        self._file.flush()
+                    continue
+                if item is _SELESAI:
+                    break
+                self._tulis(*item)
+        finally:
+            self._tutup_file()
+
+    def _tulis(self, waktu, data):
+        try:
+            if self._file is None or self._ukuran >= self.maks_byte:
+                self._rotasi()
+            self._file.write(HEADER_FRAME.pack(waktu, len(data)))
+            self._file.write(data)
+            self._ukuran += HEADER_FRAME.size + len(data)
+            self.jumlah_frame += 1
+        except OSError:
+            # Disk penuh / folder hilang: frame dibuang, pembacaan serial tetap jalan
+            self.jumlah_dibuang += 1
+            self._tutup_file()
+
+    def _tutup_file(self):
+        """Tutup file aktif; gagal flush saat menutup (disk penuh) tidak boleh membocorkan handle"""
+        f, self._file = self._file, None
+        if f is not None:
+            try:
+                f.close()
+            except OSError:
+                pass
+
+    def _rotasi(self):
+        self._tutup_file()
+        sekarang = time.time()
+        stempel = time.strftime("%Y%m%d-%H%M%S", time.localtime(sekarang)) + f"{int(sekarang % 1 * 1000):03d}"
+        path = os.path.join(self.folder, f"{self.prefix}-{stempel}{EKSTENSI}")
+        nomor = 1
+        while os.path.exists(path):
+            path = os.path.join(self.folder, f"{self.prefix}-{stempel}-{nomor}{EKSTENSI}")
+            nomor += 1
+        self._file = open(path, "wb", buffering=self.buffer_byte)
+        self._file.write(MAGIC)
+        self._ukuran = len(MAGIC)
+        self.path_aktif = path
+        self._hapus_lama()
+
+    def _hapus_lama(self):
+        """Simpan hanya maks_file rekaman terbaru untuk prefix ini"""
+        # Urut per stempel lalu nomor: urutan nama biasa menaruh '-1' sebelum file tanpa nomor
+        files = sorted(
+            (f for f in os.listdir(self.folder)
+             if f.startswith(self.prefix + "-") and f.endswith(EKSTENSI)),
+            key=urutan_rekaman
+        )
+        for nama in files[:-self.maks_file]:
+            try:
+                os.remove(os.path.join(self.folder, nama))
+            except OSError:
+                pass
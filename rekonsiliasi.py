@@ -0,0 +1,223 @@
+"""Rekonsiliasi hasil yang tercatat terkirim di riwayat lokal dengan data server.
+
+Respon sukses belum menjamin data benar-benar ada di server (rollback di
+sisi PHP, database dipulihkan, dsb.). Rekonsiliasi berjalan berkala di
+thread latar:
+  1. daftar kartu 'selesai' dan 'pending' diambil dari server per halaman
+     (ApiClient.ambil_halaman). Halaman pertama memberi jumlah_halaman,
+     sisanya diambil bersamaan oleh `workers` thread (pool keep-alive
+     ApiClient), jadi satu musim penuh tetap beberapa round trip saja;
+  2. kartu yang di riwayat lokal berstatus terkirim dibandingkan dengan
+     operasi set: hilang = (lokal − selesai) ∪ (lokal ∩ pending);
+  3. hasil yang hilang dimasukkan lagi ke outbox berstatus menunggu dan
+     dikirim PemutarUlang seperti kiriman tertunda biasa; status riwayat
+     menjadi 'ulang' dengan outbox_id baris baru dan ulang_ke bertambah.
+Hanya hasil berstatus terkirim yang dibandingkan: hasil yang sudah diantrikan
+ulang dilewati sampai kiriman ulangnya dikonfirmasi server. Server yang
+menjawab sukses tapi tetap tidak menyimpan hasil tidak dikirimi ulang terus:
+setelah `maks_ulang` kali status riwayat menjadi 'hilang' dan kartu dilaporkan
+sebagai error untuk diperiksa manual.
+
+Jendela `sejak_hari` dihitung dengan jam server (server_time halaman pertama,
+disimpan sebagai watermark) lalu digeser selisih jam server−lokal untuk
+memfilter riwayat, jadi jam PC yang melenceng tidak membuat kartu di tepi
+jendela dianggap hilang. Server lama yang belum mendukung halaman mengirim
+daftar pending penuh: yang dibandingkan hanya lokal ∩ pending. Hanya hasil yang
+sudah terkirim sebelum rekonsiliasi dimulai yang diperiksa, jadi kiriman yang
+sedang berjalan tidak ikut dianggap hilang.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from outbox import STATUS_MENUNGGU, HASIL_TERKIRIM
+from riwayat import STATUS_HILANG
+
+PER_HALAMAN = 500
+WORKERS = 4
+JEDA_AWAL = 60.0        # detik setelah start sebelum rekonsiliasi pertama (outbox dikuras dulu)
+MAKS_ULANG = 3          # kirim ulang per hasil sebelum dilaporkan hilang
+
+KOLOM_PARAMS = (("brix", "brix_ari"), ("pol", "pol_ari"), ("pol_baca", "pol_baca_ari"),
+                ("rendemen", "rendemen_ari"), ("versi_rumus", "versi_rumus"), ("id_kartu", "id"))
+
+
+class GagalRekonsiliasi(Exception):
+    pass
+
+
+class HasilRekonsiliasi:
+    """Ringkasan satu putaran rekonsiliasi"""
+
+    def __init__(self):
+        self.lokal = 0              # kartu terkirim di riwayat
+        self.selesai = None         # kartu selesai di server (None = server tidak mendukung)
+        self.pending = 0
+        self.halaman = 0            # request halaman yang dikirim
+        self.hilang = []            # kartu_ari yang diantrikan ulang
+        self.menyerah = []          # kartu_ari yang sudah maks_ulang kali dikirim ulang (status 'hilang')
+        self.server_time = None     # jam server saat rekonsiliasi (None = server tidak mengirim)
+        self.selisih_jam = 0.0      # detik, jam server − jam lokal
+        self.detik = 0.0
+
+    def __str__(self):
+        selesai = "?" if self.selesai is None else self.selesai
+        teks = (f"{self.lokal} kartu lokal, server {selesai} selesai/{self.pending} pending "
+                f"({self.halaman} halaman, {self.detik:.1f} s), {len(self.hilang)} dikirim ulang")
+        if self.menyerah:
+            teks += f", {len(self.menyerah)} tetap hilang"
+        if abs(self.selisih_jam) >= 1:
+            teks += f", jam server {self.selisih_jam:+.0f} s dari jam lokal"
+        return teks
+
+
+def params_dari_riwayat(row):
+    """Susun ulang parameter API dari baris riwayat hasil"""
+    params = {'kartu_ari': row['kartu_ari']}
+    for kolom, nama in KOLOM_PARAMS:
+        if row[kolom] is not None:
+            params[nama] = row[kolom]
+    return params
+
+
+class Rekonsiliasi(threading.Thread):
+    def __init__(self, api, riwayat, outbox, on_log=None, interval=1800.0, per_halaman=PER_HALAMAN,
+                 workers=WORKERS, sejak_hari=0, metrik=None, jeda_awal=JEDA_AWAL, maks_ulang=MAKS_ULANG):
+        super().__init__(name="rekonsiliasi", daemon=True)
+        self.api = api
+        self.riwayat = riwayat
+        self.outbox = outbox
+        self.on_log = on_log
+        self.interval = interval
+        self.per_halaman = per_halaman
+        self.workers = workers
+        self.sejak_hari = sejak_hari    # 0 = seluruh riwayat
+        self.metrik = metrik
+        self.jeda_awal = jeda_awal
+        self.maks_ulang = maks_ulang
+        self.terakhir = None            # HasilRekonsiliasi putaran terakhir
+        self.watermark = None           # server_time putaran terakhir yang selesai
+        self._lock = threading.Lock()   # satu putaran pada satu waktu (thread + tombol)
+        self._berhenti = threading.Event()
+        self._segera = threading.Event()
+
+    def _log(self, pesan):
+        if self.on_log:
+            self.on_log(f"[REKONSILIASI] {pesan}")
+
+    def stop(self):
+        self._berhenti.set()
+        self._segera.set()
+
+    def jalankan_sekarang(self):
+        """Minta putaran rekonsiliasi secepatnya (aman dari thread mana pun)"""
+        self._segera.set()
+
+    def run(self):
+        jeda = self.jeda_awal
+        while not self._berhenti.is_set():
+            self._segera.wait(jeda)
+            self._segera.clear()
+            if self._berhenti.is_set():
+                break
+            try:
+                self.rekonsiliasi()
+            except Exception as e:
+                self._log(f"Error: {e}")
+            jeda = self.interval
+
+    # --- satu putaran ---
+
+    def rekonsiliasi(self):
+        """Jalankan satu putaran (blocking). Return HasilRekonsiliasi."""
+        with self._lock:
+            hasil = HasilRekonsiliasi()
+            mulai = time.perf_counter()
+            t_mulai = time.time()
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rekonsiliasi") as pool:
+                pending, server_time = self._ambil_daftar(pool, "pending", None, hasil)
+                # Jendela dihitung dengan jam server; tanpa server_time (server lama) pakai jam lokal
+                if server_time is not None:
+                    hasil.server_time = server_time
+                    hasil.selisih_jam = server_time - time.time()
+                sejak = None
+                if self.sejak_hari:
+                    sejak = (server_time or time.time()) - self.sejak_hari * 86400
+                selesai, _ = self._ambil_daftar(pool, "selesai", sejak, hasil)
+            lokal = self.riwayat.kartu_terkirim(
+                sebelum=t_mulai, sejak=None if sejak is None else sejak - hasil.selisih_jam)
+
+            hilang = lokal.keys() & pending
+            if selesai is not None:
+                hilang |= lokal.keys() - selesai
+            hasil.lokal = len(lokal)
+            hasil.selesai = None if selesai is None else len(selesai)
+            hasil.pending = len(pending)
+            if hilang:
+                self._antrikan_ulang([lokal[kartu] for kartu in hilang], hasil)
+
+            hasil.detik = time.perf_counter() - mulai
+            self.terakhir = hasil
+            if server_time is not None:
+                self.watermark = server_time
+            if self.metrik is not None:
+                self.metrik.amati("rekonsiliasi", hasil.detik * 1000)
+                self.metrik.tambah("rekonsiliasi", "hilang", len(hasil.hilang))
+                if hasil.menyerah:
+                    self.metrik.tambah("rekonsiliasi", "menyerah", len(hasil.menyerah))
+            self._log(str(hasil))
+            return hasil
+
+    def _ambil_halaman(self, status, halaman, sejak):
+        response, _ = self.api.ambil_halaman(status, halaman, self.per_halaman, sejak=sejak)
+        if response.status_code != 200:
+            raise GagalRekonsiliasi(f"daftar {status} halaman {halaman}: status {response.status_code}")
+        data = response.json()
+        if data.get('status') != 'success':
+            raise GagalRekonsiliasi(f"daftar {status} halaman {halaman}: {data.get('message', 'Unknown error')}")
+        return data
+
+    def _ambil_daftar(self, pool, status, sejak, hasil):
+        """
+        (set kartu_ari dari semua halaman daftar `status`, server_time halaman pertama atau None).
+        Halaman 2.. diambil bersamaan. Set None untuk 'selesai' jika server tidak mendukung halaman.
+        """
+        pertama = self._ambil_halaman(status, 1, sejak)
+        hasil.halaman += 1
+        server_time = pertama.get('server_time')
+        if server_time is not None:
+            server_time = float(server_time)
+        if 'jumlah_halaman' not in pertama:
+            # Server lama: parameter diabaikan, isinya daftar pending penuh
+            if status == "selesai":
+                return None, server_time
+            return {str(item['kartu_ari']) for item in pertama.get('data', [])}, server_time
+
+        kartu = {str(item['kartu_ari']) for item in pertama.get('data', [])}
+        sisa = range(2, int(pertama['jumlah_halaman']) + 1)
+        for data in pool.map(lambda n: self._ambil_halaman(status, n, sejak), sisa):
+            kartu.update(str(item['kartu_ari']) for item in data.get('data', []))
+            hasil.halaman += 1
+        return kartu, server_time
+
+    def _antrikan_ulang(self, daftar_id, hasil):
+        for row in self.riwayat.hasil_per_id(daftar_id):
+            if row['status'] != HASIL_TERKIRIM:
+                continue        # sudah diantrikan ulang / ditandai sejak daftar lokal diambil
+            if row['ulang_ke'] >= self.maks_ulang:
+                pesan = f"Tetap tidak ada di server setelah {row['ulang_ke']} kali kirim ulang"
+                self.riwayat.tandai(row['id'], STATUS_HILANG, pesan)
+                hasil.menyerah.append(row['kartu_ari'])
+                self._log(f"Error: kartu {row['kartu_ari']} {pesan.lower()}, periksa manual di server")
+                continue
+            params = params_dari_riwayat(row)
+            try:
+                outbox_id = self.outbox.tambah(params, instrumen=row['instrumen'], status=STATUS_MENUNGGU)
+            except Exception as e:
+                self._log(f"Error: kartu {row['kartu_ari']} gagal dimasukkan ke outbox: {e}")
+                continue
+            self.riwayat.antri_ulang(row['id'], outbox_id, "Tidak ditemukan di server (rekonsiliasi)")
+            hasil.hilang.append(row['kartu_ari'])
+            self._log(f"Kartu {row['kartu_ari']} tidak ada di server, dikirim ulang lewat outbox "
+                      f"({row['ulang_ke'] + 1}/{self.maks_ulang})")
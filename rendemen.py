@@ -0,0 +1,34 @@
+"""Perhitungan rendemen ARI dan penyusunan parameter kirim ke API.
+
+Rumus yang bisa dikonfigurasi per PG/musim ada di rumus.py (default memakai
+konstanta di bawah). Versi vektor (NumPy) untuk hitung ulang data historis ada
+di rendemen_bulk.py.
+"""
+
+FAKTOR = 0.7        # faktor rendemen
+KOEF_NIRA = 0.5     # koefisien non-pol (Brix − Pol)
+
+
+def hitung_rendemen(brix, pol, faktor=FAKTOR, koef=KOEF_NIRA):
+    """Rendemen = faktor × (Pol − koef × (Brix − Pol)), default 0.7 × (Pol − 0.5 × (Brix − Pol))"""
+    return faktor * (pol - koef * (brix - pol))
+
+
+def buat_params(kartu_ari, pol_baca, brix, pol, rendemen=None, rumus=None):
+    """
+    Susun parameter API untuk satu hasil; rendemen dibulatkan 2 desimal seperti di form.
+    rumus: Rumus (rumus.py) yang dipakai; versinya ikut dikirim sebagai versi_rumus.
+    """
+    if rendemen is None:
+        nilai = rumus.hitung(brix, pol, pol_baca) if rumus else hitung_rendemen(brix, pol)
+        rendemen = round(nilai, 2)
+    params = {
+        'kartu_ari': kartu_ari,
+        'brix_ari': brix,
+        'pol_ari': pol,
+        'pol_baca_ari': pol_baca,
+        'rendemen_ari': rendemen
+    }
+    if rumus:
+        params['versi_rumus'] = rumus.versi_lengkap
+    return params
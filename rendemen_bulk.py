@@ -0,0 +1,231 @@
+"""Hitung ulang rendemen secara massal (NumPy) dari CSV, riwayat, atau outbox lokal.
+
+Dipakai saat faktor/rumus rendemen berubah dan data satu musim harus dihitung
+ulang. Data dibaca per potongan (`--chunk` baris), dihitung dalam array, lalu
+langsung ditulis ke CSV keluaran, sehingga pemakaian memori tetap terbatas
+berapa pun jumlah barisnya.
+
+Jalankan:
+    python rendemen_bulk.py --csv musim2026.csv --out musim2026_ulang.csv --faktor 0.68
+    python rendemen_bulk.py --riwayat riwayat_ari.db --out musim2026_ulang.csv
+    python rendemen_bulk.py --db outbox_ari.db --out outbox_ulang.csv
+    python rendemen_bulk.py --csv musim2026.csv --out ulang.csv --rumus-file rumus_rendemen.json --rumus pg-2026
+
+CSV masukan harus punya header dengan kolom brix_ari dan pol_ari (nama bisa
+diganti lewat --kolom-brix/--kolom-pol). Semua kolom asli ikut ditulis,
+ditambah kolom rendemen_baru. Nilai yang bukan angka menghasilkan rendemen kosong.
+
+Untuk satu musim penuh pakai --riwayat (riwayat.py menyimpan setiap hasil
+permanen); outbox membuang baris terkirim setelah 30 hari.
+"""
+import argparse
+import csv
+import sqlite3
+import sys
+import time
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:   # numpy hanya dibutuhkan untuk hitung massal
+    np = None
+
+from rendemen import FAKTOR, KOEF_NIRA
+from rumus import muat_rumus
+
+KOLOM_BRIX = "brix_ari"
+KOLOM_POL = "pol_ari"
+KOLOM_POL_BACA = "pol_baca_ari"
+KOLOM_HASIL = "rendemen_baru"
+CHUNK_DEFAULT = 100_000
+
+# Kolom yang diambil dari params JSON outbox (status 'diganti' dilewati)
+SQL_OUTBOX = """
+SELECT id, kartu_ari, instrumen, dibuat,
+       json_extract(params, '$.pol_baca_ari'), json_extract(params, '$.brix_ari'),
+       json_extract(params, '$.pol_ari'), json_extract(params, '$.rendemen_ari')
+FROM outbox WHERE status != 'diganti' ORDER BY id
+"""
+HEADER_OUTBOX = ("id", "kartu_ari", "instrumen", "dibuat", "pol_baca_ari", KOLOM_BRIX, KOLOM_POL, "rendemen_ari")
+
+# Tabel hasil riwayat (semua submit, permanen); waktu ditulis sebagai epoch seperti di database
+SQL_RIWAYAT = """
+SELECT id, waktu, kartu_ari, id_kartu, instrumen, pol_baca, brix, pol, rendemen, versi_rumus, status
+FROM hasil ORDER BY id
+"""
+HEADER_RIWAYAT = ("id", "waktu", "kartu_ari", "id_kartu", "instrumen", "pol_baca_ari", KOLOM_BRIX, KOLOM_POL,
+                  "rendemen_ari", "versi_rumus", "status")
+
+
+def _butuh_numpy():
+    if np is None:
+        raise ImportError("rendemen_bulk membutuhkan numpy (pip install numpy)")
+
+
+def hitung_rendemen_array(brix, pol, faktor=FAKTOR, koef=KOEF_NIRA, out=None):
+    """
+    Versi vektor rendemen.hitung_rendemen untuk array brix/pol.
+    Dihitung in-place di `out` (dialokasikan jika None) tanpa array sementara tambahan.
+    """
+    _butuh_numpy()
+    out = np.subtract(brix, pol, out=out)
+    out *= -koef
+    out += pol
+    out *= faktor
+    return out
+
+
+def ke_float(nilai):
+    """List string/angka → array float64; nilai yang bukan angka menjadi NaN"""
+    try:
+        return np.asarray(nilai, dtype=np.float64)
+    except (TypeError, ValueError):
+        hasil = np.empty(len(nilai), dtype=np.float64)
+        for i, v in enumerate(nilai):
+            try:
+                hasil[i] = float(v)
+            except (TypeError, ValueError):
+                hasil[i] = np.nan
+        return hasil
+
+
+def potongan_csv(path, chunk=CHUNK_DEFAULT, kolom_brix=KOLOM_BRIX, kolom_pol=KOLOM_POL,
+                 kolom_pol_baca=KOLOM_POL_BACA):
+    """Generator (header, baris, brix, pol, pol_baca) per potongan dari file CSV"""
+    _butuh_numpy()
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = tuple(next(reader))
+        try:
+            i_brix, i_pol = header.index(kolom_brix), header.index(kolom_pol)
+        except ValueError:
+            raise ValueError(f"{path}: kolom {kolom_brix}/{kolom_pol} tidak ada di header {header}")
+        # Pol baca opsional: hanya dibutuhkan rumus yang memakainya (NaN jika kolom tidak ada)
+        i_pol_baca = header.index(kolom_pol_baca) if kolom_pol_baca in header else None
+        while True:
+            baris = list(islice(reader, chunk))
+            if not baris:
+                return
+            brix = ke_float([b[i_brix] if len(b) > i_brix else "" for b in baris])
+            pol = ke_float([b[i_pol] if len(b) > i_pol else "" for b in baris])
+            if i_pol_baca is None:
+                pol_baca = np.full(len(baris), np.nan)
+            else:
+                pol_baca = ke_float([b[i_pol_baca] if len(b) > i_pol_baca else "" for b in baris])
+            yield header, baris, brix, pol, pol_baca
+
+
+def _potongan_sqlite(path, sql, header, chunk):
+    """Generator (header, baris, brix, pol, pol_baca) per potongan dari query SQLite (read-only)"""
+    _butuh_numpy()
+    i_brix, i_pol = header.index(KOLOM_BRIX), header.index(KOLOM_POL)
+    i_pol_baca = header.index(KOLOM_POL_BACA)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(sql)
+        while True:
+            baris = cursor.fetchmany(chunk)
+            if not baris:
+                return
+            brix = ke_float([b[i_brix] for b in baris])
+            pol = ke_float([b[i_pol] for b in baris])
+            pol_baca = ke_float([b[i_pol_baca] for b in baris])
+            yield header, baris, brix, pol, pol_baca
+    finally:
+        conn.close()
+
+
+def potongan_outbox(path, chunk=CHUNK_DEFAULT):
+    """Generator (header, baris, brix, pol, pol_baca) per potongan dari outbox SQLite"""
+    return _potongan_sqlite(path, SQL_OUTBOX, HEADER_OUTBOX, chunk)
+
+
+def potongan_riwayat(path, chunk=CHUNK_DEFAULT):
+    """Generator (header, baris, brix, pol, pol_baca) per potongan dari tabel hasil riwayat SQLite"""
+    return _potongan_sqlite(path, SQL_RIWAYAT, HEADER_RIWAYAT, chunk)
+
+
+def hitung_ulang(potongan, out_path, faktor=FAKTOR, koef=KOEF_NIRA, desimal=2, rumus=None):
+    """
+    Hitung ulang rendemen untuk setiap potongan dan tulis ke CSV out_path.
+    rumus: Rumus (rumus.py); None = rumus standar dengan faktor/koef.
+    Return (jumlah_baris, jumlah_tidak_valid).
+    """
+    jumlah = 0
+    tidak_valid = 0
+    buffer = None
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for header, baris, brix, pol, pol_baca in potongan:
+            if jumlah == 0:
+                writer.writerow(header + (KOLOM_HASIL,))
+            if rumus is not None:
+                rendemen = np.asarray(rumus.hitung_array(brix, pol, pol_baca), dtype=np.float64)
+                if rendemen.shape != brix.shape:
+                    # Rumus konstan (tanpa variabel) menghasilkan skalar
+                    rendemen = np.full(brix.shape, rendemen, dtype=np.float64)
+            else:
+                # Buffer hasil dipakai ulang antar potongan yang berukuran sama
+                if buffer is None or len(buffer) != len(baris):
+                    buffer = np.empty(len(baris), dtype=np.float64)
+                rendemen = hitung_rendemen_array(brix, pol, faktor, koef, out=buffer)
+            np.round(rendemen, desimal, out=rendemen)
+            nan = np.isnan(rendemen)
+            nilai = rendemen.tolist()
+            if nan.any():
+                tidak_valid += int(nan.sum())
+                for i in np.flatnonzero(nan).tolist():
+                    nilai[i] = ""
+            writer.writerows(list(b) + [r] for b, r in zip(baris, nilai))
+            jumlah += len(baris)
+    return jumlah, tidak_valid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sumber = parser.add_mutually_exclusive_group(required=True)
+    sumber.add_argument("--csv", help="file CSV hasil ARI")
+    sumber.add_argument("--riwayat", help="file riwayat SQLite (riwayat_ari.db), semua hasil satu musim")
+    sumber.add_argument("--db", help="file outbox SQLite (outbox_ari.db), hanya 30 hari terakhir")
+    parser.add_argument("--out", required=True, help="file CSV keluaran")
+    parser.add_argument("--faktor", type=float, default=FAKTOR)
+    parser.add_argument("--koef", type=float, default=KOEF_NIRA)
+    parser.add_argument("--rumus", help="nama rumus di --rumus-file (menggantikan --faktor/--koef)")
+    parser.add_argument("--rumus-file", help="file JSON rumus rendemen (lihat rumus.py)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_DEFAULT, help="baris per potongan")
+    parser.add_argument("--kolom-brix", default=KOLOM_BRIX)
+    parser.add_argument("--kolom-pol", default=KOLOM_POL)
+    args = parser.parse_args(argv)
+
+    try:
+        _butuh_numpy()
+    except ImportError as e:
+        sys.exit(str(e))
+
+    rumus = None
+    if args.rumus or args.rumus_file:
+        try:
+            rumus = muat_rumus(args.rumus_file, args.rumus)
+        except (OSError, ValueError) as e:
+            sys.exit(f"[BULK] Error rumus: {e}")
+
+    if args.csv:
+        potongan = potongan_csv(args.csv, args.chunk, args.kolom_brix, args.kolom_pol)
+    elif args.riwayat:
+        potongan = potongan_riwayat(args.riwayat, args.chunk)
+    else:
+        potongan = potongan_outbox(args.db, args.chunk)
+
+    mulai = time.perf_counter()
+    jumlah, tidak_valid = hitung_ulang(potongan, args.out, args.faktor, args.koef, rumus=rumus)
+    durasi = time.perf_counter() - mulai
+    print(f"[BULK] {jumlah} baris → {args.out} dalam {durasi:.2f} s "
+          f"({jumlah / durasi if durasi else 0:,.0f} baris/s), {tidak_valid} tidak valid")
+    if rumus is not None:
+        print(f"[BULK] Rumus {rumus.versi_lengkap}: {rumus.ekspresi_final}")
+    else:
+        print(f"[BULK] Rumus: {args.faktor} × (Pol − {args.koef} × (Brix − Pol))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Sumber serial tiruan: memutar ulang rekaman baris Saccharomat.
+
+ReplaySerial meniru bagian pyserial.Serial yang dipakai pembaca serial
+(readline, read, in_waiting, is_open, cancel_read, close), sehingga
+PembacaSerial bisa diuji tanpa instrumen. Dengan timeout=None read()
+menunggu sampai baris berikutnya jatuh tempo dan bisa dibatalkan lewat
+cancel_read(), sama seperti port asli. Kecepatan diatur dengan `baud`
+(emulasi laju byte, 0 = secepat mungkin) atau `asli=1` (ikuti jeda waktu
+di rekaman biner), dan rekaman bisa diulang untuk uji beban. Setelah
+putaran terakhir (ulang=0 berarti tanpa batas) read() melempar
+RekamanHabis: pembaca selesai tanpa error dan layanan headless keluar.
+
+Input: file teks satu baris per pengukuran, atau file .arirec dari
+PerekamSerial (rekaman.py).
+
+Port dengan prefix "replay:" dibuka lewat buka_serial(), contoh:
+    replay:/data/rekaman.txt
+    replay:/data/rekaman.txt?baud=115200&ulang=100
+    replay:/data/serial-20260101-080000000.arirec?asli=1
+"""
+import threading
+import time
+from urllib.parse import parse_qs
+
+from rekaman import adalah_rekaman_biner, baca_frame
+
+PREFIX_REPLAY = "replay:"
+
+
+class RekamanHabis(EOFError):
+    """Semua baris rekaman (dan semua putaran `ulang`) sudah diputar"""
+
+
+def baca_rekaman(path):
+    """Return list baris bytes dari rekaman teks (ditambah CRLF) atau biner (apa adanya)"""
+    return [data for _, data in baca_rekaman_berwaktu(path)]
+
+
+def baca_rekaman_berwaktu(path):
+    """Return list (waktu, data). Waktu None untuk rekaman teks."""
+    if adalah_rekaman_biner(path):
+        return list(baca_frame(path))
+    with open(path, "rb") as f:
+        return [(None, line.rstrip(b"\r\n") + b"\r\n") for line in f if line.strip()]
+
+
+class ReplaySerial:
+    def __init__(self, path, baud=9600, ulang=1, timeout=1, asli=False):
+        self.port = f"{PREFIX_REPLAY}{path}"
+        self.path = path
+        self.baud = baud
+        self.ulang = ulang          # 0 = tanpa batas
+        self.timeout = timeout
+        self.is_open = True
+        frames = baca_rekaman_berwaktu(path)
+        self._lines = [data for _, data in frames]
+        # Jeda asli antar frame (hanya untuk rekaman biner)
+        self._jeda_asli = None
+        if asli and frames and frames[0][0] is not None:
+            self._jeda_asli = [0.0] + [max(0.0, b[0] - a[0]) for a, b in zip(frames, frames[1:])]
+        self._t_jadwal = None
+        self._indeks = 0
+        self._putaran = 0
+        self._tertunda = None       # (baris, jatuh_tempo) yang belum diserahkan
+        self._mulai = time.monotonic()
+        self._byte_terkirim = 0
+        self.jumlah_baris = 0
+        self._batal = threading.Event()
+
+    def _tunggu(self, detik):
+        """Tidur maksimal `detik` (None = sampai dibatalkan). Return False jika dibatalkan."""
+        if self._batal.wait(detik):
+            self._batal.clear()
+            return False
+        return True
+
+    def _detik_per_byte(self):
+        # 8N1: 10 bit per byte
+        return 10.0 / self.baud if self.baud else 0.0
+
+    def _baris_berikutnya(self):
+        if not self._lines:
+            return None
+        if self._indeks >= len(self._lines):
+            self._putaran += 1
+            if self.ulang and self._putaran >= self.ulang:
+                return None
+            self._indeks = 0
+        line = self._lines[self._indeks]
+        self._indeks += 1
+        return line
+
+    def _jatuh_tempo(self, line):
+        """Waktu (monotonic) baris ini selesai "diterima" di sisi PC"""
+        if self._jeda_asli is not None:
+            self._t_jadwal = (self._t_jadwal or time.monotonic()) + self._jeda_asli[self._indeks - 1]
+            return self._t_jadwal
+        # Jadwal dihitung dari total byte sejak mulai, jadi burst tetap akurat
+        self._byte_terkirim += len(line)
+        return self._mulai + self._byte_terkirim * self._detik_per_byte()
+
+    def readline(self):
+        if not self.is_open:
+            raise OSError("Port replay sudah ditutup")
+
+        if self._tertunda is None:
+            line = self._baris_berikutnya()
+            if line is None:
+                raise RekamanHabis(f"Rekaman {self.path} habis ({self.jumlah_baris} baris)")
+            self._tertunda = (line, self._jatuh_tempo(line))
+
+        line, jatuh_tempo = self._tertunda
+        tunggu = jatuh_tempo - time.monotonic()
+        if tunggu > 0:
+            if self.timeout is not None and tunggu > self.timeout:
+                # Baris belum lengkap dalam batas timeout, sama seperti pyserial
+                self._tunggu(self.timeout)
+                return b""
+            if not self._tunggu(tunggu):
+                return b""
+        self._tertunda = None
+        self.jumlah_baris += 1
+        return line
+
+    def read(self, size=1):
+        # Cukup untuk pembaca berbasis baris: kembalikan satu baris utuh
+        return self.readline()
+
+    @property
+    def in_waiting(self):
+        if self._tertunda and self._tertunda[1] <= time.monotonic():
+            return len(self._tertunda[0])
+        return 0
+
+    def cancel_read(self):
+        """Bangunkan read() yang sedang menunggu (dipanggil dari thread lain)"""
+        self._batal.set()
+
+    def close(self):
+        self.is_open = False
+        self._batal.set()
+
+
+def parse_port_replay(port):
+    """'replay:path?baud=..&ulang=..' → (path, opsi dict)"""
+    spec = port[len(PREFIX_REPLAY):]
+    path, _, query = spec.partition("?")
+    opsi = {}
+    for kunci, nilai in parse_qs(query).items():
+        if kunci in ("baud", "ulang"):
+            opsi[kunci] = int(nilai[-1])
+        elif kunci == "asli":
+            opsi[kunci] = nilai[-1] not in ("0", "")
+    return path, opsi
+
+
+def buat_port_replay(path, baud=None, ulang=None, asli=False):
+    """Susun nama port replay untuk combobox"""
+    opsi = ["asli=1"] if asli else []
+    if baud is not None:
+        opsi.append(f"baud={baud}")
+    if ulang is not None:
+        opsi.append(f"ulang={ulang}")
+    return PREFIX_REPLAY + path + ("?" + "&".join(opsi) if opsi else "")
+
+
+def buka_serial(port, baudrate, timeout=1):
+    """Buka port serial asli atau sumber replay sesuai nama port (timeout=None: read blocking)"""
+    if port.startswith(PREFIX_REPLAY):
+        path, opsi = parse_port_replay(port)
+        return ReplaySerial(path, timeout=timeout, **opsi)
+
+    import serial
+    return serial.Serial(port, baudrate, timeout=timeout)
@@ -0,0 +1,337 @@
+"""Riwayat lokal (SQLite) semua bacaan Saccharomat dan hasil pengiriman.
+
+Berbeda dengan outbox (antrian kirim, baris terkirim dibuang setelah 30 hari),
+riwayat menyimpan permanen:
+  - bacaan : setiap bacaan yang diteruskan pembaca serial (waktu, instrumen,
+             nilai); dengan penyaring stabil aktif (stabil.py) hanya satu
+             bacaan stabil per sampel, bukan setiap baris valid;
+  - hasil  : setiap submit beserta status kirim terakhirnya
+             (dikirim / terkirim / ditolak / ulang / hilang), pesan server,
+             dan berapa kali rekonsiliasi mengirimnya ulang (ulang_ke).
+Index pada kartu_ari dan waktu membuat pencarian ulang kartu dan halaman
+riwayat tetap instan tanpa server.
+
+Penulisan masuk antrian dan dilakukan satu writer thread dalam transaksi
+berkelompok, jadi thread serial dan GUI tidak menunggu disk. Pembacaan
+memakai koneksi terpisah (WAL: tidak saling mengunci dengan writer). Agar
+data terbaru ikut terbaca, query menitipkan penanda flush ke antrian: writer
+langsung meng-commit kumpulan yang berisi penanda lalu membangunkan query.
+Tunggu ini dibatasi TUNGGU_TULIS detik dan dilewati jika writer sudah mati,
+jadi GUI tidak pernah macet karena riwayat. Jika satu perintah gagal, kumpulan
+diulang satu per satu sehingga hanya perintah itu yang dibuang.
+id hasil diberikan SQLite saat writer menulis barisnya (GUI dan headless
+boleh memakai file yang sama); catat_hasil mengembalikan RujukanHasil yang
+id-nya terisi setelah itu, dan tandai() yang antri sesudahnya memakai id tersebut.
+Halaman memakai keyset (id < id_terakhir), bukan OFFSET, sehingga biaya
+per halaman tetap berapa pun posisinya.
+"""
+import queue
+import threading
+import time
+
+from outbox import lokasi_default, HASIL_TERKIRIM, HASIL_ULANG
+
+STATUS_DIKIRIM = "dikirim"
+STATUS_HILANG = "hilang"    # tetap tidak ada di server setelah batas kirim ulang rekonsiliasi
+HALAMAN = 100
+TUNGGU_TULIS = 0.5      # detik maksimal query menunggu tulisan yang masih antri
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS bacaan (
+    id INTEGER PRIMARY KEY,
+    waktu REAL NOT NULL,
+    instrumen TEXT,
+    pol_baca REAL,
+    brix REAL,
+    pol REAL
+);
+CREATE INDEX IF NOT EXISTS idx_bacaan_waktu ON bacaan(waktu);
+CREATE TABLE IF NOT EXISTS hasil (
+    id INTEGER PRIMARY KEY,
+    waktu REAL NOT NULL,
+    kartu_ari TEXT NOT NULL,
+    id_kartu INTEGER,
+    instrumen TEXT,
+    pol_baca REAL,
+    brix REAL,
+    pol REAL,
+    rendemen REAL,
+    versi_rumus TEXT,
+    outbox_id INTEGER,
+    status TEXT NOT NULL,
+    pesan TEXT,
+    diperbarui REAL NOT NULL,
+    ulang_ke INTEGER NOT NULL DEFAULT 0,
+    ulang_terakhir REAL
+);
+CREATE INDEX IF NOT EXISTS idx_hasil_kartu ON hasil(kartu_ari, waktu);
+CREATE INDEX IF NOT EXISTS idx_hasil_waktu ON hasil(waktu);
+CREATE INDEX IF NOT EXISTS idx_hasil_outbox ON hasil(outbox_id);
+"""
+
+KOLOM_HASIL = ("id", "waktu", "kartu_ari", "id_kartu", "instrumen", "pol_baca", "brix", "pol",
+               "rendemen", "versi_rumus", "outbox_id", "status", "pesan", "diperbarui", "ulang_ke", "ulang_terakhir")
+
+_SELESAI = object()
+
+
+class RujukanHasil:
+    """Hasil yang INSERT-nya masih antri; `id` diisi writer setelah barisnya tertulis (None = belum/gagal)"""
+
+    __slots__ = ("id",)
+
+    def __init__(self):
+        self.id = None
+
+    def __repr__(self):
+        return f"RujukanHasil(id={self.id})"
+
+
+class Riwayat:
+    """Penyimpanan riwayat. catat_*/tandai_* aman dan tidak blocking dari thread mana pun."""
+
+    def __init__(self, path=None, on_log=None, interval_tulis=0.2):
+        import sqlite3  # baru dimuat saat riwayat dibuka (GUI: setelah jendela tampil)
+
+        self.path = path or lokasi_default("riwayat_ari.db")
+        self.on_log = on_log
+        self.interval_tulis = interval_tulis
+        self._tulis = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._tulis.execute("PRAGMA journal_mode=WAL")
+        self._tulis.execute("PRAGMA synchronous=NORMAL")
+        self._tulis.executescript(SKEMA)
+        kolom = [row[1] for row in self._tulis.execute("PRAGMA table_info(hasil)")]
+        if "ulang_ke" not in kolom:
+            # Riwayat dari versi sebelum batas kirim ulang rekonsiliasi
+            self._tulis.execute("ALTER TABLE hasil ADD COLUMN ulang_ke INTEGER NOT NULL DEFAULT 0")
+            self._tulis.execute("ALTER TABLE hasil ADD COLUMN ulang_terakhir REAL")
+        self._baca = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock_baca = threading.Lock()
+        self._antrian = queue.Queue()
+        self.jumlah_tulis = 0
+        self._writer_mati_dilaporkan = False
+        self._thread = threading.Thread(target=self._tulis_loop, name="riwayat", daemon=True)
+        self._thread.start()
+
+    # --- tulis (lewat antrian) ---
+
+    def catat_bacaan(self, instrumen, bacaan, waktu=None):
+        """Catat satu bacaan yang diteruskan pembaca (bacaan stabil jika penyaring aktif), dari thread serial"""
+        self._antrian.put((
+            "INSERT INTO bacaan (waktu, instrumen, pol_baca, brix, pol) VALUES (?, ?, ?, ?, ?)",
+            (time.time() if waktu is None else waktu, instrumen, bacaan.pol_baca, bacaan.brix, bacaan.pol),
+            None
+        ))
+
+    def catat_hasil(self, params, instrumen=None, outbox_id=None):
+        """Catat submit baru berstatus 'dikirim'. Return RujukanHasil untuk tandai()."""
+        rujukan = RujukanHasil()
+        sekarang = time.time()
+        self._antrian.put((
+            "INSERT INTO hasil (waktu, kartu_ari, id_kartu, instrumen, pol_baca, brix, pol, rendemen, "
+            "versi_rumus, outbox_id, status, pesan, diperbarui) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (sekarang, str(params['kartu_ari']), params.get('id'), instrumen,
+             params.get('pol_baca_ari'), params.get('brix_ari'), params.get('pol_ari'), params.get('rendemen_ari'),
+             params.get('versi_rumus'), outbox_id, STATUS_DIKIRIM, None, sekarang),
+            rujukan
+        ))
+        return rujukan
+
+    def tandai(self, id_hasil, status, pesan=None):
+        """
+        Perbarui status kirim hasil (status: HASIL_* dari outbox.klasifikasi_hasil).
+        id_hasil: id baris (int) atau RujukanHasil dari catat_hasil.
+        """
+        self._antrian.put((
+            "UPDATE hasil SET status=?, pesan=?, diperbarui=? WHERE id=?",
+            (status, pesan, time.time(), id_hasil),
+            None
+        ))
+
+    def tandai_outbox(self, outbox_id, status, pesan=None):
+        """Perbarui status hasil dari kiriman ulang outbox (PemutarUlang hanya tahu id outbox)"""
+        self._antrian.put((
+            "UPDATE hasil SET status=?, pesan=?, diperbarui=? WHERE outbox_id=?",
+            (status, pesan, time.time(), outbox_id),
+            None
+        ))
+
+    def antri_ulang(self, id_hasil, outbox_id, pesan=None):
+        """
+        Hasil dikirim ulang lewat baris outbox baru (rekonsiliasi): status 'ulang', outbox_id diganti,
+        ulang_ke bertambah satu
+        """
+        sekarang = time.time()
+        self._antrian.put((
+            "UPDATE hasil SET status=?, pesan=?, outbox_id=?, diperbarui=?, ulang_ke=ulang_ke + 1, "
+            "ulang_terakhir=? WHERE id=?",
+            (HASIL_ULANG, pesan, outbox_id, sekarang, sekarang, id_hasil),
+            None
+        ))
+
+    def tutup(self, timeout=5):
+        self._antrian.put(_SELESAI)
+        self._thread.join(timeout)
+        with self._lock_baca:
+            self._baca.close()
+
+    def _tulis_loop(self):
+        import sqlite3  # sudah dimuat __init__, hanya untuk sqlite3.Error
+
+        conn = self._tulis
+        while True:
+            item = self._antrian.get()
+            kumpulan = [item]
+            # Kumpulkan tulisan yang datang berdekatan → satu transaksi.
+            # Penanda flush (Event dari query) menutup kumpulan agar query tidak menunggu interval_tulis.
+            batas = time.monotonic() + self.interval_tulis
+            while item is not _SELESAI and not isinstance(item, threading.Event) and len(kumpulan) < 500:
+                sisa = batas - time.monotonic()
+                if sisa <= 0:
+                    break
+                try:
+                    item = self._antrian.get(timeout=sisa)
+                except queue.Empty:
+                    break
+                kumpulan.append(item)
+
+            perintah = [k for k in kumpulan if isinstance(k, tuple)]
+            try:
+                if perintah:
+                    conn.execute("BEGIN")
+                    for item in perintah:
+                        self._jalankan(conn, *item)
+                    conn.execute("COMMIT")
+                    self.jumlah_tulis += len(perintah)
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                self._ulang_satu_per_satu(conn, perintah, e)
+            finally:
+                for k in kumpulan:
+                    if isinstance(k, threading.Event):
+                        k.set()
+            if any(k is _SELESAI for k in kumpulan):
+                conn.close()
+                return
+
+    def _jalankan(self, conn, sql, nilai, rujukan):
+        if any(isinstance(v, RujukanHasil) for v in nilai):
+            if any(isinstance(v, RujukanHasil) and v.id is None for v in nilai):
+                # INSERT hasil ini gagal ditulis: tidak ada baris yang bisa diperbarui
+                if self.on_log:
+                    self.on_log(f"[RIWAYAT] Error: hasil belum tersimpan, perubahan dilewati {nilai!r}")
+                return
+            nilai = tuple(v.id if isinstance(v, RujukanHasil) else v for v in nilai)
+        cursor = conn.execute(sql, nilai)
+        if rujukan is not None:
+            rujukan.id = cursor.lastrowid
+
+    def _ulang_satu_per_satu(self, conn, perintah, error):
+        """Transaksi kumpulan gagal: ulang tiap perintah sendiri-sendiri, hanya yang gagal dibuang"""
+        import sqlite3
+
+        for _, _, rujukan in perintah:
+            if rujukan is not None:
+                rujukan.id = None       # id dari transaksi yang di-rollback tidak berlaku
+        dibuang = 0
+        for item in perintah:
+            try:
+                self._jalankan(conn, *item)
+                self.jumlah_tulis += 1
+            except sqlite3.Error as e:
+                dibuang += 1
+                if self.on_log:
+                    self.on_log(f"[RIWAYAT] Error: perintah dibuang ({e}): {item[0][:60]} {item[1]!r}")
+        if self.on_log:
+            self.on_log(f"[RIWAYAT] Kumpulan {len(perintah)} perintah gagal ({error}), ditulis ulang satu per satu: "
+                        f"{dibuang} dibuang")
+
+    # --- baca ---
+
+    def _tunggu_tulis(self, batas):
+        """Tunggu tulisan yang sudah antri ter-commit, maksimal `batas` detik. Return True jika sudah."""
+        if not self._thread.is_alive():
+            if not self._writer_mati_dilaporkan and self.on_log:
+                self.on_log("[RIWAYAT] Error: writer thread berhenti, data terbaru mungkin belum tersimpan")
+            self._writer_mati_dilaporkan = True
+            return False
+        flush = threading.Event()
+        self._antrian.put(flush)
+        return flush.wait(batas)
+
+    def _query(self, sql, nilai=(), tunggu=True):
+        # tunggu: True = maksimal TUNGGU_TULIS detik, angka = batas detik, False = baca yang sudah ter-commit
+        if tunggu:
+            self._tunggu_tulis(TUNGGU_TULIS if tunggu is True else tunggu)
+        with self._lock_baca:
+            return self._baca.execute(sql, nilai).fetchall()
+
+    def halaman_hasil(self, sebelum_id=None, jumlah=HALAMAN, kartu_ari=None):
+        """
+        Satu halaman hasil terbaru dulu (list dict). Halaman berikutnya:
+        sebelum_id = id baris terakhir halaman sebelumnya.
+        kartu_ari: hanya kartu ini (awalan, mis. '1000' → semua kartu 1000xx).
+        """
+        syarat, nilai = [], []
+        if sebelum_id is not None:
+            syarat.append("id < ?")
+            nilai.append(sebelum_id)
+        if kartu_ari:
+            # Rentang [awalan, awalan + U+FFFF) agar tetap memakai idx_hasil_kartu
+            syarat.append("kartu_ari >= ? AND kartu_ari < ?")
+            nilai += [kartu_ari, kartu_ari + "\uffff"]
+        where = f"WHERE {' AND '.join(syarat)}" if syarat else ""
+        rows = self._query(
+            f"SELECT {', '.join(KOLOM_HASIL)} FROM hasil {where} ORDER BY id DESC LIMIT ?",
+            nilai + [jumlah]
+        )
+        return [dict(zip(KOLOM_HASIL, row)) for row in rows]
+
+    def cari_kartu(self, kartu_ari, tunggu=True):
+        """
+        Semua hasil untuk satu kartu (terbaru dulu).
+        tunggu=False: jangan tunggu antrian tulis (cukup untuk data lama, tanpa jeda di GUI).
+        """
+        rows = self._query(
+            f"SELECT {', '.join(KOLOM_HASIL)} FROM hasil WHERE kartu_ari=? ORDER BY waktu DESC",
+            (str(kartu_ari).strip(),), tunggu=tunggu
+        )
+        return [dict(zip(KOLOM_HASIL, row)) for row in rows]
+
+    def kartu_sejak(self, waktu):
+        """List (kartu_ari, waktu, status) hasil sejak epoch `waktu`, urut waktu"""
+        return self._query(
+            "SELECT kartu_ari, waktu, status FROM hasil WHERE waktu >= ? ORDER BY waktu", (waktu,)
+        )
+
+    def kartu_terkirim(self, sebelum, sejak=None):
+        """
+        dict kartu_ari → id hasil terbaru berstatus terkirim yang diperbarui sebelum epoch `sebelum`
+        (opsional hanya yang dikirim sejak epoch `sejak`). Dipakai rekonsiliasi; hasil yang sudah
+        diantrikan ulang tapi belum terkirim lagi (status 'ulang') tidak ikut.
+        """
+        sql = "SELECT kartu_ari, id FROM hasil WHERE status=? AND diperbarui < ?"
+        nilai = [HASIL_TERKIRIM, sebelum]
+        if sejak is not None:
+            sql += " AND waktu >= ?"
+            nilai.append(sejak)
+        return dict(self._query(sql + " ORDER BY id", nilai))
+
+    def hasil_per_id(self, daftar_id):
+        """list dict hasil untuk id yang diminta (urutan id)"""
+        daftar_id = list(daftar_id)
+        rows = []
+        for i in range(0, len(daftar_id), 500):
+            potongan = daftar_id[i:i + 500]
+            rows += self._query(
+                f"SELECT {', '.join(KOLOM_HASIL)} FROM hasil WHERE id IN ({', '.join('?' * len(potongan))}) "
+                "ORDER BY id", potongan
+            )
+        return [dict(zip(KOLOM_HASIL, row)) for row in rows]
+
+    def jumlah_hasil(self):
+        return self._query("SELECT COUNT(*) FROM hasil")[0][0]
+
+    def jumlah_bacaan(self):
+        return self._query("SELECT COUNT(*) FROM bacaan")[0][0]
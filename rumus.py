@@ -0,0 +1,153 @@
+"""Mesin rumus rendemen: rumus bernama dari file konfigurasi, dikompilasi sekali.
+
+Setiap PG/musim bisa memakai faktor berbeda. Rumus ditulis sebagai ekspresi
+Python sederhana atas variabel bacaan (brix, pol, pol_baca) dan konstanta
+bernama, mis:
+
+    {
+      "aktif": "pg-2026",
+      "rumus": {
+        "pg-2026": {
+          "versi": "1",
+          "ekspresi": "faktor * (pol - koef * (brix - pol))",
+          "konstanta": {"faktor": 0.68, "koef": 0.5}
+        }
+      }
+    }
+
+Saat dimuat, ekspresi divalidasi lewat AST (hanya angka, variabel/konstanta
+yang dikenal, + - * / ** dan min/max/abs), konstanta disisipkan sebagai
+literal, lalu dikompilasi menjadi fungsi biasa. Rumus.hitung adalah fungsi
+hasil kompilasi itu sendiri, jadi biayanya sama dengan aritmetika inline.
+Rumus.hitung_array memakai ekspresi yang sama untuk array NumPy.
+
+Versi rumus (nama@versi) ikut dikirim bersama setiap hasil (param versi_rumus).
+"""
+import ast
+import json
+import os
+
+from rendemen import FAKTOR, KOEF_NIRA
+
+VARIABEL = ("brix", "pol", "pol_baca")
+FUNGSI = ("min", "max", "abs")
+
+_OPERATOR = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+
+
+class Rumus:
+    """Satu rumus rendemen yang sudah dikompilasi"""
+
+    def __init__(self, nama, ekspresi, konstanta=None, versi="1"):
+        self.nama = nama
+        self.ekspresi = ekspresi
+        self.konstanta = dict(konstanta or {})
+        self.versi = str(versi)
+        pohon = _validasi(nama, ekspresi, self.konstanta)
+        sumber = ast.unparse(_SisipKonstanta(self.konstanta).visit(pohon))
+        self.ekspresi_final = sumber
+        kode = compile(f"lambda brix, pol, pol_baca=0.0: {sumber}", f"<rumus {nama}>", "eval")
+        # hitung(brix, pol, pol_baca=0.0) → float; tanpa builtins selain min/max/abs
+        self.hitung = eval(kode, {"__builtins__": {}, "min": min, "max": max, "abs": abs})
+        self._kode = kode
+        self._hitung_array = None
+
+    @property
+    def versi_lengkap(self):
+        return f"{self.nama}@{self.versi}"
+
+    def hitung_array(self, brix, pol, pol_baca=0.0):
+        """Versi vektor untuk array NumPy (min/max/abs → np.minimum/np.maximum/np.abs)"""
+        if self._hitung_array is None:
+            import numpy as np
+            self._hitung_array = eval(self._kode, {
+                "__builtins__": {}, "min": np.minimum, "max": np.maximum, "abs": np.abs
+            })
+        return self._hitung_array(brix, pol, pol_baca)
+
+    def __repr__(self):
+        return f"Rumus({self.versi_lengkap}: {self.ekspresi_final})"
+
+
+class _SisipKonstanta(ast.NodeTransformer):
+    """Ganti nama konstanta dengan literal angkanya"""
+
+    def __init__(self, konstanta):
+        self.konstanta = konstanta
+
+    def visit_Name(self, node):
+        if node.id not in self.konstanta:
+            return node
+        nilai = self.konstanta[node.id]
+        literal = ast.Constant(abs(nilai))
+        if nilai < 0:
+            # Literal negatif sebagai unary minus agar presedensi (mis. dengan **) tetap benar
+            literal = ast.UnaryOp(ast.USub(), literal)
+        return ast.copy_location(literal, node)
+
+
+def _validasi(nama, ekspresi, konstanta):
+    """Parse dan periksa ekspresi, raise ValueError jika ada bagian yang tidak diizinkan"""
+    for kunci, nilai in konstanta.items():
+        if not kunci.isidentifier() or kunci in VARIABEL or kunci in FUNGSI:
+            raise ValueError(f"Rumus {nama}: nama konstanta '{kunci}' tidak valid")
+        if isinstance(nilai, bool) or not isinstance(nilai, (int, float)):
+            raise ValueError(f"Rumus {nama}: konstanta '{kunci}' harus angka")
+    try:
+        pohon = ast.parse(ekspresi, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Rumus {nama}: ekspresi tidak valid: {e.msg}")
+
+    for node in ast.walk(pohon):
+        if isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Load) + _OPERATOR):
+            continue
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+                and not isinstance(node.value, bool):
+            continue
+        if isinstance(node, ast.Name) and (node.id in VARIABEL or node.id in konstanta or node.id in FUNGSI):
+            continue
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNGSI \
+                and not node.keywords:
+            continue
+        raise ValueError(f"Rumus {nama}: '{ast.unparse(node)}' tidak diizinkan dalam ekspresi")
+
+    # Nama fungsi hanya boleh dipakai sebagai pemanggilan
+    dipanggil = {id(node.func) for node in ast.walk(pohon) if isinstance(node, ast.Call)}
+    for node in ast.walk(pohon):
+        if isinstance(node, ast.Name) and node.id in FUNGSI and id(node) not in dipanggil:
+            raise ValueError(f"Rumus {nama}: '{node.id}' harus dipanggil sebagai fungsi")
+    return pohon
+
+
+RUMUS_DEFAULT = Rumus(
+    "standar", "faktor * (pol - koef * (brix - pol))",
+    {"faktor": FAKTOR, "koef": KOEF_NIRA}, versi="1"
+)
+
+
+def muat_daftar_rumus(path):
+    """Baca file JSON rumus. Return (dict nama → Rumus, nama rumus aktif)."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    daftar = {RUMUS_DEFAULT.nama: RUMUS_DEFAULT}
+    for nama, isi in (data.get("rumus") or {}).items():
+        if "ekspresi" not in isi:
+            raise ValueError(f"Rumus {nama}: 'ekspresi' wajib diisi")
+        daftar[nama] = Rumus(nama, isi["ekspresi"], isi.get("konstanta"), isi.get("versi", "1"))
+    return daftar, data.get("aktif", RUMUS_DEFAULT.nama)
+
+
+def muat_rumus(path=None, nama=None):
+    """
+    Rumus aktif dari file konfigurasi (nama=None → pakai 'aktif' di file).
+    File tidak ada → RUMUS_DEFAULT. File rusak atau nama tidak dikenal → ValueError/OSError.
+    """
+    if not path or not os.path.exists(path):
+        if nama and nama != RUMUS_DEFAULT.nama:
+            raise ValueError(f"Rumus {nama} tidak ada (file rumus {path} tidak ditemukan)")
+        return RUMUS_DEFAULT
+    daftar, aktif = muat_daftar_rumus(path)
+    nama = nama or aktif
+    if nama not in daftar:
+        raise ValueError(f"Rumus {nama} tidak ada di {path} (tersedia: {', '.join(sorted(daftar))})")
+    return daftar[nama]
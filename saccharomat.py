@@ -0,0 +1,164 @@
+"""Parser baris data Saccharomat.
+
+Instrumen mengirim satu baris per pengukuran berisi kolom dipisah spasi, mis:
+    69.78  -0.01  *90****  *90***
+Kolom yang berisi tanda '*' berarti instrumen belum punya nilai valid untuk
+kolom tersebut. Nilainya dianggap 0.0 dan flag valid-nya False.
+
+Layout kolom per instrumen/firmware didefinisikan di tabel FORMAT_DEFAULT
+(bisa diganti lewat ParserSaccharomat(formats=...)).
+"""
+import re
+from collections import namedtuple
+
+# Token angka atau token bintang (mis. *90****) di dalam baris
+POLA_TOKEN = re.compile(r'-?\d+(?:\.\d+)?|\*[\d*.]*')
+POLA_ANGKA = re.compile(r'-?\d+(?:\.\d+)?')
+KARAKTER_BINTANG = "0123456789*."     # isi token bintang setelah '*' pertama (mis. *90****)
+
+# Nama field yang diisi parser, urutan sama dengan Bacaan
+FIELD = ("pol_baca", "brix", "pol")
+ABAIKAN = "-"
+
+
+class Bacaan(namedtuple("Bacaan", "pol_baca brix pol pol_baca_valid brix_valid pol_valid format raw")):
+    """Satu pembacaan Saccharomat. Field *_valid False jika kolomnya berisi '*'."""
+    __slots__ = ()
+
+    @property
+    def valid(self):
+        return self.pol_baca_valid and self.brix_valid and self.pol_valid
+
+
+# Konstruksi langsung lewat tuple.__new__, melewati __new__ namedtuple yang lebih lambat
+_bacaan_baru = tuple.__new__
+
+
+class FormatBaris:
+    """
+    Layout satu jenis baris.
+    kolom: nama field per posisi kolom ("-" untuk kolom yang diabaikan)
+    """
+    __slots__ = ("nama", "kolom", "min_kolom", "maks_kolom", "_indeks")
+
+    def __init__(self, nama, kolom, min_kolom=None, maks_kolom=None):
+        self.nama = nama
+        self.kolom = tuple(kolom)
+        self.min_kolom = min_kolom if min_kolom is not None else len(self.kolom)
+        self.maks_kolom = maks_kolom
+        posisi = {field: i for i, field in enumerate(self.kolom) if field != ABAIKAN}
+        missing = [field for field in FIELD if field not in posisi]
+        if missing:
+            raise ValueError(f"Format {nama}: kolom {missing} tidak didefinisikan")
+        self._indeks = tuple(posisi[field] for field in FIELD)
+
+    def cocok(self, jumlah_kolom):
+        if jumlah_kolom < self.min_kolom:
+            return False
+        return self.maks_kolom is None or jumlah_kolom <= self.maks_kolom
+
+    def ambil(self, parts, raw):
+        """Konversi kolom ke Bacaan, None jika ada kolom yang bukan angka/bintang"""
+        i_pol_baca, i_brix, i_pol = self._indeks
+        pol_baca = nilai_kolom(parts[i_pol_baca])
+        brix = nilai_kolom(parts[i_brix])
+        pol = nilai_kolom(parts[i_pol])
+        if pol_baca is None or brix is None or pol is None:
+            return None
+        return _bacaan_baru(Bacaan, (pol_baca[0], brix[0], pol[0], pol_baca[1], brix[1], pol[1], self.nama, raw))
+
+
+# Format: "69.78  -0.01  *90****  *90***" (Pol Baca, Brix, Pol, kolom ke-4 diabaikan)
+# Format ringkas: tepat tiga kolom angka
+FORMAT_DEFAULT = (
+    FormatBaris("standar", ("pol_baca", "brix", "pol", ABAIKAN)),
+    FormatBaris("ringkas", ("pol_baca", "brix", "pol"), maks_kolom=3),
+)
+
+
+def nilai_kolom(token):
+    """Return (nilai, valid). Token bintang → (0.0, False). Token lain → None."""
+    if token[:1] == "*":
+        # str.strip lebih murah dari regex; hasil kosong = semua karakter digit/bintang/titik
+        return None if token.strip(KARAKTER_BINTANG) else (0.0, False)
+    try:
+        return float(token), True
+    except ValueError:
+        return None
+
+
+def extract_number_from_pattern(pattern_str):
+    """
+    Jika mengandung '*' → dianggap tidak valid → return 0.0
+    """
+    if not pattern_str or '*' in pattern_str:
+        return 0.0
+
+    match = POLA_ANGKA.search(pattern_str)
+    return float(match.group()) if match else 0.0
+
+
+class ParserSaccharomat:
+    """
+    Parser berbasis tabel format.
+    Jalur cepat: format dipilih dari jumlah kolom (dict len(parts) → format yang cocok),
+    lalu str.split() + float() per kolom; kolom bintang langsung ke format.ambil
+    tanpa melewati exception float(). Tanpa state, jadi baris "standar" dan
+    "ringkas" yang berselang-seling tidak saling menggeser jalur cepat.
+    Jalur lambat: token sampah (satuan, label) yang disaring dengan regex token
+    angka/bintang, lalu dipilih lagi formatnya dari jumlah token.
+    """
+
+    MAKS_TABEL_KOLOM = 64   # jumlah kolom di atas ini dicari ulang per baris (tidak disimpan di tabel)
+
+    def __init__(self, formats=FORMAT_DEFAULT):
+        self.formats = tuple(formats)
+        if not self.formats:
+            raise ValueError("Minimal satu format baris harus didefinisikan")
+        self._min_kolom = min(fmt.min_kolom for fmt in self.formats)
+        # jumlah kolom -> (format yang cocok, (i_pol_baca, i_brix, i_pol, nama) format pertama)
+        self._per_kolom = {jumlah: self._format_untuk(jumlah)
+                           for jumlah in range(self._min_kolom, self.MAKS_TABEL_KOLOM + 1)}
+
+    def _format_untuk(self, jumlah):
+        cocok = tuple(fmt for fmt in self.formats if fmt.cocok(jumlah))
+        return cocok, (cocok[0]._indeks + (cocok[0].nama,) if cocok else None)
+
+    def parse(self, line):
+        """Return Bacaan atau None jika baris tidak sesuai format mana pun"""
+        parts = line.split()
+        jumlah = len(parts)
+        if jumlah < self._min_kolom:
+            return None
+
+        cocok, cepat = self._per_kolom.get(jumlah) or self._format_untuk(jumlah)
+        if cepat is not None:
+            i_pol_baca, i_brix, i_pol, nama = cepat
+            pol_baca, brix, pol = parts[i_pol_baca], parts[i_brix], parts[i_pol]
+            # Kolom bintang dicek lebih dulu: ValueError dari float() jauh lebih mahal dari cek karakter
+            if pol_baca[0] != "*" and brix[0] != "*" and pol[0] != "*":
+                try:
+                    return _bacaan_baru(Bacaan, (float(pol_baca), float(brix), float(pol),
+                                                 True, True, True, nama, line))
+                except ValueError:
+                    pass
+            # Kolom bintang atau token lain: coba per kolom dengan format yang cocok jumlah kolomnya
+            bacaan = self._coba(cocok, parts, line)
+            if bacaan is not None:
+                return bacaan
+        return self._parse_lambat(parts, line)
+
+    def _parse_lambat(self, parts, line):
+        # Format dengan jumlah kolom yang sama sudah dicoba di jalur cepat
+        tokens = POLA_TOKEN.findall(line)
+        if len(tokens) >= self._min_kolom and tokens != parts:
+            cocok, _ = self._per_kolom.get(len(tokens)) or self._format_untuk(len(tokens))
+            return self._coba(cocok, tokens, line)
+        return None
+
+    def _coba(self, formats, parts, line):
+        for fmt in formats:
+            bacaan = fmt.ambil(parts, line)
+            if bacaan is not None:
+                return bacaan
+        return None
@@ -0,0 +1,188 @@
+"""Deteksi bacaan stabil: satu bacaan per sampel dari deretan baris Saccharomat.
+
+Selama mengukur satu sampel, instrumen mengirim beberapa baris valid yang
+nilainya masih bergeser beberapa digit terakhir, lalu (firmware dengan
+format "ringkas") satu baris penutup berisi nilai akhir. Tanpa penyaring,
+setiap baris mengisi ulang form dan menghitung ulang rendemen, dan operator
+bisa mengirim nilai yang belum tenang. PendeteksiStabil duduk di antara
+parser dan callback on_bacaan (lihat PembacaSerial) dan meneruskan TEPAT
+SATU bacaan per sampel, yaitu bacaan terakhir sampel itu:
+  - berturut : setelah `jumlah` bacaan berturut-turut yang selisih tiap
+               kolomnya (pol_baca, brix, pol) <= toleransi, bacaan terbaru
+               menjadi kandidat; bacaan berikutnya yang masih dalam
+               toleransi menggantikan kandidat;
+  - median   : jendela `jumlah` bacaan terakhir; selama lebih dari separuh
+               isi jendela berada dalam toleransi dari median tiap kolom,
+               median menjadi kandidat (satu loncatan tidak membatalkan sampel).
+Kandidat baru diteruskan saat sampel ditutup:
+  - baris berformat penutup (`format_penutup`, default "ringkas") datang →
+    baris penutup itu sendiri yang diteruskan (nilai akhir instrumen);
+  - instrumen mengirim baris belum valid ('*', sampel baru) atau rekaman
+    habis → reset() mengembalikan kandidat;
+  - nilai bergeser melebihi toleransi dari kandidat (sampel baru tanpa '*');
+  - tidak ada bacaan valid selama `batas_tenang` detik (firmware tanpa baris
+    penutup) → tutup_jika_tenang() mengembalikan kandidat. Dipanggil berkala
+    dari luar thread serial (PengawasSerial), lewat PembacaSerial.
+Setelah ditutup, baris berikutnya yang masih dalam toleransi dianggap
+sampel yang sama dan diabaikan.
+"""
+import time
+from collections import deque
+
+MODE_BERTURUT = "berturut"
+MODE_MEDIAN = "median"
+MODE = (MODE_BERTURUT, MODE_MEDIAN)
+
+JUMLAH = 3
+TOLERANSI = 0.05
+BATAS_TENANG = 5.0      # detik tanpa bacaan valid sebelum kandidat diteruskan, 0 = nonaktif
+FORMAT_PENUTUP = ("ringkas",)   # nama FormatBaris (saccharomat.py) yang berisi nilai akhir sampel
+
+
+def _median(nilai):
+    urut = sorted(nilai)
+    tengah = len(urut) // 2
+    if len(urut) % 2:
+        return urut[tengah]
+    return (urut[tengah - 1] + urut[tengah]) / 2
+
+
+class PendeteksiStabil:
+    """Satu instance per port (state sampel yang sedang diukur). Tidak thread-safe."""
+
+    def __init__(self, mode=MODE_BERTURUT, jumlah=JUMLAH, toleransi=TOLERANSI, format_penutup=FORMAT_PENUTUP,
+                 batas_tenang=BATAS_TENANG):
+        if mode not in MODE:
+            raise ValueError(f"Mode stabil tidak dikenal: {mode} (pilihan: {', '.join(MODE)})")
+        if jumlah < 1:
+            raise ValueError("Jumlah bacaan stabil minimal 1")
+        self.mode = mode
+        self.jumlah = jumlah
+        self.toleransi = toleransi
+        self.format_penutup = frozenset(format_penutup)
+        self.batas_tenang = batas_tenang
+        self._jendela = deque(maxlen=jumlah)
+        self._kandidat = None           # bacaan stabil terbaru sampel ini, diteruskan saat sampel ditutup
+        self._terkirim = None           # bacaan yang sudah diteruskan untuk sampel ini
+        self._t_terakhir = None         # waktu (monotonic) bacaan valid terakhir
+        self.jumlah_stabil = 0
+        self.jumlah_ditahan = 0         # bacaan valid yang tidak diteruskan
+        self.jumlah_dibuang = 0         # sampel yang berganti sebelum sempat stabil
+
+    def _dekat(self, a, b):
+        tol = self.toleransi
+        return (abs(a.pol_baca - b.pol_baca) <= tol and abs(a.brix - b.brix) <= tol
+                and abs(a.pol - b.pol) <= tol)
+
+    def _mulai_sampel(self):
+        if self._jendela and self._kandidat is None and self._terkirim is None:
+            self.jumlah_dibuang += 1
+        self._jendela.clear()
+        self._kandidat = None
+        self._terkirim = None
+
+    def _teruskan(self, bacaan):
+        self._terkirim = bacaan
+        self._kandidat = None
+        self._jendela.clear()
+        self.jumlah_stabil += 1
+        return bacaan
+
+    def reset(self):
+        """
+        Tutup sampel yang sedang diukur (baris belum valid '*', rekaman habis).
+        Return kandidat stabil yang belum diteruskan, atau None.
+        """
+        kandidat = self._kandidat
+        self._mulai_sampel()
+        if kandidat is None:
+            return None
+        return self._teruskan(kandidat)
+
+    @property
+    def menunggu(self):
+        """True jika ada kandidat stabil yang belum diteruskan"""
+        return self._kandidat is not None
+
+    def tutup_jika_tenang(self, sekarang=None):
+        """
+        Tutup sampel jika kandidatnya sudah `batas_tenang` detik tanpa bacaan valid baru
+        (instrumen tidak mengirim baris penutup). Return kandidat atau None.
+        """
+        if not self.batas_tenang or self._kandidat is None:
+            return None
+        if sekarang is None:
+            sekarang = time.monotonic()
+        if sekarang - self._t_terakhir < self.batas_tenang:
+            return None
+        return self.reset()
+
+    def tambah(self, bacaan, waktu=None):
+        """
+        Masukkan satu bacaan valid. Return bacaan stabil (sekali per sampel) atau None.
+        waktu: monotonic saat bacaan diterima (default sekarang), acuan tutup_jika_tenang().
+        """
+        self._t_terakhir = time.monotonic() if waktu is None else waktu
+        if bacaan.format in self.format_penutup:
+            # Nilai akhir dari instrumen menutup sampel; kandidat yang jauh berbeda dianggap sampel lain
+            if self._terkirim is not None and self._dekat(bacaan, self._terkirim):
+                self.jumlah_ditahan += 1
+                return None
+            if self._kandidat is not None and not self._dekat(bacaan, self._kandidat):
+                self.jumlah_dibuang += 1
+            return self._teruskan(bacaan)
+
+        if self._terkirim is not None:
+            if self._dekat(bacaan, self._terkirim):
+                self.jumlah_ditahan += 1
+                return None
+            self._mulai_sampel()
+
+        if self.mode == MODE_BERTURUT:
+            keluar = self._tambah_berturut(bacaan)
+        else:
+            keluar = self._tambah_median(bacaan)
+        if keluar is None:
+            self.jumlah_ditahan += 1
+            return None
+        # Sampel sebelumnya berakhir tanpa penutup: kandidatnya diteruskan sekarang
+        self.jumlah_stabil += 1
+        return keluar
+
+    def _tambah_berturut(self, bacaan):
+        """Return kandidat sampel sebelumnya jika bacaan ini memulai sampel baru, selain itu None"""
+        keluar = None
+        if self._kandidat is not None and not self._dekat(bacaan, self._kandidat):
+            keluar = self._kandidat
+            self._mulai_sampel()
+        jendela = self._jendela
+        # Buang bacaan lama yang tidak lagi dalam toleransi bacaan baru
+        while jendela and not all(self._dekat(bacaan, b) for b in jendela):
+            jendela.popleft()
+        jendela.append(bacaan)
+        if len(jendela) >= self.jumlah:
+            self._kandidat = bacaan
+        return keluar
+
+    def _tambah_median(self, bacaan):
+        """Return kandidat sampel sebelumnya jika median bergeser ke sampel baru, selain itu None"""
+        jendela = self._jendela
+        jendela.append(bacaan)
+        if len(jendela) < self.jumlah:
+            return None
+        median = bacaan._replace(
+            pol_baca=round(_median([b.pol_baca for b in jendela]), 2),
+            brix=round(_median([b.brix for b in jendela]), 2),
+            pol=round(_median([b.pol for b in jendela]), 2),
+        )
+        if sum(1 for b in jendela if self._dekat(b, median)) * 2 <= len(jendela):
+            return None
+        keluar = None
+        if self._kandidat is not None and not self._dekat(median, self._kandidat):
+            keluar = self._kandidat
+            # Sisakan hanya bacaan sampel baru di jendela
+            baru = [b for b in jendela if self._dekat(b, median)]
+            jendela.clear()
+            jendela.extend(baru)
+        self._kandidat = median
+        return keluar
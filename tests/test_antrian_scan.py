@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from antrian_scan import AntrianPenuh, AntrianScan
+
+
+def test_kartu_dipasangkan_fifo():
+    antrian = AntrianScan()
+    for kartu in ("A", "B", "C"):
+        assert antrian.tambah_kartu(kartu) is None
+    hasil = [antrian.tambah_bacaan(nilai) for nilai in (1, 2, 3)]
+    assert [(p.kartu_ari, p.bacaan) for p in hasil] == [("A", 1), ("B", 2), ("C", 3)]
+    assert all(p.detik_tunggu >= 0 for p in hasil)
+    assert len(antrian) == 0
+    assert antrian.jumlah_dipasangkan == 3
+
+
+def test_bacaan_lebih_dulu_menunggu_kartu():
+    antrian = AntrianScan()
+    assert antrian.tambah_bacaan(1) is None
+    assert antrian.tambah_bacaan(2) is None     # menggantikan bacaan 1
+    pasangan = antrian.tambah_kartu("A")
+    assert (pasangan.kartu_ari, pasangan.bacaan, pasangan.detik_tunggu) == ("A", 2, 0.0)
+    # Bacaan sudah terpakai: kartu berikutnya masuk antrian
+    assert antrian.tambah_kartu("B") is None
+    assert antrian.daftar() == ["B"]
+
+
+def test_antrian_penuh():
+    antrian = AntrianScan(maks=2)
+    antrian.tambah_kartu("A")
+    antrian.tambah_kartu("B")
+    with pytest.raises(AntrianPenuh):
+        antrian.tambah_kartu("C")
+    assert antrian.daftar() == ["A", "B"]
+
+
+def test_hapus_dan_kosongkan():
+    antrian = AntrianScan()
+    for kartu in ("A", "B", "C"):
+        antrian.tambah_kartu(kartu)
+    assert antrian.hapus("B")
+    assert not antrian.hapus("X")
+    assert antrian.daftar() == ["A", "C"]
+    assert antrian.ada("C") and not antrian.ada("B")
+    assert antrian.kosongkan() == ["A", "C"]
+    assert antrian.tambah_bacaan(1) is None
+    antrian.kosongkan()
+    assert antrian.tambah_kartu("D") is None    # bacaan yang menunggu ikut dibuang
+
+
+def test_kembalikan_ke_depan_antrian():
+    antrian = AntrianScan()
+    for kartu in ("A", "B"):
+        antrian.tambah_kartu(kartu)
+    kartu, detik = antrian.ambil_kartu()
+    assert kartu == "A"
+    assert antrian.kembalikan(kartu, detik)
+    assert antrian.daftar() == ["A", "B"]
+    assert antrian.jumlah_dipasangkan == 0
+    # Kartu yang di-scan ulang selama dikirim tidak digandakan
+    kartu, detik = antrian.ambil_kartu()
+    antrian.tambah_kartu("A")
+    assert not antrian.kembalikan(kartu, detik)
+    assert antrian.daftar() == ["B", "A"]
+
+
+def test_ambil_kartu_antrian_kosong():
+    assert AntrianScan().ambil_kartu() is None
+
+
+def test_banyak_thread_tiap_kartu_sekali():
+    antrian = AntrianScan(maks=10000)
+    pasangan = []
+    lock = threading.Lock()
+
+    def scan(awal):
+        for i in range(awal, awal + 500):
+            antrian.tambah_kartu(str(i))
+
+    def ukur():
+        for i in range(500):
+            p = antrian.tambah_bacaan(i)
+            if p is not None:
+                with lock:
+                    pasangan.append(p.kartu_ari)
+
+    threads = [threading.Thread(target=scan, args=(n * 500,)) for n in range(2)]
+    threads += [threading.Thread(target=ukur) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sisa = antrian.daftar()
+    assert len(pasangan) + len(sisa) == 1000
+    assert len(set(pasangan) | set(sisa)) == 1000
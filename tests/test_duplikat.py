@@ -0,0 +1,77 @@
+import time
+
+from duplikat import IndeksDuplikat, awal_shift
+from outbox import HASIL_DITOLAK, HASIL_TERKIRIM
+
+
+class RiwayatPalsu:
+    """Cukup untuk IndeksDuplikat: kartu_sejak() dan cari_kartu()"""
+
+    def __init__(self, baris):
+        self.baris = baris      # list dict kartu_ari, waktu, status
+
+    def kartu_sejak(self, waktu):
+        return [(b['kartu_ari'], b['waktu'], b['status']) for b in sorted(self.baris, key=lambda b: b['waktu'])
+                if b['waktu'] >= waktu]
+
+    def cari_kartu(self, kartu_ari, tunggu=True):
+        return [b for b in self.baris if b['kartu_ari'] == kartu_ari]
+
+
+def _lokal(jam, menit=0, hari=0):
+    lokal = time.localtime()
+    return time.mktime((lokal.tm_year, lokal.tm_mon, lokal.tm_mday + hari, jam, menit, 0, 0, 0, -1))
+
+
+def test_awal_shift():
+    assert awal_shift(_lokal(7, 30), (6, 14, 22)) == _lokal(6)
+    assert awal_shift(_lokal(14), (6, 14, 22)) == _lokal(14)
+    assert awal_shift(_lokal(23, 59), (6, 14, 22)) == _lokal(22)
+    # Sebelum shift pertama: shift malam yang mulai kemarin
+    assert awal_shift(_lokal(3), (6, 14, 22)) == _lokal(22, hari=-1)
+
+
+def test_kirim_kedua_pada_shift_yang_sama_terdeteksi():
+    indeks = IndeksDuplikat()
+    assert indeks.periksa("1001") is None
+    duplikat = indeks.periksa(" 1001 ")
+    assert duplikat is not None and duplikat.shift_ini
+    assert indeks.jumlah_diblokir == 1
+
+
+def test_tandai_false_tidak_mencatat():
+    indeks = IndeksDuplikat()
+    assert indeks.periksa("1001", tandai=False) is None
+    assert indeks.periksa("1001") is None
+    assert len(indeks) == 1
+
+
+def test_lepas_membolehkan_kirim_lagi():
+    indeks = IndeksDuplikat()
+    indeks.periksa("1001")
+    indeks.lepas("1001")
+    assert indeks.periksa("1001") is None
+
+
+def test_ganti_shift_mengosongkan_indeks():
+    indeks = IndeksDuplikat()
+    indeks.periksa("1001")
+    indeks._awal -= 8 * 3600     # indeks masih berisi shift sebelumnya
+    assert indeks.periksa("1001") is None
+
+
+def test_muat_dari_riwayat_dan_kartu_shift_sebelumnya():
+    sekarang = time.time()
+    awal = awal_shift(sekarang)
+    riwayat = RiwayatPalsu([
+        {'kartu_ari': "A", 'waktu': awal + 1, 'status': HASIL_TERKIRIM},
+        {'kartu_ari': "B", 'waktu': awal + 2, 'status': HASIL_DITOLAK},
+        {'kartu_ari': "C", 'waktu': awal - 3600, 'status': HASIL_TERKIRIM},
+    ])
+    indeks = IndeksDuplikat(riwayat)
+    assert indeks.muat() == 1
+    assert indeks.periksa("A").shift_ini
+    assert indeks.periksa("B") is None          # ditolak server: boleh dikirim lagi
+    lama = indeks.periksa("C")
+    assert lama is not None and not lama.shift_ini
+    assert indeks.jumlah_ditandai == 1
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from outbox import (HASIL_DITOLAK, HASIL_TERKIRIM, HASIL_ULANG, STATUS_DIGANTI, STATUS_DIKIRIM,
+                    STATUS_DITOLAK, STATUS_MENUNGGU, STATUS_TERKIRIM, Outbox, klasifikasi_hasil)
+
+
+def _hasil(status_code=200, text='', error=None):
+    return {'error': error, 'status_code': status_code, 'text': text, 'latensi_ms': 1.0}
+
+
+SUKSES = _hasil(text=json.dumps({'status': 'success', 'message': 'ok'}))
+
+
+@pytest.mark.parametrize("hasil_api, harapan", [
+    (_hasil(None, error='Timeout'), HASIL_ULANG),
+    (_hasil(None, error='Connection error'), HASIL_ULANG),
+    (_hasil(500, 'Internal Server Error'), HASIL_ULANG),
+    (_hasil(503), HASIL_ULANG),
+    (_hasil(404, 'Not Found'), HASIL_DITOLAK),
+    (_hasil(200, '<html>Fatal error</html>'), HASIL_DITOLAK),
+    (_hasil(200, json.dumps({'message': 'tanpa status'})), HASIL_DITOLAK),
+    (_hasil(200, json.dumps({'status': 'error', 'message': 'kartu tidak dikenal'})), HASIL_DITOLAK),
+    (SUKSES, HASIL_TERKIRIM),
+])
+def test_klasifikasi_hasil(hasil_api, harapan):
+    assert klasifikasi_hasil(hasil_api)[0] == harapan
+
+
+def test_klasifikasi_hasil_membawa_pesan():
+    assert klasifikasi_hasil(SUKSES) == (HASIL_TERKIRIM, 'ok')
+    assert klasifikasi_hasil(_hasil(None, error='Timeout')) == (HASIL_ULANG, 'Timeout')
+    hasil, pesan = klasifikasi_hasil(_hasil(200, json.dumps({'status': 'error', 'message': 'kartu tidak dikenal'})))
+    assert (hasil, pesan) == (HASIL_DITOLAK, 'kartu tidak dikenal')
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    yield outbox
+    outbox.tutup()
+
+
+def _baris(outbox, row_id):
+    return outbox._conn.execute(
+        "SELECT status, percobaan, coba_lagi, error FROM outbox WHERE id=?", (row_id,)
+    ).fetchone()
+
+
+PARAMS = {'kartu_ari': '1001', 'brix_ari': 17.2, 'pol_ari': 15.87, 'pol_baca_ari': 69.78, 'rendemen_ari': 10.53}
+
+
+def test_tandai_hasil_terkirim(outbox):
+    row_id = outbox.tambah(PARAMS)
+    assert outbox.jumlah_antri() == 1
+    assert outbox.tandai_hasil(row_id, SUKSES)[0] == HASIL_TERKIRIM
+    assert _baris(outbox, row_id)[0] == STATUS_TERKIRIM
+    assert outbox.jumlah_antri() == 0
+
+
+def test_tandai_hasil_ulang_dijadwalkan_dengan_backoff(outbox):
+    row_id = outbox.tambah(PARAMS)
+    assert outbox.tandai_hasil(row_id, _hasil(None, error='Timeout'))[0] == HASIL_ULANG
+    status, percobaan, coba_lagi, error = _baris(outbox, row_id)
+    assert (status, percobaan, error) == (STATUS_MENUNGGU, 1, 'Timeout')
+    assert coba_lagi > outbox._conn.execute("SELECT diperbarui FROM outbox WHERE id=?", (row_id,)).fetchone()[0]
+    assert outbox.klaim_jatuh_tempo() == []     # belum jatuh tempo
+    assert outbox.jumlah_antri() == 1
+
+
+def test_tandai_hasil_ditolak(outbox):
+    row_id = outbox.tambah(PARAMS)
+    hasil, pesan = outbox.tandai_hasil(row_id, _hasil(404, 'Not Found'))
+    assert hasil == HASIL_DITOLAK
+    assert _baris(outbox, row_id)[0] == STATUS_DITOLAK
+    assert _baris(outbox, row_id)[3] == pesan
+    assert outbox.jumlah_antri() == 0
+
+
+def test_klaim_jatuh_tempo(outbox):
+    row_id = outbox.tambah(PARAMS, status=STATUS_MENUNGGU)
+    assert outbox.klaim_jatuh_tempo() == [(row_id, PARAMS)]
+    assert _baris(outbox, row_id)[0] == STATUS_DIKIRIM
+    assert outbox.klaim_jatuh_tempo() == []
+
+
+def test_tambah_mengganti_baris_aktif_kartu_yang_sama(outbox):
+    lama = outbox.tambah(PARAMS)
+    baru = outbox.tambah(dict(PARAMS, pol_ari=15.9))
+    assert _baris(outbox, lama)[0] == STATUS_DIGANTI
+    assert outbox.jumlah_antri() == 1
+    # Hasil kiriman lama yang datang terlambat tidak menimpa status 'diganti'
+    outbox.tandai_hasil(lama, SUKSES)
+    assert _baris(outbox, lama)[0] == STATUS_DIGANTI
+    assert _baris(outbox, baru)[0] == STATUS_DIKIRIM
+
+
+def test_baris_dikirim_saat_mati_diantri_lagi(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    outbox = Outbox(path)
+    row_id = outbox.tambah(PARAMS)
+    outbox.tutup()
+    outbox = Outbox(path)
+    try:
+        assert _baris(outbox, row_id)[0] == STATUS_MENUNGGU
+        assert outbox.klaim_jatuh_tempo() == [(row_id, PARAMS)]
+    finally:
+        outbox.tutup()
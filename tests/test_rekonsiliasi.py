@@ -0,0 +1,88 @@
+import pytest
+
+from api_client import ApiClient
+from outbox import HASIL_TERKIRIM, Outbox
+from rekonsiliasi import Rekonsiliasi
+from riwayat import Riwayat, STATUS_HILANG
+from tools.stub_server import jalankan_server
+
+pytest.importorskip("requests")
+
+
+def _params(kartu_ari):
+    return {'kartu_ari': kartu_ari, 'brix_ari': 17.2, 'pol_ari': 15.87, 'pol_baca_ari': 69.78,
+            'rendemen_ari': 10.53}
+
+
+@pytest.fixture
+def lingkungan(tmp_path):
+    dibuat = {}
+
+    def buat(hilang_setiap):
+        server = jalankan_server(hilang_setiap=hilang_setiap)
+        riwayat = Riwayat(str(tmp_path / "riwayat.db"))
+        outbox = Outbox(str(tmp_path / "outbox.db"))
+        dibuat.update(server=server, riwayat=riwayat, outbox=outbox)
+        return server, ApiClient(server.url), riwayat, outbox
+
+    yield buat
+    if dibuat:
+        dibuat['server'].shutdown()
+        dibuat['riwayat'].tutup()
+        dibuat['outbox'].tutup()
+
+
+def _kirim(api, riwayat, outbox, daftar_kartu):
+    """Seperti submit GUI: outbox → API → tandai outbox dan riwayat"""
+    daftar = [(outbox.tambah(_params(k)), riwayat.catat_hasil(_params(k)), _params(k)) for k in daftar_kartu]
+    for (outbox_id, rujukan, _), hasil_api in zip(daftar, api.kirim_batch([p for _, _, p in daftar])):
+        hasil, pesan = outbox.tandai_hasil(outbox_id, hasil_api)
+        riwayat.tandai(rujukan, hasil, pesan)
+        assert hasil == HASIL_TERKIRIM
+
+
+def _putar_outbox(api, riwayat, outbox):
+    """Seperti PemutarUlang.putar_sekali: kirim baris outbox yang jatuh tempo"""
+    baris = outbox.klaim_jatuh_tempo()
+    for (row_id, _), hasil_api in zip(baris, api.kirim_batch([p for _, p in baris])):
+        hasil, pesan = outbox.tandai_hasil(row_id, hasil_api)
+        riwayat.tandai_outbox(row_id, hasil, pesan)
+    return len(baris)
+
+
+def test_hasil_hilang_dikirim_ulang_lalu_menyerah(lingkungan):
+    server, api, riwayat, outbox = lingkungan(hilang_setiap=1)
+    _kirim(api, riwayat, outbox, ["1001"])
+    assert server.hilang == ["1001"]
+
+    rekon = Rekonsiliasi(api, riwayat, outbox, jeda_awal=0, maks_ulang=2)
+    for ulang_ke in (1, 2):
+        hasil = rekon.rekonsiliasi()
+        assert hasil.hilang == ["1001"] and hasil.menyerah == []
+        row = riwayat.cari_kartu("1001")[0]
+        assert (row['status'], row['ulang_ke']) == ("ulang", ulang_ke)
+        assert outbox.jumlah_antri() == 1
+        # Hasil 'ulang' dilewati sampai kiriman ulangnya dikonfirmasi server
+        assert rekon.rekonsiliasi().hilang == []
+        assert _putar_outbox(api, riwayat, outbox) == 1
+        assert riwayat.cari_kartu("1001")[0]['status'] == HASIL_TERKIRIM
+
+    hasil = rekon.rekonsiliasi()
+    assert hasil.hilang == [] and hasil.menyerah == ["1001"]
+    assert riwayat.cari_kartu("1001")[0]['status'] == STATUS_HILANG
+    assert outbox.jumlah_antri() == 0
+    assert len(server.hilang) == 3
+    # Tidak dikirim ulang lagi setelah menyerah
+    hasil = rekon.rekonsiliasi()
+    assert hasil.hilang == [] and hasil.menyerah == [] and hasil.lokal == 0
+
+
+def test_hanya_hasil_yang_hilang_dikirim_ulang(lingkungan):
+    server, api, riwayat, outbox = lingkungan(hilang_setiap=2)
+    _kirim(api, riwayat, outbox, ["1001", "1002", "1003", "1004"])
+    assert sorted(server.hilang) == ["1002", "1004"]
+
+    hasil = Rekonsiliasi(api, riwayat, outbox, jeda_awal=0).rekonsiliasi()
+    assert hasil.lokal == 4 and hasil.selesai == 2
+    assert sorted(hasil.hilang) == ["1002", "1004"]
+    assert riwayat.cari_kartu("1001")[0]['status'] == HASIL_TERKIRIM
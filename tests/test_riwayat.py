@@ -0,0 +1,40 @@
+from outbox import HASIL_TERKIRIM
+from riwayat import Riwayat, STATUS_DIKIRIM
+
+PARAMS = {'kartu_ari': '1001', 'brix_ari': 17.2, 'pol_ari': 15.87, 'pol_baca_ari': 69.78, 'rendemen_ari': 10.53}
+
+
+def test_id_hasil_dari_sqlite_unik_antar_instance(tmp_path):
+    path = str(tmp_path / "riwayat.db")
+    gui, headless = Riwayat(path), Riwayat(path)
+    try:
+        a = gui.catat_hasil(PARAMS)
+        gui.jumlah_hasil()
+        b = headless.catat_hasil(dict(PARAMS, kartu_ari='1002'))
+        headless.jumlah_hasil()
+        c = gui.catat_hasil(dict(PARAMS, kartu_ari='1003'))
+        gui.tandai(c, HASIL_TERKIRIM)
+        assert gui.jumlah_hasil() == 3
+        assert len({a.id, b.id, c.id}) == 3
+        baris = {row['kartu_ari']: row for row in gui.hasil_per_id([a.id, b.id, c.id])}
+        assert baris['1003']['status'] == HASIL_TERKIRIM
+        assert baris['1001']['status'] == STATUS_DIKIRIM
+    finally:
+        gui.tutup()
+        headless.tutup()
+
+
+def test_perintah_gagal_hanya_dirinya_yang_dibuang(tmp_path):
+    log = []
+    riwayat = Riwayat(str(tmp_path / "riwayat.db"), on_log=log.append, interval_tulis=1.0)
+    try:
+        a = riwayat.catat_hasil(PARAMS)
+        riwayat._antrian.put(("INSERT INTO tabel_tidak_ada VALUES (?)", (1,), None))
+        b = riwayat.catat_hasil(dict(PARAMS, kartu_ari='1002'))
+        riwayat.tandai(b, HASIL_TERKIRIM)
+        assert riwayat.jumlah_hasil() == 2
+        assert a.id is not None and b.id is not None
+        assert riwayat.hasil_per_id([b.id])[0]['status'] == HASIL_TERKIRIM
+        assert any("1 dibuang" in pesan for pesan in log)
+    finally:
+        riwayat.tutup()
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from rendemen import hitung_rendemen
+from rumus import RUMUS_DEFAULT, Rumus, muat_rumus
+
+
+def test_rumus_default_sama_dengan_rendemen():
+    assert RUMUS_DEFAULT.hitung(17.20, 15.87) == pytest.approx(hitung_rendemen(17.20, 15.87))
+    assert RUMUS_DEFAULT.versi_lengkap == "standar@1"
+
+
+def test_konstanta_disisipkan_sebagai_literal():
+    rumus = Rumus("uji", "faktor * pol + geser", {"faktor": 0.5, "geser": -1}, versi=2)
+    assert rumus.ekspresi_final == "0.5 * pol + -1"
+    assert rumus.hitung(0, 10) == pytest.approx(4.0)
+    assert rumus.versi_lengkap == "uji@2"
+
+
+def test_fungsi_yang_diizinkan():
+    rumus = Rumus("uji", "max(0, min(pol, brix) - abs(pol_baca))")
+    assert rumus.hitung(17.2, 15.9, -1.0) == pytest.approx(14.9)
+    assert rumus.hitung(1.0, 2.0, 5.0) == 0
+
+
+def test_hitung_array():
+    np = pytest.importorskip("numpy")
+    hasil = RUMUS_DEFAULT.hitung_array(np.array([17.20, 18.0]), np.array([15.87, 16.0]))
+    assert hasil == pytest.approx([hitung_rendemen(17.20, 15.87), hitung_rendemen(18.0, 16.0)])
+
+
+@pytest.mark.parametrize("ekspresi", [
+    "__import__('os')",
+    "brix.real",
+    "x * pol",
+    "open('rumus.json')",
+    "(lambda: 1)()",
+    "brix[0]",
+    "[p for p in (brix, pol)]",
+    "max(brix, pol, key=abs)",
+    "pol if True else brix",
+    "pol + 'a'",
+    "min",
+    "brix == pol",
+    "pol +",
+])
+def test_ekspresi_di_luar_daftar_putih_ditolak(ekspresi):
+    with pytest.raises(ValueError):
+        Rumus("uji", ekspresi)
+
+
+@pytest.mark.parametrize("konstanta", [
+    {"pol": 1.0},
+    {"max": 1.0},
+    {"bukan nama": 1.0},
+    {"faktor": "0.7"},
+    {"faktor": True},
+])
+def test_konstanta_tidak_valid_ditolak(konstanta):
+    with pytest.raises(ValueError):
+        Rumus("uji", "pol", konstanta)
+
+
+def test_muat_rumus_dari_file(tmp_path):
+    path = tmp_path / "rumus.json"
+    path.write_text(json.dumps({
+        "aktif": "pg-2026",
+        "rumus": {"pg-2026": {"versi": "3", "ekspresi": "faktor * pol", "konstanta": {"faktor": 0.5}}},
+    }), encoding="utf-8")
+    rumus = muat_rumus(str(path))
+    assert rumus.versi_lengkap == "pg-2026@3"
+    assert rumus.hitung(0, 10) == pytest.approx(5.0)
+    assert muat_rumus(str(path), "standar") is RUMUS_DEFAULT
+    with pytest.raises(ValueError):
+        muat_rumus(str(path), "tidak-ada")
+
+
+def test_muat_rumus_tanpa_file(tmp_path):
+    assert muat_rumus(str(tmp_path / "tidak_ada.json")) is RUMUS_DEFAULT
+    with pytest.raises(ValueError):
+        muat_rumus(str(tmp_path / "tidak_ada.json"), "pg-2026")
+
+
+def test_file_rumus_dengan_ekspresi_terlarang(tmp_path):
+    path = tmp_path / "rumus.json"
+    path.write_text(json.dumps({"rumus": {"jahat": {"ekspresi": "__import__('os').getcwd()"}}}),
+                    encoding="utf-8")
+    with pytest.raises(ValueError):
+        muat_rumus(str(path), "jahat")
@@ -0,0 +1,79 @@
+import pytest
+
+from saccharomat import ABAIKAN, FormatBaris, ParserSaccharomat, nilai_kolom
+
+
+@pytest.fixture
+def parser():
+    return ParserSaccharomat()
+
+
+def test_baris_standar(parser):
+    bacaan = parser.parse("69.78  17.20  15.87  0.00")
+    assert (bacaan.pol_baca, bacaan.brix, bacaan.pol) == (69.78, 17.20, 15.87)
+    assert bacaan.valid
+    assert bacaan.format == "standar"
+    assert bacaan.raw == "69.78  17.20  15.87  0.00"
+
+
+def test_baris_ringkas(parser):
+    bacaan = parser.parse("69.78 17.20 15.87")
+    assert bacaan.format == "ringkas"
+    assert (bacaan.pol_baca, bacaan.brix, bacaan.pol) == (69.78, 17.20, 15.87)
+
+
+def test_kolom_bintang_tidak_valid(parser):
+    bacaan = parser.parse("69.78  -0.01  *90****  *90***")
+    assert (bacaan.pol_baca, bacaan.brix, bacaan.pol) == (69.78, -0.01, 0.0)
+    assert bacaan.pol_baca_valid and bacaan.brix_valid
+    assert not bacaan.pol_valid
+    assert not bacaan.valid
+
+
+def test_token_sampah_disaring(parser):
+    bacaan = parser.parse("P 69.78 B 17.20 Z 15.87")
+    assert bacaan.format == "ringkas"
+    assert (bacaan.pol_baca, bacaan.brix, bacaan.pol) == (69.78, 17.20, 15.87)
+
+
+@pytest.mark.parametrize("line", ["", "69.78 17.20", "abc def ghi jkl", "-- -- -- --"])
+def test_baris_tidak_dikenali(parser, line):
+    assert parser.parse(line) is None
+
+
+def test_format_berselang_seling_tanpa_state(parser):
+    hasil = [parser.parse(line).format for line in
+             ("1 2 3 4", "1 2 3", "1 2 3 4", "1 2 3", "1 2 3 4 5")]
+    assert hasil == ["standar", "ringkas", "standar", "ringkas", "standar"]
+
+
+def test_kolom_di_atas_tabel(parser):
+    kolom = ["1.0", "2.0", "3.0"] + ["0"] * (ParserSaccharomat.MAKS_TABEL_KOLOM + 5)
+    bacaan = parser.parse(" ".join(kolom))
+    assert bacaan.format == "standar"
+    assert bacaan.pol == 3.0
+
+
+def test_format_kustom():
+    fmt = FormatBaris("terbalik", ("pol", ABAIKAN, "brix", "pol_baca"))
+    bacaan = ParserSaccharomat([fmt]).parse("15.87 x 17.20 69.78")
+    assert (bacaan.pol_baca, bacaan.brix, bacaan.pol) == (69.78, 17.20, 15.87)
+
+
+def test_format_tanpa_kolom_wajib():
+    with pytest.raises(ValueError):
+        FormatBaris("rusak", ("pol_baca", "brix"))
+    with pytest.raises(ValueError):
+        ParserSaccharomat([])
+
+
+@pytest.mark.parametrize("token, harapan", [
+    ("12.5", (12.5, True)),
+    ("-0.01", (-0.01, True)),
+    ("*90***", (0.0, False)),
+    ("*", (0.0, False)),
+    ("*9a", None),
+    ("abc", None),
+])
+def test_nilai_kolom(token, harapan):
+    assert nilai_kolom(token) == harapan
@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+from pembaca import PembacaSerial
+from saccharomat import ParserSaccharomat
+from stabil import PendeteksiStabil
+
+parser = ParserSaccharomat()
+
+
+def bacaan(line):
+    hasil = parser.parse(line)
+    assert hasil is not None and hasil.valid
+    return hasil
+
+
+def test_sampel_tanpa_penutup_diteruskan_setelah_tenang():
+    stabil = PendeteksiStabil(jumlah=3, toleransi=0.05, batas_tenang=5)
+    keluar = []
+    t = 100.0
+    for line in ("69.70 17.10 15.80 0", "69.78 17.20 15.87 0", "69.79 17.20 15.87 0",
+                 "69.78 17.21 15.87 0", "69.78 17.20 15.88 0"):
+        keluar.append(stabil.tambah(bacaan(line), waktu=t))
+        t += 1
+    assert keluar == [None] * 5
+    assert stabil.menunggu
+
+    # Belum cukup lama tenang
+    assert stabil.tutup_jika_tenang(sekarang=t + 2) is None
+
+    hasil = stabil.tutup_jika_tenang(sekarang=t + 5)
+    assert (hasil.pol_baca, hasil.brix, hasil.pol) == (69.78, 17.20, 15.88)
+    assert not stabil.menunggu
+    assert stabil.tutup_jika_tenang(sekarang=t + 60) is None
+
+    # Bacaan sampel yang sama sesudahnya tidak diteruskan lagi
+    assert stabil.tambah(bacaan("69.78 17.20 15.87 0"), waktu=t + 61) is None
+
+
+def test_batas_tenang_nol_menonaktifkan_penutupan_waktu():
+    stabil = PendeteksiStabil(jumlah=2, batas_tenang=0)
+    for line in ("69.78 17.20 15.87 0", "69.78 17.20 15.87 0"):
+        stabil.tambah(bacaan(line), waktu=0.0)
+    assert stabil.tutup_jika_tenang(sekarang=1e9) is None
+    assert stabil.reset().pol == 15.87
+
+
+def test_pembaca_meneruskan_sampel_terakhir_nampan():
+    diterima = []
+    pembaca = PembacaSerial("uji", 9600, on_bacaan=lambda p, b, t: diterima.append(b), on_log=lambda line: None,
+                            stabil_opsi={'jumlah': 3, 'batas_tenang': 0.05})
+    # Dua sampel berurutan tanpa baris penutup maupun baris '*'
+    for line in ("69.78 17.20 15.87 0",) * 3 + ("72.10 18.01 16.40 0",) * 3:
+        pembaca._proses_baris(line.encode(), time.perf_counter())
+    assert [b.pol for b in diterima] == [15.87]
+
+    assert not pembaca.tutup_sampel_tenang()     # masih dalam batas tenang
+    time.sleep(0.1)
+    assert pembaca.tutup_sampel_tenang()
+    assert [b.pol for b in diterima] == [15.87, 16.40]
+    assert pembaca.jumlah_stabil == 2
+
+
+def _stabil(**opsi):
+    opsi.setdefault("jumlah", 3)
+    opsi.setdefault("batas_tenang", 0)
+    return PendeteksiStabil(**opsi)
+
+
+def test_baris_penutup_diteruskan_sekali():
+    stabil = _stabil()
+    for line in ("69.78 17.20 15.87 0",) * 4:
+        assert stabil.tambah(bacaan(line)) is None
+    penutup = stabil.tambah(bacaan("69.79 17.20 15.87"))
+    assert penutup.format == "ringkas" and penutup.pol_baca == 69.79
+    # Baris berikutnya dari sampel yang sama diabaikan
+    assert stabil.tambah(bacaan("69.79 17.20 15.87 0")) is None
+    assert stabil.tambah(bacaan("69.79 17.20 15.87")) is None
+    assert stabil.jumlah_stabil == 1
+
+
+def test_reset_meneruskan_kandidat_terakhir():
+    stabil = _stabil()
+    for line in ("69.78 17.20 15.87 0", "69.78 17.20 15.87 0", "69.78 17.20 15.87 0", "69.80 17.21 15.88 0"):
+        stabil.tambah(bacaan(line))
+    hasil = stabil.reset()
+    assert (hasil.pol_baca, hasil.pol) == (69.80, 15.88)
+    assert stabil.reset() is None
+
+
+def test_sampel_baru_tanpa_bintang_meneruskan_sampel_lama():
+    stabil = _stabil()
+    for line in ("69.78 17.20 15.87 0",) * 3:
+        assert stabil.tambah(bacaan(line)) is None
+    keluar = stabil.tambah(bacaan("72.10 18.01 16.40 0"))
+    assert keluar.pol == 15.87
+
+
+def test_sampel_belum_stabil_dibuang():
+    stabil = _stabil()
+    for line in ("69.00 17.20 15.87 0", "69.50 17.20 15.87 0"):
+        stabil.tambah(bacaan(line))
+    assert stabil.reset() is None
+    assert stabil.jumlah_dibuang == 1
+
+
+def test_mode_median_tahan_satu_loncatan():
+    stabil = _stabil(mode="median", jumlah=5)
+    for line in ("69.78 17.20 15.87 0", "69.79 17.20 15.87 0", "75.00 17.20 15.87 0",
+                 "69.78 17.21 15.87 0", "69.78 17.20 15.88 0"):
+        assert stabil.tambah(bacaan(line)) is None
+    hasil = stabil.reset()
+    assert (hasil.pol_baca, hasil.brix, hasil.pol) == (69.78, 17.20, 15.87)
+
+
+def test_opsi_tidak_valid():
+    with pytest.raises(ValueError):
+        PendeteksiStabil(mode="rata")
+    with pytest.raises(ValueError):
+        PendeteksiStabil(jumlah=0)
@@ -0,0 +1 @@
+"""Alat bantu pengembangan: server tiruan, simulator dan benchmark (tidak ikut di EXE)."""
@@ -0,0 +1,74 @@
+"""Micro-benchmark parser baris Saccharomat.
+
+Membandingkan logika parsing lama di baca_serial (split + float dalam
+try/except + loop fallback) dengan saccharomat.ParserSaccharomat.
+
+Jalankan: python -m tools.bench_parser [--korpus FILE] [--ulang 200]
+Korpus default (tools/data/saccharomat_contoh.txt) adalah contoh baris sesuai
+format instrumen; untuk angka yang representatif pakai file hasil rekaman.
+"""
+import argparse
+import os
+import time
+
+from saccharomat import ParserSaccharomat
+
+KORPUS_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "saccharomat_contoh.txt")
+
+
+def parse_lama(line):
+    """Salinan logika parsing baca_serial sebelum ada modul saccharomat"""
+    parts = line.split()
+    if len(parts) >= 4:
+        try:
+            return float(parts[0]), float(parts[1]), float(parts[2])
+        except (ValueError, IndexError):
+            return None
+    elif len(parts) >= 3:
+        numbers = []
+        for p in parts:
+            try:
+                numbers.append(float(p))
+            except ValueError:
+                continue
+        if len(numbers) >= 3:
+            return numbers[0], numbers[1], numbers[2]
+    return None
+
+
+def ukur(fungsi, lines, ulang):
+    terbaik = None
+    for _ in range(5):
+        mulai = time.perf_counter()
+        for _ in range(ulang):
+            for line in lines:
+                fungsi(line)
+        durasi = time.perf_counter() - mulai
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    return terbaik / (ulang * len(lines)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--korpus", default=KORPUS_DEFAULT, help="file teks, satu baris serial per baris")
+    parser.add_argument("--ulang", type=int, default=200, help="berapa kali korpus diulang per putaran")
+    args = parser.parse_args()
+
+    with open(args.korpus, encoding="utf-8", errors="ignore") as f:
+        lines = [line.strip() for line in f]
+
+    baru = ParserSaccharomat()
+    hasil_baru = [baru.parse(line) for line in lines]
+    print(f"Korpus: {args.korpus} ({len(lines)} baris)")
+    print(f"  dikenali  : {sum(b is not None for b in hasil_baru)}")
+    print(f"  valid     : {sum(b is not None and b.valid for b in hasil_baru)}")
+    print(f"  bintang   : {sum(b is not None and not b.valid for b in hasil_baru)}")
+    print(f"  lama OK   : {sum(parse_lama(line) is not None for line in lines)}")
+    print()
+    print(f"{'parser':<12}{'ns/baris':>12}")
+    print(f"{'lama':<12}{ukur(parse_lama, lines, args.ulang):>12.0f}")
+    print(f"{'saccharomat':<12}{ukur(baru.parse, lines, args.ulang):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Benchmark end-to-end pipeline serial → parse → rendemen → submit, tanpa hardware/jaringan.
+
+Sumber serial adalah port replay (replay.py) berisi sampel sintetis seperti
+tools.sim_saccharomat, server adalah tools.stub_server di port bebas. Tahap:
+  - parse    : PembacaSerial (engine baca + parser + penyaring stabil), baris/s
+  - rendemen : buat_params dengan rumus aktif (hitung rendemen + params), ns/op
+  - kirim    : round trip ApiClient.kirim_satu ke stub, p50/p95/p99 ms
+  - pipeline : Stasiun headless utuh (pengawas, pasangan kartu, outbox, riwayat,
+               PengirimBatch) dari baris serial sampai respon; sampel/s dan
+               latensi per tahap dari metrik.py
+Data sintetis memakai seed tetap sehingga hasil bisa diulang. Hasil disimpan
+sebagai JSON dan bisa dibandingkan dengan file hasil rilis sebelumnya:
+
+    python -m tools.bench_pipeline --simpan hasil-1.4.json
+    python -m tools.bench_pipeline --banding hasil-1.4.json --ambang 15
+
+Dengan --banding, exit code 1 jika ada metrik yang memburuk melebihi --ambang persen.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from api_client import ApiClient
+from headless import Stasiun
+from metrik import Metrik
+from pembaca import PembacaSerial
+from rendemen import buat_params
+from replay import buat_port_replay
+from rumus import muat_rumus
+from saccharomat import ParserSaccharomat
+from stabil import PendeteksiStabil
+from config import (RUMUS_FILE, RUMUS_AKTIF, STABIL_MODE, STABIL_JUMLAH, STABIL_TOLERANSI,
+                    STABIL_BATAS_TENANG)
+from tools.sim_saccharomat import sampel_sintetis
+from tools.stub_server import jalankan_server
+
+VERSI_FORMAT = 1
+
+
+def _diam(line):
+    pass
+
+
+def _persentil(nilai):
+    urut = sorted(nilai)
+    if not urut:
+        return {"p50": None, "p95": None, "p99": None}
+    return {f"p{int(q * 100)}": round(urut[min(len(urut) - 1, int(q * len(urut)))], 3) for q in (0.5, 0.95, 0.99)}
+
+
+def opsi_stabil():
+    return {'mode': STABIL_MODE, 'jumlah': STABIL_JUMLAH, 'toleransi': STABIL_TOLERANSI,
+            'batas_tenang': STABIL_BATAS_TENANG} if STABIL_MODE else None
+
+
+def tulis_korpus(folder, sampel, seed):
+    """Tulis korpus sintetis, return (path, jumlah baris)"""
+    path = os.path.join(folder, "korpus.txt")
+    jumlah = 0
+    with open(path, "wb") as f:
+        for line in sampel_sintetis(sampel, seed=seed):
+            f.write(line)
+            jumlah += 1
+    return path, jumlah
+
+
+def tunggu_baris(pembaca, jumlah, batas_detik):
+    """Tunggu sampai `jumlah` baris diproses (pembaca berhenti sendiri saat rekaman habis)"""
+    batas = time.monotonic() + batas_detik
+    while pembaca.jumlah_baris < jumlah and time.monotonic() < batas:
+        time.sleep(0.001)
+
+
+def bacaan_korpus(path):
+    """Bacaan stabil dari korpus (input tahap rendemen)"""
+    parser = ParserSaccharomat()
+    stabil = PendeteksiStabil()
+    daftar = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            bacaan = parser.parse(line.strip())
+            if bacaan is None:
+                continue
+            stabil_baru = stabil.tambah(bacaan) if bacaan.valid else stabil.reset()
+            if stabil_baru is not None:
+                daftar.append(stabil_baru)
+    sisa = stabil.reset()       # sampel terakhir ditutup oleh akhir korpus
+    if sisa is not None:
+        daftar.append(sisa)
+    return daftar
+
+
+def ukur_parse(korpus, jumlah_baris, ulang, batas_detik):
+    """Baris/s melalui PembacaSerial dengan replay secepat mungkin"""
+    jumlah_stabil = [0]
+
+    def on_bacaan(pembaca, bacaan, t_baca):
+        jumlah_stabil[0] += 1
+
+    pembaca = PembacaSerial(buat_port_replay(korpus, baud=0, ulang=ulang), 0, on_bacaan=on_bacaan, on_log=_diam,
+                            stabil_opsi=opsi_stabil())
+    mulai = time.perf_counter()
+    pembaca.start()
+    tunggu_baris(pembaca, jumlah_baris * ulang, batas_detik)
+    durasi = time.perf_counter() - mulai
+    pembaca.stop(tunggu=2.0)
+    return {
+        "baris": pembaca.jumlah_baris,
+        "bacaan_stabil": jumlah_stabil[0],
+        "detik": round(durasi, 4),
+        "baris_per_detik": round(pembaca.jumlah_baris / durasi, 1),
+        "latensi_parse_rata_ms": round(pembaca.rata_rata_latensi_ms or 0.0, 4),
+    }
+
+
+def ukur_rendemen(daftar_bacaan, rumus, ulang):
+    """ns per hasil: hitung rendemen + susun params (terbaik dari 5 putaran)"""
+    terbaik = None
+    for _ in range(5):
+        mulai = time.perf_counter()
+        for _ in range(ulang):
+            for i, b in enumerate(daftar_bacaan):
+                buat_params(i, b.pol_baca, b.brix, b.pol, rumus=rumus)
+        durasi = time.perf_counter() - mulai
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    jumlah = ulang * len(daftar_bacaan)
+    return {"hasil": jumlah, "ns_per_hasil": round(terbaik / jumlah * 1e9, 1),
+            "hasil_per_detik": round(jumlah / terbaik, 1)}
+
+
+def ukur_kirim(server, daftar_bacaan, rumus, jumlah):
+    """Round trip kirim_satu berurutan (koneksi keep-alive ApiClient)"""
+    api = ApiClient(server.url)
+    api.siapkan()
+    latensi = []
+    gagal = 0
+    mulai = time.perf_counter()
+    for i in range(jumlah):
+        b = daftar_bacaan[i % len(daftar_bacaan)]
+        t = time.perf_counter()
+        hasil = api.kirim_satu(buat_params(f"K{i}", b.pol_baca, b.brix, b.pol, rumus=rumus))
+        latensi.append((time.perf_counter() - t) * 1000)
+        if hasil['error'] or hasil['status_code'] != 200:
+            gagal += 1
+    durasi = time.perf_counter() - mulai
+    return {"request": jumlah, "gagal": gagal, "request_per_detik": round(jumlah / durasi, 1),
+            "latensi_ms": _persentil(latensi)}
+
+
+def ukur_pipeline(server, korpus, folder, rumus, baud, batas_detik):
+    """Stasiun headless utuh: setiap bacaan stabil dipasangkan dengan kartu baru"""
+    metrik = Metrik()
+    error = []
+    stasiun = Stasiun([buat_port_replay(korpus, baud=baud, ulang=1)], api_base=server.url,
+                      outbox_path=os.path.join(folder, "outbox.db"), rumus=rumus, metrik=metrik,
+                      riwayat_path=os.path.join(folder, "riwayat.db"),
+                      on_log=lambda line: error.append(line) if "Error" in line else None)
+    terima_bacaan = stasiun.terima_bacaan
+    nomor = [0]
+
+    def bacaan_dengan_kartu(pembaca, bacaan, t_baca):
+        nomor[0] += 1
+        stasiun.terima_kartu(f"P{nomor[0]}")
+        terima_bacaan(pembaca, bacaan, t_baca)
+
+    stasiun.terima_bacaan = bacaan_dengan_kartu
+    mulai = time.perf_counter()
+    stasiun.mulai()
+    # Rekaman habis → pembaca berhenti → Stasiun menandai selesai
+    stasiun.selesai.wait(batas_detik)
+    # Tunggu respon kiriman terakhir
+    batas = time.monotonic() + batas_detik
+    while stasiun.jumlah_terkirim < stasiun.jumlah_kirim and time.monotonic() < batas:
+        time.sleep(0.005)
+    durasi = time.perf_counter() - mulai
+    stasiun.berhenti(tunggu=2.0)
+
+    latensi = {}
+    for tahap in ("serial_parse", "api", "serial_respon"):
+        ringkasan = metrik.ringkasan(tahap)
+        if ringkasan is not None:
+            latensi[tahap] = {"jumlah": ringkasan[0], "p50": round(ringkasan[1], 3),
+                              "p95": round(ringkasan[2], 3), "p99": round(ringkasan[3], 3)}
+    return {
+        "baud": baud,
+        "sampel": stasiun.jumlah_kirim,
+        "terkirim": stasiun.jumlah_terkirim,
+        "error": len(error),
+        "detik": round(durasi, 4),
+        "sampel_per_detik": round(stasiun.jumlah_terkirim / durasi, 1),
+        "latensi_ms": latensi,
+    }
+
+
+# --- banding ---
+
+def ratakan(data, awalan=""):
+    """dict bersarang → {"a.b.c": angka}"""
+    hasil = {}
+    for kunci, nilai in data.items():
+        nama = f"{awalan}{kunci}"
+        if isinstance(nilai, dict):
+            hasil.update(ratakan(nilai, nama + "."))
+        elif isinstance(nilai, (int, float)) and not isinstance(nilai, bool):
+            hasil[nama] = nilai
+    return hasil
+
+
+def arah(nama):
+    """+1 = makin besar makin baik, -1 = makin kecil makin baik, 0 = tidak dinilai"""
+    if nama.endswith(".jumlah"):
+        return 0
+    if nama.endswith("_per_detik"):
+        return 1
+    if "latensi" in nama or nama.endswith("ns_per_hasil"):
+        return -1
+    return 0
+
+
+def banding(lama, baru, ambang):
+    """Cetak selisih metrik, return daftar metrik yang memburuk melebihi ambang persen"""
+    a, b = ratakan(lama["hasil"]), ratakan(baru["hasil"])
+    memburuk = []
+    print(f"\n{'metrik':<42}{'lama':>12}{'baru':>12}{'selisih':>10}")
+    for nama in sorted(set(a) & set(b)):
+        if not arah(nama) or not a[nama]:
+            continue
+        persen = (b[nama] - a[nama]) / a[nama] * 100
+        tanda = ""
+        if persen * arah(nama) < -ambang:
+            memburuk.append(nama)
+            tanda = "  MEMBURUK"
+        print(f"{nama:<42}{a[nama]:>12g}{b[nama]:>12g}{persen:>+9.1f}%{tanda}")
+    return memburuk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sampel", type=int, default=200, help="jumlah sampel sintetis di korpus")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ulang-parse", type=int, default=20, help="korpus diputar sekian kali untuk tahap parse")
+    parser.add_argument("--ulang-rendemen", type=int, default=50)
+    parser.add_argument("--kirim", type=int, default=300, help="jumlah request tahap kirim")
+    parser.add_argument("--baud", type=int, default=0, help="laju replay tahap pipeline, 0 = secepat mungkin")
+    parser.add_argument("--latensi-ms", type=float, default=0, help="jeda buatan stub server per request")
+    parser.add_argument("--batas-detik", type=float, default=120, help="batas waktu tahap pipeline")
+    parser.add_argument("--rumus", default=RUMUS_AKTIF, help="nama rumus rendemen di --rumus-file")
+    parser.add_argument("--rumus-file", default=RUMUS_FILE)
+    parser.add_argument("--simpan", help="tulis hasil JSON ke file ini")
+    parser.add_argument("--banding", help="file JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--ambang", type=float, default=10, help="persen penurunan yang dianggap regresi")
+    args = parser.parse_args()
+
+    rumus = muat_rumus(args.rumus_file, args.rumus)
+    server = jalankan_server(latensi_ms=args.latensi_ms)
+    hasil = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-ari-") as folder:
+            korpus, jumlah_baris = tulis_korpus(folder, args.sampel, args.seed)
+            daftar_bacaan = bacaan_korpus(korpus)
+            hasil["parse"] = ukur_parse(korpus, jumlah_baris, args.ulang_parse, args.batas_detik)
+            print(f"parse    : {hasil['parse']['baris_per_detik']:>10.0f} baris/s")
+            hasil["rendemen"] = ukur_rendemen(daftar_bacaan, rumus, args.ulang_rendemen)
+            print(f"rendemen : {hasil['rendemen']['ns_per_hasil']:>10.0f} ns/hasil")
+            hasil["kirim"] = ukur_kirim(server, daftar_bacaan, rumus, args.kirim)
+            print(f"kirim    : {hasil['kirim']['request_per_detik']:>10.0f} request/s, "
+                  f"p50 {hasil['kirim']['latensi_ms']['p50']} ms, p99 {hasil['kirim']['latensi_ms']['p99']} ms")
+            hasil["pipeline"] = ukur_pipeline(server, korpus, folder, rumus, args.baud,
+                                               args.batas_detik)
+            pipeline = hasil["pipeline"]
+            respon = pipeline["latensi_ms"].get("serial_respon", {})
+            print(f"pipeline : {pipeline['sampel_per_detik']:>10.0f} sampel/s "
+                  f"({pipeline['terkirim']}/{pipeline['sampel']} terkirim, {pipeline['error']} error), "
+                  f"serial→respon p50 {respon.get('p50')} ms, p99 {respon.get('p99')} ms")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    dokumen = {
+        "versi_format": VERSI_FORMAT,
+        "waktu": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rumus": rumus.versi_lengkap,
+        "argumen": {k: v for k, v in vars(args).items() if k not in ("simpan", "banding", "ambang")},
+        "hasil": hasil,
+    }
+    if args.simpan:
+        with open(args.simpan, "w", encoding="utf-8") as f:
+            json.dump(dokumen, f, indent=2)
+        print(f"\nHasil disimpan ke {args.simpan}")
+
+    if args.banding:
+        with open(args.banding, encoding="utf-8") as f:
+            lama = json.load(f)
+        if lama.get("argumen") != dokumen["argumen"]:
+            print("Peringatan: argumen berbeda dengan hasil pembanding, angka belum tentu sebanding")
+        memburuk = banding(lama, dokumen, args.ambang)
+        if memburuk:
+            print(f"\n{len(memburuk)} metrik memburuk lebih dari {args.ambang:g}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
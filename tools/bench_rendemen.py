@@ -0,0 +1,96 @@
+"""Benchmark hitung rendemen: skalar (rendemen.hitung_rendemen per baris) vs NumPy.
+
+Mengukur:
+- hitung saja   : loop Python per bacaan vs hitung_rendemen_array per potongan
+- CSV streaming : rendemen_bulk.hitung_ulang pada file CSV sementara, termasuk
+                  puncak memori (tracemalloc) untuk memastikan memori terbatas
+
+Jalankan: python -m tools.bench_rendemen [--baris 1000000] [--chunk 100000]
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from rendemen import hitung_rendemen
+from rendemen_bulk import hitung_rendemen_array, hitung_ulang, potongan_csv
+
+
+def ukur(fungsi, ulang=3):
+    terbaik = None
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi = time.perf_counter() - mulai
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    return terbaik
+
+
+def buat_csv(path, jumlah, seed=1):
+    rnd = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("kartu_ari", "pol_baca_ari", "brix_ari", "pol_ari", "rendemen_ari"))
+        for i in range(jumlah):
+            brix = round(rnd.uniform(15, 22), 2)
+            pol = round(rnd.uniform(11, 18), 2)
+            writer.writerow((100001 + i, round(rnd.uniform(55, 80), 2), brix, pol,
+                             round(hitung_rendemen(brix, pol), 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baris", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    brix = rng.uniform(15, 22, args.baris)
+    pol = rng.uniform(11, 18, args.baris)
+    brix_list, pol_list = brix.tolist(), pol.tolist()
+
+    def skalar():
+        return [round(hitung_rendemen(b, p), 2) for b, p in zip(brix_list, pol_list)]
+
+    buffer = np.empty(args.chunk)
+
+    def vektor():
+        for i in range(0, args.baris, args.chunk):
+            b, p = brix[i:i + args.chunk], pol[i:i + args.chunk]
+            hasil = hitung_rendemen_array(b, p, out=buffer[:len(b)])
+            np.round(hasil, 2, out=hasil)
+
+    hasil_skalar = np.array(skalar())
+    hasil_vektor = np.round(hitung_rendemen_array(brix, pol), 2)
+    selisih = np.abs(hasil_skalar - hasil_vektor).max()
+
+    t_skalar = ukur(skalar)
+    t_vektor = ukur(vektor)
+    print(f"Hitung {args.baris:,} bacaan (chunk {args.chunk:,}), selisih maks {selisih:.3g}")
+    print(f"  skalar : {t_skalar * 1000:8.1f} ms  ({t_skalar / args.baris * 1e9:6.1f} ns/bacaan)")
+    print(f"  numpy  : {t_vektor * 1000:8.1f} ms  ({t_vektor / args.baris * 1e9:6.1f} ns/bacaan)"
+          f"  → {t_skalar / t_vektor:.0f}x")
+
+    with tempfile.TemporaryDirectory() as folder:
+        masuk = os.path.join(folder, "masuk.csv")
+        keluar = os.path.join(folder, "keluar.csv")
+        buat_csv(masuk, args.baris)
+        mulai = time.perf_counter()
+        jumlah, _ = hitung_ulang(potongan_csv(masuk, args.chunk), keluar)
+        durasi = time.perf_counter() - mulai
+        # Putaran kedua hanya untuk puncak memori (tracemalloc memperlambat alokasi)
+        tracemalloc.start()
+        hitung_ulang(potongan_csv(masuk, args.chunk), keluar)
+        _, puncak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"CSV streaming {jumlah:,} baris: {durasi:.2f} s ({jumlah / durasi:,.0f} baris/s), "
+              f"puncak memori {puncak / 1024 / 1024:.1f} MB, file {os.path.getsize(masuk) / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
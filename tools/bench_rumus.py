@@ -0,0 +1,84 @@
+"""Benchmark mesin rumus rendemen (rumus.py) terhadap aritmetika inline lama.
+
+Membandingkan per bacaan:
+- inline   : fungsi berisi 0.7 * (pol - 0.5 * (brix - pol)) (hitung_rendemen lama)
+- rendemen : rendemen.hitung_rendemen dengan faktor/koef sebagai parameter
+- rumus    : Rumus.hitung hasil kompilasi (konstanta sudah disisipkan)
+- eval     : eval() ekspresi setiap bacaan (pembanding mesin rumus naif)
+dan per batch: Rumus.hitung_array vs rendemen_bulk.hitung_rendemen_array.
+
+Jalankan: python -m tools.bench_rumus [--bacaan 200000]
+"""
+import argparse
+import random
+import time
+
+from rendemen import hitung_rendemen
+from rumus import RUMUS_DEFAULT
+
+
+def hitung_inline(brix, pol):
+    """Salinan hitung_rendemen di index.py sebelum ada mesin rumus"""
+    return 0.7 * (pol - 0.5 * (brix - pol))
+
+
+def ukur(fungsi, brix, pol, ulang=5):
+    terbaik = None
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        for b, p in zip(brix, pol):
+            fungsi(b, p)
+        durasi = time.perf_counter() - mulai
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    return terbaik / len(brix) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bacaan", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    brix = [rnd.uniform(15, 22) for _ in range(args.bacaan)]
+    pol = [rnd.uniform(11, 18) for _ in range(args.bacaan)]
+
+    rumus = RUMUS_DEFAULT
+    assert all(rumus.hitung(b, p) == hitung_inline(b, p) for b, p in zip(brix[:1000], pol[:1000]))
+
+    kode = compile(rumus.ekspresi, "<rumus>", "eval")
+    konstanta = dict(rumus.konstanta)
+
+    def hitung_eval(b, p):
+        return eval(kode, {"__builtins__": {}}, dict(konstanta, brix=b, pol=p))
+
+    print(f"{rumus!r}, {args.bacaan:,} bacaan")
+    hasil = {
+        "inline": ukur(hitung_inline, brix, pol),
+        "rendemen": ukur(hitung_rendemen, brix, pol),
+        "rumus": ukur(rumus.hitung, brix, pol),
+        "eval": ukur(hitung_eval, brix, pol, ulang=1),
+    }
+    for nama, ns in hasil.items():
+        print(f"  {nama:11s}: {ns:7.1f} ns/bacaan  ({ns / hasil['inline']:.2f}x inline)")
+
+    try:
+        import numpy as np
+        from rendemen_bulk import hitung_rendemen_array
+    except ImportError:
+        print("numpy tidak terpasang, benchmark batch dilewati")
+        return
+    brix_arr, pol_arr = np.array(brix), np.array(pol)
+    for nama, fungsi in (("rumus batch", lambda: rumus.hitung_array(brix_arr, pol_arr)),
+                         ("bulk array", lambda: hitung_rendemen_array(brix_arr, pol_arr))):
+        terbaik = min(_durasi(fungsi) for _ in range(5))
+        print(f"  {nama:11s}: {terbaik / args.bacaan * 1e9:7.2f} ns/bacaan")
+
+
+def _durasi(fungsi):
+    mulai = time.perf_counter()
+    fungsi()
+    return time.perf_counter() - mulai
+
+
+if __name__ == "__main__":
+    main()
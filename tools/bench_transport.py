@@ -0,0 +1,77 @@
+"""Benchmark transport pengiriman hasil: GET per kartu vs batch POST vs fallback.
+
+Jalankan: python -m tools.bench_transport --jumlah 500 --latensi-ms 5
+"""
+import argparse
+import random
+import time
+
+import requests
+
+from api_client import ApiClient, MODE_BATCH, MODE_SATU
+from tools.stub_server import jalankan_server
+
+
+def buat_hasil(jumlah, seed=1):
+    """Hasil ARI acak dengan kartu_ari unik"""
+    rnd = random.Random(seed)
+    daftar = []
+    for i in range(jumlah):
+        brix = round(rnd.uniform(15, 22), 2)
+        pol = round(rnd.uniform(10, 18), 2)
+        daftar.append({
+            'kartu_ari': str(200001 + i),
+            'brix_ari': brix,
+            'pol_ari': pol,
+            'pol_baca_ari': round(pol * 4.2, 2),
+            'rendemen_ari': round(0.7 * (pol - 0.5 * (brix - pol)), 2),
+        })
+    return daftar
+
+
+def per_kartu_lama(url, daftar, ukuran_batch):
+    """Jalur lama submit_action: requests.get per kartu, koneksi baru setiap kali"""
+    for params in daftar:
+        requests.get(url, params=params, timeout=5)
+
+
+def lewat_client(mode):
+    def jalankan(url, daftar, ukuran_batch):
+        api = ApiClient(url, mode=mode)
+        for i in range(0, len(daftar), ukuran_batch):
+            api.kirim_batch(daftar[i:i + ukuran_batch])
+    return jalankan
+
+
+SKENARIO = (
+    ("get_per_kartu", per_kartu_lama, True),
+    ("client_satu", lewat_client(MODE_SATU), True),
+    ("batch", lewat_client(MODE_BATCH), True),
+    ("batch_fallback", lewat_client(MODE_BATCH), False),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jumlah", type=int, default=500, help="jumlah kartu per skenario")
+    parser.add_argument("--batch", type=int, default=20, help="ukuran batch")
+    parser.add_argument("--latensi-ms", type=float, default=5, help="jeda buatan server per request")
+    args = parser.parse_args()
+
+    daftar = buat_hasil(args.jumlah)
+    print(f"{'skenario':<16}{'detik':>9}{'kartu/s':>10}{'request':>9}{'koneksi':>9}{'tersimpan':>11}")
+    for nama, fungsi, dukung_batch in SKENARIO:
+        server = jalankan_server(dukung_batch=dukung_batch, latensi_ms=args.latensi_ms)
+        try:
+            mulai = time.perf_counter()
+            fungsi(server.url, daftar, args.batch)
+            durasi = time.perf_counter() - mulai
+        finally:
+            server.shutdown()
+            server.server_close()
+        print(f"{nama:<16}{durasi:>9.3f}{len(daftar) / durasi:>10.1f}"
+              f"{server.jumlah_request:>9}{server.jumlah_koneksi:>9}{len(server.hasil):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Simulator Saccharomat di atas pasangan serial virtual (pty, khusus Linux).
+
+Membuat pty lalu menulis baris pengukuran ke sisi master dengan laju yang
+diatur. Aplikasi cukup membuka port yang dicetak (mis. /dev/pts/5) seperti
+port COM biasa.
+
+Jalankan:
+    python -m tools.sim_saccharomat                       # data sintetis, 9600 baud
+    python -m tools.sim_saccharomat --file rekaman.txt --baud 115200 --ulang 0
+    python -m tools.sim_saccharomat --baud 0 --sampel 1000  # burst secepat mungkin
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from replay import baca_rekaman
+
+
+def sampel_sintetis(jumlah, seed=1):
+    """Urutan baris satu sampel: belum valid (*), lalu beberapa baris stabil"""
+    rnd = random.Random(seed)
+    for _ in range(jumlah):
+        pol_baca = rnd.uniform(55, 80)
+        brix = rnd.uniform(15, 22)
+        pol = rnd.uniform(11, 18)
+        yield f"{pol_baca:.2f}  -0.01  *90****  *90***\r\n".encode()
+        yield f"{pol_baca:.2f}  {brix - 0.3:.2f}  *90****  *90***\r\n".encode()
+        for _ in range(3):
+            yield (f"{pol_baca + rnd.uniform(-0.02, 0.02):.2f}  {brix + rnd.uniform(-0.02, 0.02):.2f}  "
+                   f"{pol + rnd.uniform(-0.02, 0.02):.2f}  *90***\r\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="rekaman teks (default: data sintetis)")
+    parser.add_argument("--baud", type=int, default=9600, help="emulasi laju byte, 0 = secepat mungkin")
+    parser.add_argument("--ulang", type=int, default=1, help="putar rekaman sekian kali, 0 = tanpa batas")
+    parser.add_argument("--sampel", type=int, default=50, help="jumlah sampel sintetis")
+    parser.add_argument("--jeda-sampel", type=float, default=0.0, help="jeda antar putaran (detik)")
+    args = parser.parse_args()
+
+    if not hasattr(os, "openpty"):
+        sys.exit("Simulator pty hanya tersedia di Linux/Unix; di Windows pakai port replay:FILE")
+    import tty
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    print(f"[SIM] Port virtual: {os.ttyname(slave)}", flush=True)
+    print("[SIM] Tekan Enter setelah aplikasi membuka port...", flush=True)
+    sys.stdin.readline()
+
+    detik_per_byte = 10.0 / args.baud if args.baud else 0.0
+    putaran = 0
+    total_baris = 0
+    mulai = time.monotonic()
+    total_byte = 0
+    try:
+        while not args.ulang or putaran < args.ulang:
+            lines = baca_rekaman(args.file) if args.file else sampel_sintetis(args.sampel, seed=putaran)
+            for line in lines:
+                total_byte += len(line)
+                tunggu = mulai + total_byte * detik_per_byte - time.monotonic()
+                if tunggu > 0:
+                    time.sleep(tunggu)
+                os.write(master, line)
+                total_baris += 1
+            putaran += 1
+            if args.jeda_sampel:
+                time.sleep(args.jeda_sampel)
+                mulai += args.jeda_sampel
+    except KeyboardInterrupt:
+        pass
+
+    durasi = time.monotonic() - mulai
+    print(f"[SIM] {total_baris} baris / {total_byte} byte dalam {durasi:.2f} s "
+          f"({total_baris / durasi if durasi else 0:.0f} baris/s)")
+    # Port tetap dibuka agar aplikasi tidak melihat perangkat terputus
+    print("[SIM] Selesai. Tekan Enter untuk menutup port virtual.", flush=True)
+    try:
+        sys.stdin.readline()
+    except KeyboardInterrupt:
+        pass
+    os.close(master)
+    os.close(slave)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Server tiruan input_ari_from_python.php untuk uji dan benchmark tanpa server silab.
+
+Jalankan:
+    python -m tools.stub_server --port 8080 [--tanpa-batch] [--latensi-ms 20]
+lalu arahkan API_BASE ke http://127.0.0.1:8080/silab-v4/input_ari_from_python.php
+
+Perilaku yang ditiru:
+- GET tanpa parameter     → daftar kartu yang belum diisi, dengan header ETag
+  (If-None-Match yang cocok → 304) dan server_time.
+- GET dengan since        → delta: kartu pending yang ditambahkan setelah
+  `since` dan kartu yang sudah diisi ('removed') sejak `since`.
+- GET dengan halaman      → satu halaman daftar (status=pending default, atau
+  status=selesai: kartu yang hasilnya tersimpan, opsional sejak=<epoch>),
+  berisi halaman, jumlah_halaman dan total (untuk rekonsiliasi.py).
+- GET dengan kartu_ari    → simpan satu hasil
+- POST body JSON array    → simpan banyak hasil sekaligus (mode batch).
+  Dengan --tanpa-batch, POST diperlakukan seperti server lama (body diabaikan,
+  yang dikembalikan daftar pending) sehingga client harus fallback ke GET.
+  --tanpa-halaman meniru server lama yang mengabaikan parameter halaman.
+- --hilang N: setiap hasil ke-N dijawab sukses tapi tidak tersimpan (uji
+  rekonsiliasi).
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIELD_ANGKA = ('brix_ari', 'pol_ari', 'pol_baca_ari', 'rendemen_ari')
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, alamat, dukung_batch=True, latensi_ms=0, jumlah_pending=0, dukung_halaman=True,
+                 hilang_setiap=0):
+        super().__init__(alamat, StubHandler)
+        self.dukung_batch = dukung_batch
+        self.dukung_halaman = dukung_halaman
+        self.hilang_setiap = hilang_setiap
+        self.jumlah_simpan = 0
+        self.hilang = []             # kartu_ari yang dijawab sukses tapi tidak disimpan
+        self.latensi = latensi_ms / 1000.0
+        self.lock = threading.Lock()
+        self.hasil = {}              # kartu_ari -> params terakhir
+        self.jumlah_request = 0
+        self.jumlah_koneksi = 0
+        self.pending = []
+        self.versi = 0               # naik setiap daftar pending berubah (untuk ETag)
+        self._t_tambah = {}          # kartu_ari -> waktu masuk daftar pending
+        self._t_selesai = {}         # kartu_ari -> waktu hasil pertama disimpan
+        self._t_simpan = {}          # kartu_ari -> waktu hasil terakhir disimpan (semua kartu)
+        self.tambah_pending(jumlah_pending)
+
+    def tambah_pending(self, jumlah):
+        """Tambah kartu pending baru (id dan kartu_ari berurutan)"""
+        sekarang = time.time()
+        with self.lock:
+            for _ in range(jumlah):
+                nomor = len(self.pending) + 1
+                item = {'id': nomor, 'kartu_ari': str(100000 + nomor)}
+                self.pending.append(item)
+                self._t_tambah[item['kartu_ari']] = sekarang
+            if jumlah:
+                self.versi += 1
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/silab-v4/input_ari_from_python.php"
+
+    def simpan(self, params):
+        """Validasi dan simpan satu hasil, return dict status seperti PHP"""
+        kartu_ari = str(params.get('kartu_ari', '')).strip()
+        if not kartu_ari:
+            return {'status': 'error', 'message': 'kartu_ari kosong'}
+        try:
+            for field in FIELD_ANGKA:
+                float(params[field])
+        except (KeyError, TypeError, ValueError):
+            return {'status': 'error', 'message': f'Data kartu {kartu_ari} tidak lengkap'}
+        with self.lock:
+            self.jumlah_simpan += 1
+            if self.hilang_setiap and self.jumlah_simpan % self.hilang_setiap == 0:
+                self.hilang.append(kartu_ari)
+                return {'status': 'success', 'message': f'Data ARI kartu {kartu_ari} berhasil disimpan'}
+            sekarang = time.time()
+            if kartu_ari not in self.hasil and kartu_ari in self._t_tambah:
+                self._t_selesai[kartu_ari] = sekarang
+                self.versi += 1
+            self.hasil[kartu_ari] = dict(params)
+            self._t_simpan[kartu_ari] = sekarang
+        return {'status': 'success', 'message': f'Data ARI kartu {kartu_ari} berhasil disimpan'}
+
+    def daftar_pending(self, since=None):
+        """Return dict respon daftar pending (penuh, atau delta jika since diisi)"""
+        with self.lock:
+            respon = {'status': 'success', 'server_time': time.time()}
+            if since is None:
+                respon['data'] = [item for item in self.pending if item['kartu_ari'] not in self.hasil]
+                return respon
+            respon['delta'] = True
+            respon['data'] = [
+                item for item in self.pending
+                if item['kartu_ari'] not in self.hasil and self._t_tambah[item['kartu_ari']] > since
+            ]
+            respon['removed'] = [kartu for kartu, t in self._t_selesai.items() if t > since]
+            return respon
+
+    def halaman(self, status, halaman, per_halaman, sejak=None):
+        """Return dict respon satu halaman daftar pending atau selesai (halaman mulai 1)"""
+        with self.lock:
+            if status == 'selesai':
+                daftar = [{'kartu_ari': kartu, 'diperbarui': t} for kartu, t in self._t_simpan.items()
+                          if sejak is None or t >= sejak]
+            else:
+                daftar = [item for item in self.pending if item['kartu_ari'] not in self.hasil]
+        awal = (halaman - 1) * per_halaman
+        return {
+            'status': 'success',
+            'server_time': time.time(),
+            'data': daftar[awal:awal + per_halaman],
+            'halaman': halaman,
+            'jumlah_halaman': max(1, -(-len(daftar) // per_halaman)),
+            'total': len(daftar),
+        }
+
+    @property
+    def etag(self):
+        return f'"{self.versi}"'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive seperti Apache/PHP
+    disable_nagle_algorithm = True   # header dan body ditulis terpisah, hindari jeda delayed-ACK
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.jumlah_koneksi += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _kirim_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for nama, nilai in (headers or {}).items():
+            self.send_header(nama, nilai)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _mulai(self):
+        with self.server.lock:
+            self.server.jumlah_request += 1
+        if self.server.latensi:
+            time.sleep(self.server.latensi)
+
+    def do_GET(self):
+        self._mulai()
+        query = {k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if 'kartu_ari' in query:
+            self._kirim_json(self.server.simpan(query))
+            return
+        if 'halaman' in query and self.server.dukung_halaman:
+            try:
+                halaman = max(1, int(query['halaman']))
+                per_halaman = min(5000, max(1, int(query.get('per_halaman', 500))))
+                sejak = float(query['sejak']) if 'sejak' in query else None
+            except ValueError as e:
+                self._kirim_json({'status': 'error', 'message': str(e)}, status=400)
+                return
+            self._kirim_json(self.server.halaman(query.get('status', 'pending'), halaman, per_halaman, sejak))
+            return
+
+        etag = self.server.etag
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        try:
+            since = float(query['since']) if 'since' in query else None
+        except ValueError:
+            since = None
+        self._kirim_json(self.server.daftar_pending(since), headers={'ETag': etag})
+
+    def do_POST(self):
+        self._mulai()
+        panjang = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(panjang)
+
+        if not self.server.dukung_batch:
+            # Server lama: body POST diabaikan, sama dengan GET tanpa parameter
+            self._kirim_json(self.server.daftar_pending())
+            return
+
+        try:
+            daftar = json.loads(body)
+            if not isinstance(daftar, list):
+                raise ValueError("body harus JSON array")
+        except ValueError as e:
+            self._kirim_json({'status': 'error', 'message': str(e)}, status=400)
+            return
+
+        results = [self.server.simpan(params if isinstance(params, dict) else {}) for params in daftar]
+        self._kirim_json({'status': 'success', 'results': results})
+
+
+def jalankan_server(host="127.0.0.1", port=0, **kwargs):
+    """Start server di thread background (port=0 → port bebas). Return StubServer."""
+    server = StubServer((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--tanpa-batch", action="store_true", help="tiru server lama tanpa dukungan POST batch")
+    parser.add_argument("--latensi-ms", type=float, default=0, help="jeda buatan per request")
+    parser.add_argument("--pending", type=int, default=20, help="jumlah kartu pending tiruan")
+    parser.add_argument("--tanpa-halaman", action="store_true", help="tiru server lama tanpa daftar berhalaman")
+    parser.add_argument("--hilang", type=int, default=0, help="setiap hasil ke-N tidak disimpan, 0 = tidak ada")
+    args = parser.parse_args()
+
+    server = StubServer(
+        (args.host, args.port),
+        dukung_batch=not args.tanpa_batch,
+        latensi_ms=args.latensi_ms,
+        jumlah_pending=args.pending,
+        dukung_halaman=not args.tanpa_halaman,
+        hilang_setiap=args.hilang
+    )
+    print(f"[STUB] {server.url} (batch: {'ya' if server.dukung_batch else 'tidak'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()